@@ -2,5 +2,7 @@ from .goals import router as goals_router
 from .tasks import router as tasks_router
 from .users import router as users_router
 from .dashboard import router as dashboard_router
+from .notifications import router as notifications_router
+from .search import router as search_router
 
-__all__ = ['goals_router', 'tasks_router', 'users_router', 'dashboard_router'] 
\ No newline at end of file
+__all__ = ['goals_router', 'tasks_router', 'users_router', 'dashboard_router', 'notifications_router', 'search_router'] 
\ No newline at end of file
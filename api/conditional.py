@@ -0,0 +1,49 @@
+import os
+import time
+from typing import Optional
+from fastapi import Request, Response
+from services.read_cache import read_cache
+
+# 浏览器可以缓存响应，但每次使用前都要带 If-None-Match 重新验证
+CACHE_CONTROL = "private, no-cache"
+
+# 随当前时间变化的查询（今日、逾期、即将到来）在没有写入时，ETag 每隔这么多秒变化一次，
+# 即这些数字最多滞后该时长
+ETAG_TIME_BUCKET_SECONDS = int(os.getenv("ETAG_TIME_BUCKET_SECONDS", "900"))
+
+def time_bucket() -> int:
+    """当前时间所在的时间段，用于随时间变化的查询的 ETag"""
+    return int(time.time() // ETAG_TIME_BUCKET_SECONDS)
+
+def weak_etag(user_id: int, *parts) -> str:
+    """由用户的数据版本和查询相关的部分组成的弱 ETag"""
+    return 'W/"' + "-".join([read_cache.version(user_id), *map(str, parts)]) + '"'
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match 的弱比较：忽略 W/ 前缀，支持逗号分隔的多个值和 *"""
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+def check_not_modified(request: Request, response: Response, user_id: int, *parts) -> Optional[Response]:
+    """数据未变化时返回 304 响应（不查询数据库），否则在响应上设置 ETag 并返回 None
+    
+    先读取版本再查询数据：查询期间有写入时，响应带的是旧版本的 ETag，下次请求会拿到新数据；
+    版本不能跨进程共享时不使用 ETag
+    """
+    if not read_cache.etags:
+        return None
+    etag = weak_etag(user_id, *parts)
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
@@ -1,57 +1,48 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from datetime import datetime, timedelta
-from typing import Dict, Any
-from models.database import get_db
-from services.goal_service import GoalService
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
+from typing import Dict, Any, Iterable, Iterator
+import json
+from models.database import get_read_db, get_async_read_db
+from services.goal_service import progress_from_counts
+from services.async_goal_service import AsyncGoalService
 from services.task_service import TaskService
+from services.dashboard_stats_service import DashboardStatsService
+from services.read_cache import read_cache
+from .conditional import check_not_modified, time_bucket
 
 router = APIRouter(prefix="/dashboard", tags=["dashboard"])
 
 @router.get("/summary")
-def get_dashboard_summary(db: Session = Depends(get_db)):
+async def get_dashboard_summary(request: Request, response: Response, db: AsyncSession = Depends(get_async_read_db)):
     """获取仪表板摘要信息"""
-    goal_service = GoalService()
-    task_service = TaskService()
-    
-    # 获取用户统计信息
-    goals = goal_service.get_user_goals(db, user_id=1)
-    active_goals = goal_service.get_active_goals(db, user_id=1)
-    
-    # 获取今日任务
-    today = datetime.utcnow()
-    daily_tasks = task_service.get_daily_tasks(db, user_id=1, today)
-    
-    # 获取逾期任务
-    overdue_tasks = task_service.get_overdue_tasks(db, user_id=1)
-    
-    # 获取即将到来的任务
-    upcoming_tasks = task_service.get_upcoming_tasks(db, user_id=1, days=7)
-    
-    # 计算完成率
-    total_tasks = len(daily_tasks)
-    completed_tasks = len([task for task in daily_tasks if task.status == "completed"])
-    completion_rate = (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0
-    
-    return {
-        "total_goals": len(goals),
-        "active_goals": len(active_goals),
-        "today_tasks": len(daily_tasks),
-        "completed_today": completed_tasks,
-        "completion_rate": round(completion_rate, 1),
-        "overdue_tasks": len(overdue_tasks),
-        "upcoming_tasks": len(upcoming_tasks)
-    }
+    not_modified = check_not_modified(request, response, 1, time_bucket())
+    if not_modified:
+        return not_modified
+    stats_service = DashboardStatsService()
+    # 摘要中的“今日”按日期区分缓存
+    return await read_cache.get_or_load(
+        1, f"dashboard:summary:{datetime.utcnow().date()}", lambda: stats_service.get_summary_async(db, user_id=1)
+    )
 
 @router.get("/goals/progress")
-def get_goals_progress(db: Session = Depends(get_db)):
+async def get_goals_progress(request: Request, response: Response, db: AsyncSession = Depends(get_async_read_db)):
     """获取目标进度信息"""
-    goal_service = GoalService()
-    active_goals = goal_service.get_active_goals(db, user_id=1)
+    not_modified = check_not_modified(request, response, 1)
+    if not_modified:
+        return not_modified
+    return await read_cache.get_or_load(1, "dashboard:goals_progress", lambda: _load_goals_progress(db))
+
+async def _load_goals_progress(db: AsyncSession):
+    goal_service = AsyncGoalService()
+    active_goals = await goal_service.get_active_goals(db, user_id=1)
     
+    # 进度由目标上的任务计数直接得出，无需再查询任务表
     goals_progress = []
     for goal in active_goals:
-        progress = goal_service.calculate_goal_progress(db, goal.id)
+        progress = progress_from_counts(goal.completed_count, goal.total_count)
         goals_progress.append({
             "id": goal.id,
             "title": goal.title,
@@ -67,7 +58,7 @@ def get_goals_progress(db: Session = Depends(get_db)):
 def get_tasks_calendar(
     start_date: str,
     end_date: str,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """获取日历视图的任务"""
     try:
@@ -77,53 +68,37 @@ def get_tasks_calendar(
         return {"error": "日期格式错误，请使用YYYY-MM-DD格式"}
     
     task_service = TaskService()
-    calendar_tasks = []
-    
-    current_date = start
-    while current_date <= end:
-        daily_tasks = task_service.get_daily_tasks(db, user_id=1, current_date)
-        if daily_tasks:
-            calendar_tasks.append({
-                "date": current_date.strftime("%Y-%m-%d"),
-                "tasks": [
-                    {
-                        "id": task.id,
-                        "title": task.title,
-                        "status": task.status,
-                        "priority": task.priority
-                    }
-                    for task in daily_tasks
-                ]
-            })
-        current_date += timedelta(days=1)
+    calendar_tasks = task_service.iter_calendar_tasks(db, user_id=1, start_date=start, end_date=end)
     
-    return calendar_tasks
+    return StreamingResponse(_stream_json_array(calendar_tasks), media_type="application/json")
+
+def _stream_json_array(items: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    """将逐项产出的字典流式编码为JSON数组"""
+    yield "["
+    for index, item in enumerate(items):
+        if index:
+            yield ","
+        yield json.dumps(item, ensure_ascii=False, separators=(",", ":"))
+    yield "]"
 
 @router.get("/analytics")
-def get_analytics(db: Session = Depends(get_db)):
-    """获取分析数据"""
-    goal_service = GoalService()
-    task_service = TaskService()
-    
-    # 获取过去30天的数据
-    end_date = datetime.utcnow()
-    start_date = end_date - timedelta(days=30)
-    
-    # 按类别统计目标
-    categories = ["健身", "学习", "工作", "其他"]
-    category_stats = {}
-    
-    for category in categories:
-        goals = goal_service.get_goals_by_category(db, user_id=1, category=category)
-        category_stats[category] = len(goals)
-    
-    # 任务完成趋势（简化处理）
-    completion_trend = {
-        "labels": [(end_date - timedelta(days=i)).strftime("%m-%d") for i in range(7, 0, -1)],
-        "data": [85, 90, 75, 88, 92, 87, 95]  # 示例数据
-    }
-    
-    return {
-        "category_stats": category_stats,
-        "completion_trend": completion_trend
-    } 
\ No newline at end of file
+def get_analytics(
+    request: Request,
+    response: Response,
+    days: int = Query(7, ge=1, le=365, description="趋势的天数，如 7、30、365"),
+    db: Session = Depends(get_read_db)
+):
+    """获取分析数据：完成趋势来自预先汇总的每日统计，类别统计为一次分组计数"""
+    today = datetime.utcnow().date()
+    not_modified = check_not_modified(request, response, 1, today, days)
+    if not_modified:
+        return not_modified
+    stats_service = DashboardStatsService()
+    return read_cache.get_or_load_sync(
+        1, f"dashboard:analytics:{today}:{days}", lambda: stats_service.get_analytics(db, user_id=1, days=days, today=today)
+    )
+
+@router.get("/cache/stats")
+def get_cache_stats():
+    """读缓存的命中、未命中和失效次数"""
+    return read_cache.get_stats()
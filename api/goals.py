@@ -1,9 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
-from models.database import get_db
-from models.schemas import Goal, GoalCreate
+from models.database import get_db, get_async_read_db
+from models.schemas import Goal, GoalCreate, GoalFields, GoalImportResult
 from services.goal_service import GoalService
+from services.bulk_planner import BatchImportMetrics
+from services.async_goal_service import AsyncGoalService
+from services.read_cache import read_cache
+from .conditional import check_not_modified
+from .pagination import PageParams, finish_page, page_params
 
 router = APIRouter(prefix="/goals", tags=["goals"])
 
@@ -14,18 +20,51 @@ def create_goal(goal: GoalCreate, db: Session = Depends(get_db)):
     # 这里简化处理，假设用户ID为1，实际应该有用户认证
     return goal_service.create_goal(db, goal, user_id=1)
 
-@router.get("/", response_model=List[Goal])
-def get_goals(db: Session = Depends(get_db)):
-    """获取用户的所有目标"""
+@router.post("/batch", response_model=List[Goal])
+def create_goals_batch(goals: List[GoalCreate], db: Session = Depends(get_db)):
+    """批量导入目标（单个事务内写入所有目标和任务）"""
     goal_service = GoalService()
+    return goal_service.create_goals(db, goals, user_id=1)
+
+@router.post("/import", response_model=GoalImportResult)
+def import_goals(goals: List[GoalCreate], db: Session = Depends(get_db)):
+    """大批量导入目标：只返回目标ID和本批的耗时统计（规划、写入耗时，任务/秒）"""
+    goal_service = GoalService()
+    metrics = BatchImportMetrics()
+    created = goal_service.create_goals(db, goals, user_id=1, metrics=metrics)
+    return {"goal_ids": [goal.id for goal in created], "metrics": metrics.to_dict()}
+
+goal_page_params = page_params(GoalFields)
+
+@router.get("/", response_model=List[GoalFields], response_model_exclude_unset=True)
+async def get_goals(request: Request, response: Response, page: PageParams = Depends(goal_page_params),
+                    db: AsyncSession = Depends(get_async_read_db)):
+    """获取用户的目标（按ID分页，可用 fields 只返回部分字段）"""
+    not_modified = check_not_modified(request, response, 1)
+    if not_modified:
+        return not_modified
+    goal_service = AsyncGoalService()
     # 这里简化处理，假设用户ID为1
-    return goal_service.get_user_goals(db, user_id=1)
+    rows = await read_cache.get_or_load(
+        1, f"goals:{page.cache_key()}",
+        lambda: goal_service.get_user_goals(
+            db, user_id=1, after=page.after, limit=page.fetch_limit, fields=page.fields
+        ),
+        None if page.fields else Goal
+    )
+    return finish_page(request, response, page, rows)
 
 @router.get("/{goal_id}", response_model=Goal)
-def get_goal(goal_id: int, db: Session = Depends(get_db)):
+async def get_goal(goal_id: int, request: Request, response: Response,
+                   db: AsyncSession = Depends(get_async_read_db)):
     """获取特定目标"""
-    goal_service = GoalService()
-    goal = goal_service.get_goal(db, goal_id, user_id=1)
+    not_modified = check_not_modified(request, response, 1)
+    if not_modified:
+        return not_modified
+    goal_service = AsyncGoalService()
+    goal = await read_cache.get_or_load(
+        1, f"goal:{goal_id}", lambda: goal_service.get_goal(db, goal_id, user_id=1), Goal
+    )
     if not goal:
         raise HTTPException(status_code=404, detail="目标未找到")
     return goal
@@ -48,14 +87,37 @@ def delete_goal(goal_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="目标未找到")
     return {"message": "目标删除成功"}
 
-@router.get("/category/{category}", response_model=List[Goal])
-def get_goals_by_category(category: str, db: Session = Depends(get_db)):
+@router.get("/category/{category}", response_model=List[GoalFields], response_model_exclude_unset=True)
+async def get_goals_by_category(category: str, request: Request, response: Response,
+                                page: PageParams = Depends(goal_page_params),
+                                db: AsyncSession = Depends(get_async_read_db)):
     """按类别获取目标"""
-    goal_service = GoalService()
-    return goal_service.get_goals_by_category(db, user_id=1, category=category)
+    not_modified = check_not_modified(request, response, 1)
+    if not_modified:
+        return not_modified
+    goal_service = AsyncGoalService()
+    rows = await read_cache.get_or_load(
+        1, f"goals:category:{category}:{page.cache_key()}",
+        lambda: goal_service.get_goals_by_category(
+            db, user_id=1, category=category, after=page.after, limit=page.fetch_limit, fields=page.fields
+        ),
+        None if page.fields else Goal
+    )
+    return finish_page(request, response, page, rows)
 
-@router.get("/active/", response_model=List[Goal])
-def get_active_goals(db: Session = Depends(get_db)):
+@router.get("/active/", response_model=List[GoalFields], response_model_exclude_unset=True)
+async def get_active_goals(request: Request, response: Response, page: PageParams = Depends(goal_page_params),
+                           db: AsyncSession = Depends(get_async_read_db)):
     """获取活跃目标"""
-    goal_service = GoalService()
-    return goal_service.get_active_goals(db, user_id=1) 
\ No newline at end of file
+    not_modified = check_not_modified(request, response, 1)
+    if not_modified:
+        return not_modified
+    goal_service = AsyncGoalService()
+    rows = await read_cache.get_or_load(
+        1, f"goals:active:{page.cache_key()}",
+        lambda: goal_service.get_active_goals(
+            db, user_id=1, after=page.after, limit=page.fetch_limit, fields=page.fields
+        ),
+        None if page.fields else Goal
+    )
+    return finish_page(request, response, page, rows) 
\ No newline at end of file
@@ -0,0 +1,37 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import Optional
+from models.database import get_db, get_read_db
+from models.schemas import NotificationPage
+from services.notification_history_service import NotificationHistoryService
+
+router = APIRouter(prefix="/notifications", tags=["notifications"])
+
+@router.get("/", response_model=NotificationPage)
+def get_notifications(
+    before: Optional[int] = Query(None, description="上一页最后一条通知的ID"),
+    limit: int = Query(20, ge=1, le=100, description="每页数量"),
+    unread_only: bool = Query(False, description="只返回未读通知"),
+    db: Session = Depends(get_read_db)
+):
+    """按时间倒序分页获取通知历史"""
+    history_service = NotificationHistoryService()
+    # 这里简化处理，假设用户ID为1
+    return history_service.list_notifications(
+        db, user_id=1, before=before, limit=limit, unread_only=unread_only
+    )
+
+@router.put("/{notification_id}/read")
+def mark_notification_read(notification_id: int, db: Session = Depends(get_db)):
+    """标记通知为已读"""
+    history_service = NotificationHistoryService()
+    if not history_service.mark_read(db, notification_id, user_id=1):
+        raise HTTPException(status_code=404, detail="通知未找到")
+    return {"message": "已标记为已读"}
+
+@router.put("/read-all")
+def mark_all_notifications_read(db: Session = Depends(get_db)):
+    """标记全部通知为已读"""
+    history_service = NotificationHistoryService()
+    count = history_service.mark_all_read(db, user_id=1)
+    return {"message": "已全部标记为已读", "count": count}
@@ -0,0 +1,72 @@
+import os
+from dataclasses import dataclass
+from typing import Any, Callable, List, Optional, Tuple
+from fastapi import HTTPException, Query, Request, Response
+
+# 列表接口未指定 limit 时每页返回的条数
+LIST_DEFAULT_LIMIT = int(os.getenv("LIST_DEFAULT_LIMIT", "100"))
+
+# 每页最多返回的条数
+LIST_MAX_LIMIT = int(os.getenv("LIST_MAX_LIMIT", "1000"))
+
+@dataclass
+class PageParams:
+    """列表接口的分页和字段参数"""
+    after: Optional[Any]
+    limit: int
+    fields: Optional[Tuple[str, ...]]
+    
+    @property
+    def fetch_limit(self) -> int:
+        """多取一条，用来判断是否还有下一页"""
+        return self.limit + 1
+    
+    def cache_key(self) -> str:
+        return f"after={self.after}&limit={self.limit}&fields={','.join(self.fields or ())}"
+
+def page_params(schema, cursor: Callable[[str], Any] = int):
+    """构造解析 ?after=&limit=&fields= 的依赖，fields 只允许 schema 中声明的字段
+
+    cursor 把 after 转换为查询使用的游标，默认为记录ID；转换失败时返回 400
+    """
+    allowed = list(schema.model_fields)
+    
+    def dependency(
+        after: Optional[str] = Query(None, description="上一页的游标（X-Next-Cursor），按ID分页时即上一页最后一条记录的ID"),
+        limit: int = Query(LIST_DEFAULT_LIMIT, ge=1, le=LIST_MAX_LIMIT, description="每页条数"),
+        fields: Optional[str] = Query(None, description="逗号分隔的返回字段，如 id,title,status")
+    ) -> PageParams:
+        if after is not None:
+            try:
+                after = cursor(after)
+            except ValueError:
+                raise HTTPException(status_code=400, detail="无效的分页游标")
+        if not fields:
+            return PageParams(after, limit, None)
+        requested = [name.strip() for name in fields.split(",") if name.strip()]
+        unknown = [name for name in requested if name not in allowed]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"未知字段: {', '.join(unknown)}，可选字段: {', '.join(allowed)}")
+        # id 始终返回，作为下一页的游标；其余字段按声明顺序去重
+        names = ("id",) + tuple(name for name in allowed if name != "id" and name in requested)
+        return PageParams(after, limit, names)
+    
+    return dependency
+
+def finish_page(request: Request, response: Response, params: PageParams, rows: List,
+                cursor_for: Optional[Callable[[Any], str]] = None) -> List:
+    """rows 为按 fetch_limit 查询的结果：截去多取的一条，还有下一页时设置 Link 和 X-Next-Cursor 响应头
+
+    cursor_for 由最后一行生成下一页的游标，默认为该行的ID
+    """
+    if len(rows) <= params.limit:
+        return rows
+    rows = rows[:params.limit]
+    last = rows[-1]
+    if cursor_for is not None:
+        next_cursor = cursor_for(last)
+    else:
+        next_cursor = str(last["id"] if isinstance(last, dict) else last.id)
+    response.headers["Link"] = f'<{request.url.include_query_params(after=next_cursor)}>; rel="next"'
+    response.headers["X-Next-Cursor"] = next_cursor
+    return rows
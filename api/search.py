@@ -0,0 +1,28 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
+from models.database import get_async_read_db
+from models.schemas import SearchResults
+from services.search_service import SearchService, SEARCH_MAX_LIMIT
+from .conditional import check_not_modified
+
+router = APIRouter(prefix="/search", tags=["search"])
+
+@router.get("", response_model=SearchResults)
+async def search(
+    request: Request,
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200, description="检索词，多个词用空格分隔（同时满足）"),
+    limit: int = Query(20, ge=1, le=SEARCH_MAX_LIMIT, description="目标、任务各自最多返回的条数"),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """全文检索目标和任务的标题、描述，按相关度排序并返回高亮片段"""
+    not_modified = check_not_modified(request, response, 1)
+    if not_modified:
+        return not_modified
+    search_service = SearchService()
+    try:
+        # 这里简化处理，假设用户ID为1
+        return await search_service.search(db, user_id=1, query=q, limit=limit)
+    except OperationalError:
+        raise HTTPException(status_code=503, detail="全文检索不可用，请确认已执行数据库迁移且 SQLite 支持 FTS5")
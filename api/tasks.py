@@ -1,39 +1,68 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from datetime import datetime
-from models.database import get_db
-from models.schemas import Task, TaskCreate, TaskProgress, TaskProgressCreate
+from models.database import get_db, get_async_read_db
+from models.schemas import Task, TaskCreate, TaskFields, TaskProgress, TaskProgressCreate
 from services.task_service import TaskService
+from services.async_task_service import AsyncTaskService
+from services.task_query import TaskQuery, TASK_SORTS
+from services.read_cache import read_cache
+from .conditional import check_not_modified, time_bucket
+from .pagination import PageParams, finish_page, page_params
 
 router = APIRouter(prefix="/tasks", tags=["tasks"])
 
-@router.get("/", response_model=List[Task])
-def get_tasks(
+task_page_params = page_params(TaskFields)
+task_list_page_params = page_params(TaskFields, cursor=str)
+
+def _split(value: Optional[str]) -> tuple:
+    return tuple(item.strip() for item in value.split(",") if item.strip()) if value else ()
+
+@router.get("/", response_model=List[TaskFields], response_model_exclude_unset=True)
+async def get_tasks(
+    request: Request,
+    response: Response,
     goal_id: Optional[int] = Query(None, description="按目标ID筛选"),
-    status: Optional[str] = Query(None, description="按状态筛选"),
-    priority: Optional[str] = Query(None, description="按优先级筛选"),
-    db: Session = Depends(get_db)
+    status: Optional[str] = Query(None, description="按状态筛选，多个用逗号分隔，如 pending,in_progress"),
+    priority: Optional[str] = Query(None, description="按优先级筛选，多个用逗号分隔"),
+    due_from: Optional[datetime] = Query(None, description="截止时间不早于"),
+    due_to: Optional[datetime] = Query(None, description="截止时间早于"),
+    sort: str = Query("id", description=f"排序方式: {', '.join(TASK_SORTS)}（- 表示降序）"),
+    page: PageParams = Depends(task_list_page_params),
+    db: AsyncSession = Depends(get_async_read_db)
 ):
-    """获取任务列表"""
-    task_service = TaskService()
+    """获取任务列表：各筛选条件同时生效，按排序方式键集分页，可用 fields 只返回部分字段"""
+    try:
+        query = (
+            TaskQuery(sort=sort)
+            .for_goal(goal_id)
+            .with_status(*_split(status))
+            .with_priority(*_split(priority))
+            .due_between(due_from, due_to)
+            .page(page.after, page.fetch_limit)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    if goal_id:
-        return task_service.get_goal_tasks(db, goal_id)
-    elif status:
-        # 这里简化处理，实际应该实现按状态筛选
-        return []
-    elif priority:
-        return task_service.get_tasks_by_priority(db, user_id=1, priority=priority)
-    else:
-        # 获取所有任务（这里简化处理）
-        return []
+    not_modified = check_not_modified(request, response, 1)
+    if not_modified:
+        return not_modified
+    task_service = AsyncTaskService()
+    # 这里简化处理，假设用户ID为1
+    rows = await read_cache.get_or_load(
+        1, f"tasks:list:{query.cache_key()}&fields={','.join(page.fields or ())}",
+        lambda: task_service.query_tasks(db, user_id=1, query=query, fields=page.fields),
+        None if page.fields else TaskFields
+    )
+    return finish_page(request, response, page, rows, query.cursor_for)
 
 @router.get("/{task_id}", response_model=Task)
-def get_task(task_id: int, db: Session = Depends(get_db)):
+async def get_task(task_id: int, db: AsyncSession = Depends(get_async_read_db)):
     """获取特定任务"""
-    task_service = TaskService()
-    task = task_service.get_task(db, task_id)
+    task_service = AsyncTaskService()
+    task = await task_service.get_task(db, task_id)
     if not task:
         raise HTTPException(status_code=404, detail="任务未找到")
     return task
@@ -48,27 +77,58 @@ def update_task_status(task_id: int, status: str, db: Session = Depends(get_db))
     return {"message": "状态更新成功", "status": status}
 
 @router.get("/daily/{date}", response_model=List[Task])
-def get_daily_tasks(date: str, db: Session = Depends(get_db)):
+async def get_daily_tasks(date: str, request: Request, response: Response,
+                          db: AsyncSession = Depends(get_async_read_db)):
     """获取指定日期的任务"""
     try:
         target_date = datetime.strptime(date, "%Y-%m-%d")
     except ValueError:
         raise HTTPException(status_code=400, detail="日期格式错误，请使用YYYY-MM-DD格式")
     
-    task_service = TaskService()
-    return task_service.get_daily_tasks(db, user_id=1, target_date=target_date)
+    not_modified = check_not_modified(request, response, 1)
+    if not_modified:
+        return not_modified
+    
+    task_service = AsyncTaskService()
+    return await read_cache.get_or_load(
+        1, f"tasks:daily:{target_date.date()}",
+        lambda: task_service.get_daily_tasks(db, user_id=1, target_date=target_date), Task
+    )
 
-@router.get("/overdue/", response_model=List[Task])
-def get_overdue_tasks(db: Session = Depends(get_db)):
-    """获取逾期任务"""
-    task_service = TaskService()
-    return task_service.get_overdue_tasks(db, user_id=1)
+@router.get("/overdue/", response_model=List[TaskFields], response_model_exclude_unset=True)
+async def get_overdue_tasks(request: Request, response: Response, page: PageParams = Depends(task_page_params),
+                            db: AsyncSession = Depends(get_async_read_db)):
+    """获取逾期任务（按ID分页，可用 fields 只返回部分字段）"""
+    not_modified = check_not_modified(request, response, 1, time_bucket())
+    if not_modified:
+        return not_modified
+    task_service = AsyncTaskService()
+    rows = await read_cache.get_or_load(
+        1, f"tasks:overdue:{page.cache_key()}",
+        lambda: task_service.get_overdue_tasks(
+            db, user_id=1, after=page.after, limit=page.fetch_limit, fields=page.fields
+        ),
+        None if page.fields else TaskFields
+    )
+    return finish_page(request, response, page, rows)
 
-@router.get("/upcoming/", response_model=List[Task])
-def get_upcoming_tasks(days: int = Query(7, description="未来天数"), db: Session = Depends(get_db)):
-    """获取即将到来的任务"""
-    task_service = TaskService()
-    return task_service.get_upcoming_tasks(db, user_id=1, days=days)
+@router.get("/upcoming/", response_model=List[TaskFields], response_model_exclude_unset=True)
+async def get_upcoming_tasks(request: Request, response: Response, days: int = Query(7, description="未来天数"),
+                             page: PageParams = Depends(task_page_params),
+                             db: AsyncSession = Depends(get_async_read_db)):
+    """获取即将到来的任务（按ID分页，可用 fields 只返回部分字段）"""
+    not_modified = check_not_modified(request, response, 1, time_bucket())
+    if not_modified:
+        return not_modified
+    task_service = AsyncTaskService()
+    rows = await read_cache.get_or_load(
+        1, f"tasks:upcoming:{days}:{page.cache_key()}",
+        lambda: task_service.get_upcoming_tasks(
+            db, user_id=1, days=days, after=page.after, limit=page.fetch_limit, fields=page.fields
+        ),
+        None if page.fields else TaskFields
+    )
+    return finish_page(request, response, page, rows)
 
 @router.post("/{task_id}/progress", response_model=TaskProgress)
 def add_task_progress(
@@ -86,10 +146,10 @@ def add_task_progress(
     )
 
 @router.get("/{task_id}/progress", response_model=List[TaskProgress])
-def get_task_progress(task_id: int, db: Session = Depends(get_db)):
+async def get_task_progress(task_id: int, db: AsyncSession = Depends(get_async_read_db)):
     """获取任务进度记录"""
-    task_service = TaskService()
-    return task_service.get_task_progress(db, task_id)
+    task_service = AsyncTaskService()
+    return await task_service.get_task_progress(db, task_id)
 
 @router.delete("/{task_id}")
 def delete_task(task_id: int, db: Session = Depends(get_db)):
@@ -1,47 +1,76 @@
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from models.database import get_db
-from models.schemas import User, UserCreate
+from sqlalchemy.ext.asyncio import AsyncSession
+from models.database import get_db, get_read_db, get_async_db
+from models.schemas import User, UserCreate, UserPreferences
+from services.password_service import password_hasher
+from services.reminder_service import ReminderService
 
 router = APIRouter(prefix="/users", tags=["users"])
 
 @router.post("/", response_model=User)
-def create_user(user: UserCreate, db: Session = Depends(get_db)):
+async def create_user(user: UserCreate, db: AsyncSession = Depends(get_async_db)):
     """创建新用户"""
-    # 这里简化处理，实际应该有密码加密和用户验证
+    # 这里简化处理，实际应该有用户验证
     from models.models import User as UserModel
-    from passlib.context import CryptContext
-    
-    pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
     
     # 检查用户是否已存在
-    existing_user = db.query(UserModel).filter(
+    existing_user = await db.scalar(select(UserModel).where(
         (UserModel.username == user.username) | (UserModel.email == user.email)
-    ).first()
+    ))
     
     if existing_user:
         raise HTTPException(status_code=400, detail="用户名或邮箱已存在")
     
-    # 创建新用户
-    hashed_password = pwd_context.hash(user.password)
+    reminder_service = ReminderService()
+    try:
+        if user.timezone is not None:
+            reminder_service.validate_timezone(user.timezone)
+        for value in (user.daily_reminder_time, user.progress_reminder_time):
+            if value is not None:
+                reminder_service.validate_time(value)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    # 创建新用户，bcrypt 计算在独立进程池中完成
+    hashed_password = await password_hasher.hash(user.password)
     db_user = UserModel(
         username=user.username,
         email=user.email,
-        hashed_password=hashed_password
+        hashed_password=hashed_password,
+        timezone=user.timezone,
+        daily_reminder_time=user.daily_reminder_time,
+        progress_reminder_time=user.progress_reminder_time
     )
+    reminder_service.schedule_user(db_user)
     
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     
     return db_user
 
 @router.get("/me", response_model=User)
-def get_current_user(db: Session = Depends(get_db)):
+def get_current_user(db: Session = Depends(get_read_db)):
     """获取当前用户信息"""
     # 这里简化处理，假设用户ID为1，实际应该有用户认证
     from models.models import User as UserModel
     user = db.query(UserModel).filter(UserModel.id == 1).first()
     if not user:
         raise HTTPException(status_code=404, detail="用户未找到")
-    return user 
\ No newline at end of file
+    return user 
+
+@router.put("/me/preferences", response_model=User)
+def update_preferences(preferences: UserPreferences, db: Session = Depends(get_db)):
+    """更新当前用户的时区和提醒时间"""
+    # 这里简化处理，假设用户ID为1，实际应该有用户认证
+    from models.models import User as UserModel
+    user = db.query(UserModel).filter(UserModel.id == 1).first()
+    if not user:
+        raise HTTPException(status_code=404, detail="用户未找到")
+    
+    try:
+        return ReminderService().update_preferences(db, user, preferences)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
\ No newline at end of file
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+仪表板分析数据基准测试
+在生成的约 100 万条任务上对比：
+1. 7/30/365 天完成趋势：直接按截止日期聚合任务表 vs 读取预先汇总的 daily_stats
+2. 类别统计：按类别逐个加载目标列表计数 vs 一次 GROUP BY
+3. 任务状态更新时维护每日统计的额外开销
+
+运行: python benchmarks/bench_analytics.py [任务数] [数据库路径]
+（复用 bench_task_query 生成的数据库）
+"""
+
+import os
+import sys
+import tempfile
+import time
+from datetime import timedelta
+
+import common  # noqa: F401  设置导入路径
+from sqlalchemy import create_engine, case, func, select, text
+from sqlalchemy.orm import sessionmaker
+
+from bench_task_query import START, SPREAD_DAYS, USERS, TASKS_PER_GOAL, generate
+from models.database import Base
+from models.migrations import rebuild_daily_stats
+from models.models import Task
+from services.dashboard_stats_service import DashboardStatsService
+from services.goal_service import GoalService
+from services.task_service import TaskService
+
+REPEAT = 5
+TODAY = (START + timedelta(days=SPREAD_DAYS // 2)).date()
+
+def median_ms(fn) -> float:
+    timings = []
+    for _ in range(REPEAT):
+        t0 = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - t0) * 1000)
+    timings.sort()
+    return timings[len(timings) // 2]
+
+def trend_from_tasks(db, days: int):
+    """不使用汇总表：按截止日期对任务表分组聚合"""
+    day = func.date(Task.due_date)
+    start = TODAY - timedelta(days=days)
+    return db.execute(
+        select(
+            day,
+            func.count(Task.id),
+            func.sum(case((Task.status == "completed", 1), else_=0)),
+            func.sum(Task.estimated_duration)
+        ).where(Task.user_id == 1, Task.due_date >= start, Task.due_date < TODAY).group_by(day)
+    ).all()
+
+def categories_by_listing(db):
+    """原实现：每个类别加载一次完整的目标列表再计数"""
+    service = GoalService()
+    return {category: len(service.get_goals_by_category(db, 1, category))
+            for category in DashboardStatsService.CATEGORIES}
+
+def plan(engine, statement) -> str:
+    compiled = statement.compile(engine, compile_kwargs={"literal_binds": True})
+    with engine.connect() as conn:
+        return "; ".join(row[3] for row in conn.execute(text(f"EXPLAIN QUERY PLAN {compiled}")))
+
+def main():
+    total_tasks = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    path = sys.argv[2] if len(sys.argv) > 2 else os.path.join(tempfile.gettempdir(), f"bench_task_query_{total_tasks}.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    if db.scalar(select(func.count(Task.id))) != total_tasks // USERS // TASKS_PER_GOAL * USERS * TASKS_PER_GOAL:
+        db.close()
+        engine.dispose()
+        os.remove(path)
+        engine = create_engine(f"sqlite:///{path}")
+        Base.metadata.create_all(bind=engine)
+        generate(engine, total_tasks)
+        db = sessionmaker(bind=engine)()
+    
+    t0 = time.perf_counter()
+    rebuild_daily_stats(engine)
+    print(f"任务数 {db.scalar(select(func.count(Task.id)))}，全量重建 daily_stats 耗时 "
+          f"{(time.perf_counter() - t0) * 1000:.0f} ms")
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE"))
+    
+    stats_service = DashboardStatsService()
+    print(f"\n{'查询':<20} | {'聚合任务表 ms':>13} | {'daily_stats ms':>14}")
+    print("-" * 56)
+    for days in (7, 30, 365):
+        from_tasks = median_ms(lambda: trend_from_tasks(db, days))
+        from_rollup = median_ms(lambda: stats_service.get_analytics(db, 1, days=days, today=TODAY))
+        print(f"{f'{days} 天完成趋势':<20} | {from_tasks:>13.2f} | {from_rollup:>14.2f}")
+    listing = median_ms(lambda: categories_by_listing(db))
+    grouped = median_ms(lambda: db.execute(stats_service.category_counts_statement(1)).all())
+    print(f"{'类别统计':<20} | {listing:>13.2f} | {grouped:>14.2f}  (逐类加载目标 vs GROUP BY)")
+    print(f"\n趋势查询计划: {plan(engine, stats_service.daily_stats_statement(1, TODAY - timedelta(days=365), TODAY))}")
+    print(f"类别查询计划: {plan(engine, stats_service.category_counts_statement(1))}")
+    
+    # 写路径：状态更新在同一事务内多一条 UPSERT
+    task_service = TaskService()
+    original = db.execute(select(Task.id, Task.status).where(Task.user_id == 1).limit(200)).all()
+    task_ids = [row.id for row in original]
+    statuses = ["completed", "pending"]
+    
+    def toggle():
+        for i, task_id in enumerate(task_ids):
+            task_service.update_task_status(db, task_id, statuses[i % 2])
+    
+    elapsed = median_ms(toggle)
+    print(f"\n任务状态更新（含每日统计维护）: {elapsed / len(task_ids):.3f} ms/次")
+    # 恢复原状态，数据库可继续供 bench_task_query 使用
+    for row in original:
+        task_service.update_task_status(db, row.id, row.status)
+    db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+日历接口基准测试
+对比逐日调用 get_daily_tasks 与单次区间查询的SQL数量和耗时
+
+运行: python benchmarks/bench_calendar.py
+"""
+
+import time
+from datetime import datetime, timedelta
+
+from common import make_session, seed_user, QueryCounter
+from services.task_service import TaskService
+
+def legacy_calendar(task_service, db, user_id, start, end):
+    """原实现：逐日查询"""
+    calendar_tasks = []
+    current_date = start
+    while current_date <= end:
+        daily_tasks = task_service.get_daily_tasks(db, user_id=user_id, target_date=current_date)
+        if daily_tasks:
+            calendar_tasks.append({
+                "date": current_date.strftime("%Y-%m-%d"),
+                # get_daily_tasks 不保证顺序，按任务ID排序后与新实现比较
+                "tasks": [
+                    {"id": task.id, "title": task.title, "status": task.status, "priority": task.priority}
+                    for task in sorted(daily_tasks, key=lambda task: task.id)
+                ]
+            })
+        current_date += timedelta(days=1)
+    return calendar_tasks
+
+def range_calendar(task_service, db, user_id, start, end):
+    """新实现：单次区间查询后按日期分组"""
+    return list(task_service.iter_calendar_tasks(db, user_id=user_id, start_date=start, end_date=end))
+
+def main():
+    engine, db = make_session()
+    user = seed_user(db, goals=20, tasks_per_goal=100)
+    task_service = TaskService()
+    start = datetime(2024, 1, 1)
+    
+    print(f"{'天数':>6} | {'逐日SQL数':>10} | {'区间SQL数':>10} | {'逐日耗时ms':>12} | {'区间耗时ms':>12} | 结果一致")
+    print("-" * 80)
+    for days in (7, 30, 90, 365):
+        end = start + timedelta(days=days - 1)
+        
+        with QueryCounter(engine) as legacy_counter:
+            t0 = time.perf_counter()
+            expected = legacy_calendar(task_service, db, user.id, start, end)
+            legacy_ms = (time.perf_counter() - t0) * 1000
+        
+        with QueryCounter(engine) as range_counter:
+            t0 = time.perf_counter()
+            actual = range_calendar(task_service, db, user.id, start, end)
+            range_ms = (time.perf_counter() - t0) * 1000
+        
+        print(f"{days:>6} | {legacy_counter.count:>10} | {range_counter.count:>10} | "
+              f"{legacy_ms:>12.1f} | {range_ms:>12.1f} | {expected == actual}")
+    
+    db.close()
+
+if __name__ == "__main__":
+    main()
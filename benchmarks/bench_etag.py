@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+仪表板轮询的条件请求基准测试
+模拟多个仪表板标签页每 5 分钟请求一次仪表板的四个接口，期间穿插少量写入，
+对比无条件请求、带 If-None-Match 的条件请求、条件请求 + 读缓存三种方式下每分钟的数据库查询数
+
+运行: python benchmarks/bench_etag.py [标签页数] [轮询轮数] [每几轮一次写入]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+# 使用独立的临时数据库，需在导入应用模块前设置
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_etag.db')}"
+
+from datetime import datetime, timedelta
+
+import common  # noqa: F401  设置导入路径
+from common import QueryCounter, seed_user
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import api
+import api.conditional
+import services.read_cache
+from models.database import Base, SessionLocal, engine, read_engine, async_read_engine
+from models.models import Task
+from services.read_cache import read_cache
+
+POLL_INTERVAL_MINUTES = 5
+
+class SimulatedClock:
+    """模拟时间：每轮轮询前进 5 分钟，使 ETag 时间段和读缓存有效期按真实节奏过期"""
+    
+    def __init__(self):
+        self.now = time.time()
+    
+    def time(self):
+        return self.now
+    
+    def monotonic(self):
+        return self.now
+    
+    def time_ns(self):
+        return int(self.now * 1e9)
+    
+    def install(self):
+        api.conditional.time = self
+        services.read_cache.time = self
+
+def make_client() -> TestClient:
+    app = FastAPI()
+    for name in api.__all__:
+        app.include_router(getattr(api, name), prefix="/api")
+    return TestClient(app)
+
+def dashboard_urls():
+    return [
+        "/api/dashboard/summary",
+        "/api/dashboard/goals/progress",
+        f"/api/tasks/daily/{datetime.utcnow():%Y-%m-%d}",
+        "/api/dashboard/analytics",
+    ]
+
+def run(client, task_ids, tabs, rounds, write_every, conditional, cached):
+    """返回 (读查询总数, 200 响应数, 304 响应数)"""
+    read_cache.enabled = cached
+    clock = SimulatedClock()
+    clock.install()
+    etags = [{} for _ in range(tabs)]
+    counters = [QueryCounter(read_engine), QueryCounter(async_read_engine.sync_engine)]
+    queries = full = not_modified = 0
+    for round_no in range(rounds):
+        clock.now += POLL_INTERVAL_MINUTES * 60
+        # 每隔 write_every 轮有一次任务状态更新
+        if round_no % write_every == write_every - 1:
+            client.put(f"/api/tasks/{task_ids[round_no % len(task_ids)]}/status",
+                       params={"status": ["completed", "pending"][round_no // write_every % 2]})
+        for counter in counters:
+            counter.__enter__()
+        for tab in range(tabs):
+            for url in dashboard_urls():
+                headers = {"If-None-Match": etags[tab][url]} if conditional and url in etags[tab] else {}
+                response = client.get(url, headers=headers)
+                if response.status_code == 304:
+                    not_modified += 1
+                else:
+                    full += 1
+                    etags[tab][url] = response.headers.get("ETag")
+        for counter in counters:
+            counter.__exit__(None, None, None)
+            queries += counter.count
+    return queries, full, not_modified
+
+def main():
+    tabs = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 12
+    write_every = int(sys.argv[3]) if len(sys.argv) > 3 else 4
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    seed_user(db, goals=20, tasks_per_goal=50, start=datetime.utcnow() - timedelta(days=30), spread_days=90)
+    task_ids = [task_id for (task_id,) in db.query(Task.id).limit(rounds)]
+    db.close()
+    client = make_client()
+    
+    minutes = rounds * POLL_INTERVAL_MINUTES
+    print(f"{tabs} 个标签页，每 {POLL_INTERVAL_MINUTES} 分钟轮询 4 个接口，共 {rounds} 轮，每 {write_every} 轮 1 次写入\n")
+    print(f"{'方式':<20} | {'查询/分钟':>10} | {'200 响应':>8} | {'304 响应':>8}")
+    print("-" * 58)
+    baseline = None
+    for label, conditional, cached in (
+        ("无条件请求", False, False),
+        ("条件请求 (ETag)", True, False),
+        ("条件请求 + 读缓存", True, True),
+    ):
+        queries, full, not_modified = run(client, task_ids, tabs, rounds, write_every, conditional, cached)
+        per_minute = queries / minutes
+        baseline = baseline or per_minute
+        print(f"{label:<20} | {per_minute:>10.1f} | {full:>8} | {not_modified:>8}   "
+              f"(减少 {(1 - per_minute / baseline) * 100:.1f}%)")
+
+if __name__ == "__main__":
+    main()
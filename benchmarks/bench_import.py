@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+批量导入基准测试
+对比原实现（plan_goals 生成任务字典后逐个转换为插入行）与批量规划器（进程内 / 进程池）
+在不同批量大小下的单批耗时和任务吞吐量，并校验生成的任务行与原实现一致
+
+运行: python benchmarks/bench_import.py [进程数]
+"""
+
+import os
+import sys
+import tempfile
+
+import common  # noqa: F401  设置导入路径
+from bench_planner import random_goals, timed
+from common import make_session
+from models.models import User
+from services.ai_planner import AIPlanner
+from services.bulk_planner import BatchImportMetrics, BulkPlanner
+from services.goal_service import GoalService
+import services.goal_service as goal_service_module
+
+def legacy_rows(planner, goals, goal_ids):
+    """原实现：先生成每个目标的任务字典，再逐个复制为带 goal_id 的插入行"""
+    rows = []
+    for goal_id, tasks in zip(goal_ids, planner.plan_goals(goals)):
+        rows.extend({
+            "title": task["title"],
+            "description": task["description"],
+            "due_date": task["due_date"],
+            "priority": task["priority"],
+            "estimated_duration": task["estimated_duration"],
+            "goal_id": goal_id
+        } for task in tasks)
+    return rows
+
+def bench_planning(workers):
+    planner = AIPlanner()
+    in_process = BulkPlanner(max_workers=1)
+    pool = BulkPlanner(max_workers=workers, process_min_goals=0)
+    # 预热进程池：非 fork 方式下子进程按需启动，每个进程分到一块才会全部启动
+    warmup = pool.chunk_size * workers
+    pool.plan_task_rows(random_goals(warmup), list(range(warmup)), planner)
+    
+    print(f"{'目标数':>8} | {'原实现 ms':>10} | {'进程内 ms':>10} | {f'进程池({workers}) ms':>14} | 结果一致")
+    print("-" * 68)
+    for count in (100, 1000, 10000, 50000):
+        goals = random_goals(count)
+        goal_ids = list(range(1, count + 1))
+        expected, legacy_ms = timed(lambda: legacy_rows(planner, goals, goal_ids))
+        actual, local_ms = timed(lambda: in_process.plan_task_rows(goals, goal_ids, planner))
+        pooled, pool_ms = timed(lambda: pool.plan_task_rows(goals, goal_ids, planner))
+        print(f"{count:>8} | {legacy_ms:>10.1f} | {local_ms:>10.1f} | {pool_ms:>14.1f} | "
+              f"{expected == actual == pooled}")
+    pool.shutdown()
+
+def bench_import():
+    """端到端导入（文件数据库）：每批的规划、写入耗时和任务/秒"""
+    print(f"\n{'目标数':>8} | {'任务数':>8} | {'进程':>4} | {'规划 ms':>8} | {'写入 ms':>8} | {'总计 ms':>8} | {'任务/秒':>10}")
+    print("-" * 78)
+    with tempfile.TemporaryDirectory() as tmp:
+        engine, db = make_session(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        user = User(username="bench_user", email="bench_user@example.com", hashed_password="x")
+        db.add(user)
+        db.commit()
+        service = GoalService()
+        for count in (100, 1000, 10000):
+            metrics = BatchImportMetrics()
+            service.create_goals(db, random_goals(count), user.id, metrics=metrics)
+            print(f"{metrics.goals:>8} | {metrics.tasks:>8} | {metrics.workers:>4} | {metrics.plan_ms:>8.1f} | "
+                  f"{metrics.insert_ms:>8.1f} | {metrics.total_ms:>8.1f} | {metrics.tasks_per_second:>10.0f}")
+        db.close()
+        engine.dispose()
+
+def main():
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else max(os.cpu_count() or 1, 2)
+    print(f"CPU 核数: {os.cpu_count()}\n")
+    bench_planning(workers)
+    # 端到端导入使用默认配置（按 CPU 核数和阈值决定是否启用进程池）
+    bench_import()
+    goal_service_module.bulk_planner.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+模型规划器基准测试（使用本地模拟模型服务）
+并发提交大量目标（其中只有少量不同内容），统计模型调用数、缓存命中、请求合并、峰值并发，
+以及模型响应超时时回退到模板规划的耗时
+
+运行: python benchmarks/bench_model_planner.py
+"""
+
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import common  # noqa: F401  设置导入路径
+from fake_model_server import make_app, serve_in_thread
+from services.ai_planner import AIPlanner
+from services.model_planner import ModelPlanner
+from services.planner_backends import HTTPModelBackend
+
+PORT = 8765
+CATEGORIES = ["健身", "学习", "工作", "其他"]
+
+def make_goals(count, distinct):
+    """count 个目标，内容只有 distinct 种，开始时间各不相同"""
+    start = datetime(2024, 1, 1)
+    return [
+        SimpleNamespace(
+            title=f"目标{i % distinct}",
+            description="描述",
+            category=CATEGORIES[i % distinct % len(CATEGORIES)],
+            start_date=start + timedelta(days=i),
+            end_date=start + timedelta(days=i + 60)
+        )
+        for i in range(count)
+    ]
+
+def run(planner, goals, label):
+    t0 = time.perf_counter()
+    plans = planner.plan_goals(goals)
+    elapsed = (time.perf_counter() - t0) * 1000
+    print(f"{label:<22} | {len(goals):>6} | {elapsed:>9.1f} | {planner.stats}")
+    return plans
+
+def main():
+    app = make_app(latency=0.2)
+    server = serve_in_thread(app, PORT)
+    planner = ModelPlanner(HTTPModelBackend(f"http://127.0.0.1:{PORT}/plan"), timeout=2.0, max_concurrency=4)
+    try:
+        print(f"{'场景':<22} | {'目标数':>6} | {'耗时 ms':>9} | 统计")
+        print("-" * 100)
+        goals = make_goals(1000, 20)
+        plans = run(planner, goals, "冷启动（20 种内容）")
+        print(f"  模拟服务: {app.state.stats}（调用数应为 20，峰值并发不超过 4）")
+        
+        run(planner, make_goals(1000, 20), "缓存命中")
+        
+        # 截止时间按各自的开始时间还原
+        template = AIPlanner()
+        goal = goals[21]
+        expected = template.plan_goal(goal.title, goal.description, goal.category, goal.start_date, goal.end_date)
+        print(f"  截止时间一致: {[t['due_date'] for t in plans[21]] == [t['due_date'] for t in expected]}")
+        
+        # 模型响应慢于超时时间：回退到模板规划，且失败结果不缓存
+        app.state.latency = 5.0
+        planner.timeout = 0.5
+        slow = make_goals(50, 50)
+        for g in slow:
+            g.title += "-慢"
+        plans = run(planner, slow, "超时回退（50 种内容）")
+        print(f"  全部为模板规划: {all(not t['title'].startswith('[模型]') for plan in plans for t in plan)}")
+    finally:
+        planner.shutdown()
+        server.should_exit = True
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+任务规划基准测试
+对比原实现（每次实例化重建模板字典、通用模板每次调用新建）与共享模板注册表的 plan_goal 吞吐量，
+逐个 plan_goal 与 NumPy 批量 plan_goals 的吞吐量，以及按日查询时线性扫描与计划索引的耗时
+
+运行: python benchmarks/bench_planner.py
+"""
+
+import gc
+import random
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import common  # noqa: F401  设置导入路径
+from services.ai_planner import AIPlanner
+from services.task_templates import BUILTIN_TEMPLATES, GENERIC_CATEGORY
+
+def build_template_dict(stages):
+    """逐个新建嵌套字典，开销与原实现中的字典字面量相当"""
+    return {
+        stage_name: {
+            "duration_weeks": stage_info["duration_weeks"],
+            "tasks": [dict(task) for task in stage_info["tasks"]]
+        }
+        for stage_name, stage_info in stages.items()
+    }
+
+class LegacyAIPlanner:
+    """原实现：__init__ 中构建完整的嵌套模板字典"""
+    
+    def __init__(self):
+        self.task_templates = {
+            category: build_template_dict(stages)
+            for category, stages in BUILTIN_TEMPLATES.items()
+            if category != GENERIC_CATEGORY
+        }
+    
+    def plan_goal(self, goal_title, goal_description, category, start_date, end_date):
+        if category in self.task_templates:
+            template = self.task_templates[category]
+        else:
+            template = self._get_generic_template()
+        
+        tasks = []
+        current_date = start_date
+        for stage_name, stage_info in template.items():
+            if current_date >= end_date:
+                break
+            stage_end_date = min(current_date + timedelta(weeks=stage_info["duration_weeks"]), end_date)
+            stage_tasks = stage_info["tasks"]
+            days_per_task = (stage_end_date - current_date).days // len(stage_tasks)
+            for i, task_template in enumerate(stage_tasks):
+                task_due_date = current_date + timedelta(days=i * days_per_task)
+                if task_due_date >= end_date:
+                    break
+                tasks.append({
+                    "title": f"{stage_name}: {task_template['title']}",
+                    "description": task_template['description'],
+                    "due_date": task_due_date,
+                    "priority": "medium",
+                    "estimated_duration": task_template['duration']
+                })
+            current_date = stage_end_date
+        return tasks
+    
+    def _get_generic_template(self):
+        return build_template_dict(BUILTIN_TEMPLATES[GENERIC_CATEGORY])
+
+CATEGORIES = ["健身", "学习", "工作", "其他"]
+
+def run(planner_factory, iterations, per_request):
+    """per_request 为 True 时模拟每个请求新建规划器（GoalService() 的用法）"""
+    start = datetime(2024, 1, 1)
+    end = start + timedelta(days=60)
+    planner = planner_factory()
+    results = []
+    t0 = time.perf_counter()
+    for i in range(iterations):
+        if per_request:
+            planner = planner_factory()
+        results.append(planner.plan_goal("目标", "描述", CATEGORIES[i % len(CATEGORIES)], start, end))
+    return iterations / (time.perf_counter() - t0), results
+
+def random_goals(count, seed=1):
+    """生成开始时间和时长随机的目标"""
+    rng = random.Random(seed)
+    goals = []
+    for i in range(count):
+        start = datetime(2024, 1, 1) + timedelta(seconds=rng.randint(0, 10 ** 8))
+        goals.append(SimpleNamespace(
+            title=f"目标{i}",
+            description="描述",
+            category=CATEGORIES[i % len(CATEGORIES)],
+            start_date=start,
+            end_date=start + timedelta(days=rng.randint(7, 120))
+        ))
+    return goals
+
+def timed(func):
+    """关闭 GC 计时（与 timeit 一致），避免前一次结果占用的内存触发回收影响后一次"""
+    gc.collect()
+    gc.disable()
+    try:
+        t0 = time.perf_counter()
+        result = func()
+        return result, (time.perf_counter() - t0) * 1000
+    finally:
+        gc.enable()
+
+def bench_batch(planner):
+    print(f"\n{'目标数':>8} | {'逐个 plan_goal ms':>16} | {'plan_goals ms':>13} | {'任务/秒':>10} | 结果一致")
+    print("-" * 72)
+    for count in (100, 1000, 10000):
+        goals = random_goals(count)
+        expected, single_ms = timed(lambda: [
+            planner.plan_goal(g.title, g.description, g.category, g.start_date, g.end_date) for g in goals
+        ])
+        actual, batch_ms = timed(lambda: planner.plan_goals(goals))
+        tasks = sum(len(plan) for plan in actual)
+        print(f"{count:>8} | {single_ms:>16.1f} | {batch_ms:>13.1f} | {tasks / batch_ms * 1000:>10.0f} | {expected == actual}")
+
+def bench_index(planner):
+    plans = planner.plan_goals(random_goals(500))
+    all_tasks = [task for plan in plans for task in plan]
+    days = [datetime(2024, 1, 1) + timedelta(days=d) for d in range(365 * 3)]
+    
+    t0 = time.perf_counter()
+    expected = [planner.get_daily_tasks(all_tasks, day) for day in days]
+    scan_ms = (time.perf_counter() - t0) * 1000
+    
+    t0 = time.perf_counter()
+    index = planner.index_plan(all_tasks)
+    actual = [index.tasks_on(day) for day in days]
+    index_ms = (time.perf_counter() - t0) * 1000
+    
+    print(f"\n按日查询 {len(days)} 天 / {len(all_tasks)} 个任务: 线性扫描 {scan_ms:.1f} ms, "
+          f"计划索引（含建索引）{index_ms:.1f} ms, 结果一致: {expected == actual}")
+
+def main():
+    iterations = 20000
+    print(f"{'场景':<16} | {'原实现 次/秒':>12} | {'注册表 次/秒':>12} | {'提升':>6} | 结果一致")
+    print("-" * 70)
+    for label, per_request in (("复用规划器", False), ("每请求新建规划器", True)):
+        legacy_rate, expected = run(LegacyAIPlanner, iterations, per_request)
+        registry_rate, actual = run(AIPlanner, iterations, per_request)
+        print(f"{label:<16} | {legacy_rate:>12.0f} | {registry_rate:>12.0f} | "
+              f"{registry_rate / legacy_rate:>5.1f}x | {expected == actual}")
+    
+    planner = AIPlanner()
+    bench_batch(planner)
+    bench_index(planner)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+全文检索基准测试
+用批量导入生成中文目标和任务，对比：
+1. 有无 FTS 同步触发器时的导入吞吐量
+2. 各类检索词在 FTS5（trigram）索引上与直接 LIKE 扫描原表的耗时
+
+运行: python benchmarks/bench_search.py [目标数]
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import common  # noqa: F401  设置导入路径
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from models.database import Base
+from models.migrations import ensure_search_index
+from models.models import User
+from models.schemas import GoalCreate
+from services.goal_service import GoalService
+from services.search_service import SearchService
+
+CATEGORIES = ["健身", "学习", "工作", "其他"]
+REPEAT = 5
+
+def make_goals(count: int):
+    start = datetime(2024, 1, 1)
+    return [
+        GoalCreate(
+            title=f"{CATEGORIES[i % 4]}目标{i}：坚持{i % 9 + 1}个月",
+            description=f"第{i}个目标，按照科学的计划逐步推进，每周复盘一次进度并调整安排",
+            category=CATEGORIES[i % 4],
+            start_date=start,
+            end_date=start + timedelta(days=30 + i % 90)
+        )
+        for i in range(count)
+    ]
+
+def import_goals(path: str, goals, with_search_index: bool):
+    """导入目标和任务，返回 (任务/秒, 任务数)"""
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    if with_search_index:
+        ensure_search_index(engine)
+    db = sessionmaker(bind=engine)()
+    db.add(User(id=1, username="bench_user", email="bench@example.com", hashed_password="x"))
+    db.commit()
+    t0 = time.perf_counter()
+    created = GoalService().create_goals(db, goals, user_id=1)
+    elapsed = time.perf_counter() - t0
+    tasks = sum(goal.total_count for goal in created)
+    db.close()
+    engine.dispose()
+    return tasks / elapsed, tasks
+
+async def time_async(fn) -> float:
+    timings = []
+    for _ in range(REPEAT):
+        t0 = time.perf_counter()
+        await fn()
+        timings.append((time.perf_counter() - t0) * 1000)
+    timings.sort()
+    return timings[len(timings) // 2]
+
+async def bench_queries(path: str):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    service = SearchService()
+    print(f"\n{'检索词':<16} | {'FTS5 ms':>8} | {'LIKE 扫描 ms':>12} | {'命中(目标/任务)':>16} | 首条片段")
+    print("-" * 110)
+    async with AsyncSession(engine) as db:
+        for query in ("健身", "科学的计划", "每周复盘", "坚持3个月", "学习 计划", "不存在的内容"):
+            result = await service.search(db, 1, query, limit=20)
+            fts_ms = await time_async(lambda: service.search(db, 1, query, limit=20))
+
+            # 对照：不使用索引，直接对原表的标题、描述做 LIKE 扫描
+            conditions = " AND ".join(
+                f"(title LIKE '%{term}%' OR description LIKE '%{term}%')" for term in query.split()
+            )
+
+            async def scan():
+                for table in ("goals", "tasks"):
+                    await db.execute(text(
+                        f"SELECT id, title FROM {table} WHERE user_id = 1 AND {conditions} ORDER BY id DESC LIMIT 20"
+                    ))
+
+            like_ms = await time_async(scan)
+            first = (result["goals"] or result["tasks"] or [{"snippet": ""}])[0]["snippet"]
+            hits = f"{len(result['goals'])}/{len(result['tasks'])}"
+            print(f"{query:<16} | {fts_ms:>8.2f} | {like_ms:>12.2f} | {hits:>16} | {first[:50]}")
+    await engine.dispose()
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    goals = make_goals(count)
+    directory = tempfile.mkdtemp()
+    plain, _ = import_goals(os.path.join(directory, "plain.db"), goals, with_search_index=False)
+    path = os.path.join(directory, "search.db")
+    indexed, tasks = import_goals(path, goals, with_search_index=True)
+    print(f"{count} 个目标、{tasks} 个任务")
+    print(f"导入吞吐量: 无全文索引 {plain:,.0f} 任务/秒，带 FTS 触发器 {indexed:,.0f} 任务/秒 "
+          f"({(indexed / plain - 1) * 100:+.1f}%)")
+    asyncio.run(bench_queries(path))
+
+if __name__ == "__main__":
+    main()
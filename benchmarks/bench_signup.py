@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+注册接口密码哈希吞吐量基准测试
+对比原实现（每次请求新建 CryptContext，在线程池中内联哈希）与进程池哈希服务
+
+运行: python benchmarks/bench_signup.py [注册数量] [bcrypt成本因子]
+"""
+
+import asyncio
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import common  # noqa: F401  设置导入路径
+from passlib.context import CryptContext
+from services.password_service import PasswordHasher
+
+def legacy_hash(password: str, rounds: int) -> str:
+    """原实现：每次调用都构造新的 CryptContext"""
+    pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=rounds)
+    return pwd_context.hash(password)
+
+def bench_legacy(count: int, rounds: int) -> float:
+    """模拟 FastAPI 默认的 40 线程线程池"""
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=40) as pool:
+        list(pool.map(legacy_hash, [f"password{i}" for i in range(count)], [rounds] * count))
+    return time.perf_counter() - t0
+
+async def bench_hasher(count: int, rounds: int) -> float:
+    # 显式指定进程数：单核机器上默认不使用进程池
+    hasher = PasswordHasher(rounds=rounds, max_workers=os.cpu_count() or 1)
+    # 预热进程池，排除子进程启动时间
+    await hasher.hash("warmup")
+    t0 = time.perf_counter()
+    await asyncio.gather(*(hasher.hash(f"password{i}") for i in range(count)))
+    elapsed = time.perf_counter() - t0
+    hasher.shutdown()
+    return elapsed
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    
+    legacy_seconds = bench_legacy(count, rounds)
+    hasher_seconds = asyncio.run(bench_hasher(count, rounds))
+    
+    print(f"注册数量: {count}, bcrypt成本因子: {rounds}, CPU核数: {os.cpu_count()}")
+    print(f"原实现（线程池内联哈希）: {count / legacy_seconds:8.1f} 次/秒")
+    print(f"进程池哈希服务:           {count / hasher_seconds:8.1f} 次/秒")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+仪表板变更推送（SSE）基准测试
+打开大量空闲的 /events 连接，测量每个连接的内存占用、空闲时的 CPU 占用，
+以及一次任务状态更新推送到全部连接的延迟
+
+运行: python benchmarks/bench_sse.py [连接数] [更新次数]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+# 使用独立的临时数据库，需在导入应用模块前设置
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_sse.db')}"
+
+import asyncio
+import resource
+from datetime import datetime
+
+import common  # noqa: F401  设置导入路径
+from common import seed_user
+from fake_model_server import serve_in_thread
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+
+import api
+import httpx
+from models.database import Base, SessionLocal, engine
+from models.models import Task
+from services.change_stream import change_stream
+
+PORT = 8013
+
+def make_app() -> FastAPI:
+    """API 路由加上与 main.py 相同的 /events 推送接口"""
+    app = FastAPI()
+    for name in api.__all__:
+        app.include_router(getattr(api, name), prefix="/api")
+    
+    @app.get("/events")
+    async def dashboard_events():
+        return StreamingResponse(change_stream.iter_sse(user_id=1), media_type="text/event-stream")
+    
+    return app
+
+def rss_mb() -> float:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * resource.getpagesize() / 1024 / 1024
+
+async def open_connection():
+    """打开一个 SSE 连接并等待 ready 事件"""
+    reader, writer = await asyncio.open_connection("127.0.0.1", PORT)
+    writer.write(b"GET /events HTTP/1.1\r\nHost: localhost\r\nAccept: text/event-stream\r\n\r\n")
+    await writer.drain()
+    await reader.readuntil(b"event: ready")
+    return reader, writer
+
+async def wait_for_event(reader, name: bytes) -> float:
+    await reader.readuntil(b"event: " + name)
+    return time.perf_counter()
+
+async def main():
+    connections = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    updates = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    seed_user(db, goals=4, tasks_per_goal=20, start=datetime.utcnow())
+    task_ids = [task_id for (task_id,) in db.query(Task.id).limit(updates)]
+    db.close()
+    
+    server = serve_in_thread(make_app(), PORT)
+    rss_before = rss_mb()
+    t0 = time.perf_counter()
+    streams = []
+    for i in range(0, connections, 200):
+        streams += await asyncio.gather(*(open_connection() for _ in range(min(200, connections - i))))
+    open_seconds = time.perf_counter() - t0
+    rss_after = rss_mb()
+    print(f"{connections} 个连接建立耗时 {open_seconds:.2f}s，服务端记录连接数 {change_stream.connection_count()}")
+    print(f"内存增加 {rss_after - rss_before:.1f} MB，每连接 {(rss_after - rss_before) * 1024 / connections:.1f} KB"
+          f"（同进程内客户端和服务端合计）")
+    
+    # 空闲期间的 CPU 占用
+    cpu_before = time.process_time()
+    await asyncio.sleep(2)
+    print(f"空闲 2s 的 CPU 时间: {(time.process_time() - cpu_before) * 1000:.1f} ms")
+    
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{PORT}") as client:
+        latencies = []
+        for n, task_id in enumerate(task_ids):
+            waiters = [asyncio.create_task(wait_for_event(reader, b"task_status")) for reader, _ in streams]
+            start = time.perf_counter()
+            response = await client.put(f"/api/tasks/{task_id}/status",
+                                        params={"status": ["completed", "pending"][n % 2]})
+            response.raise_for_status()
+            received = await asyncio.gather(*waiters)
+            latencies.append((max(received) - start) * 1000)
+        latencies.sort()
+        print(f"一次状态更新推送到全部 {connections} 个连接: 中位数 {latencies[len(latencies) // 2]:.1f} ms，"
+              f"最大 {latencies[-1]:.1f} ms（含 PUT 请求本身）")
+    
+    for _, writer in streams:
+        writer.close()
+    await asyncio.sleep(0.5)
+    print(f"关闭后服务端连接数: {change_stream.connection_count()}")
+    server.should_exit = True
+
+if __name__ == "__main__":
+    asyncio.run(main())
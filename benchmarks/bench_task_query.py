@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+任务组合查询基准测试
+生成约 100 万条任务的 SQLite 数据库，对比任务表上不建和建立以 user_id 开头的索引时，
+TaskQuery 各种过滤、排序、翻页组合的查询耗时和查询计划
+
+运行: python benchmarks/bench_task_query.py [任务数] [数据库路径]
+（数据库文件已存在且任务数相同时直接复用）
+"""
+
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import common  # noqa: F401  设置导入路径
+from sqlalchemy import create_engine, func, insert, select, text
+from sqlalchemy.orm import sessionmaker
+
+from models.database import Base
+from models.models import User, Goal, Task
+from services.task_query import TaskQuery
+from services.task_service import TaskService
+
+USERS = 4
+TASKS_PER_GOAL = 200
+START = datetime(2024, 1, 1)
+SPREAD_DAYS = 730
+REPEAT = 5
+
+def generate(engine, total_tasks: int):
+    """按用户、目标批量生成任务，截止时间均匀分布在两年内"""
+    goals_per_user = total_tasks // USERS // TASKS_PER_GOAL
+    statuses = ["pending", "in_progress", "completed", "pending"]
+    priorities = ["low", "medium", "high"]
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {"id": u + 1, "username": f"user{u}", "email": f"user{u}@example.com", "hashed_password": "x"}
+            for u in range(USERS)
+        ])
+        goal_id = 0
+        for u in range(USERS):
+            goals = []
+            tasks = []
+            for g in range(goals_per_user):
+                goal_id += 1
+                goals.append({
+                    "id": goal_id, "title": f"目标{goal_id}", "description": "基准测试目标", "category": "学习",
+                    "start_date": START, "end_date": START + timedelta(days=SPREAD_DAYS), "user_id": u + 1,
+                    "status": "active", "progress": 0.0, "total_count": TASKS_PER_GOAL, "completed_count": 0
+                })
+                for t in range(TASKS_PER_GOAL):
+                    # 各目标的任务在整个时间范围内交错分布
+                    minutes = (t * goals_per_user + g) * SPREAD_DAYS * 1440 // (goals_per_user * TASKS_PER_GOAL)
+                    tasks.append({
+                        "title": f"任务{goal_id}-{t}", "description": "基准测试任务",
+                        "due_date": START + timedelta(minutes=minutes),
+                        "priority": priorities[(t * 7 + g) % 3], "status": statuses[(t * 5 + g) % 4],
+                        "estimated_duration": 30, "goal_id": goal_id, "user_id": u + 1,
+                        "created_at": START
+                    })
+            conn.execute(insert(Goal), goals)
+            for i in range(0, len(tasks), 50000):
+                conn.execute(insert(Task), tasks[i:i + 50000])
+
+def user_indexes():
+    """任务表上以 user_id 开头的索引"""
+    return [index for index in Task.__table__.indexes if list(index.columns)[0].name == "user_id"]
+
+def scenarios(db):
+    """(名称, TaskQuery)；深翻页的游标取自真实数据"""
+    middle_id = db.scalar(select(func.max(Task.id)).where(Task.user_id == 1)) // 2
+    week = START + timedelta(days=365)
+    base = TaskQuery().page(limit=50)
+    first_goal = db.scalar(select(func.min(Goal.id)).where(Goal.user_id == 1))
+    deep = base.sorted_by("due_date").with_status("pending")
+    deep_rows = TaskService().query_tasks(db, 1, deep.page(limit=5000))
+    return [
+        ("全部任务 按ID 第一页", base),
+        ("全部任务 按ID 深翻页", base.page(after=str(middle_id), limit=50)),
+        ("待完成 按截止时间", base.with_status("pending").sorted_by("due_date")),
+        ("待完成或进行中 按截止时间", base.with_status("pending", "in_progress").sorted_by("due_date")),
+        ("待完成 按截止时间 深翻页", deep.page(after=deep.cursor_for(deep_rows[-1]), limit=50)),
+        ("高优先级 一周内 按截止时间", base.with_priority("high").due_between(week, week + timedelta(days=7))
+         .sorted_by("due_date")),
+        ("单日 按截止时间倒序", base.due_between(week, week + timedelta(days=1)).sorted_by("-due_date")),
+        ("目标 + 未完成 按截止时间", base.for_goal(first_goal).with_status("pending", "in_progress")
+         .sorted_by("due_date")),
+        ("目标 + 高优先级 + 区间", base.for_goal(first_goal).with_priority("high")
+         .due_between(START, START + timedelta(days=365)).sorted_by("due_date")),
+    ]
+
+def measure(engine, db, label):
+    print(f"\n== {label} ==")
+    print(f"{'查询':<28} | {'中位耗时(ms)':>12} | {'行数':>4} | 查询计划")
+    print("-" * 100)
+    service = TaskService()
+    for name, query in scenarios(db):
+        timings = []
+        for _ in range(REPEAT):
+            t0 = time.perf_counter()
+            rows = service.query_tasks(db, 1, query, fields=("title", "status", "due_date"))
+            timings.append((time.perf_counter() - t0) * 1000)
+        timings.sort()
+        stmt = query.statement(1, query.selected_fields(("title", "status", "due_date")))
+        compiled = stmt.compile(engine, compile_kwargs={"literal_binds": True})
+        with engine.connect() as conn:
+            plan = "; ".join(row[3] for row in conn.execute(text(f"EXPLAIN QUERY PLAN {compiled}")))
+        print(f"{name:<28} | {timings[len(timings) // 2]:>12.2f} | {len(rows):>4} | {plan}")
+
+def main():
+    total_tasks = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    path = sys.argv[2] if len(sys.argv) > 2 else os.path.join(tempfile.gettempdir(), f"bench_task_query_{total_tasks}.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    if db.scalar(select(func.count(Task.id))) != total_tasks // USERS // TASKS_PER_GOAL * USERS * TASKS_PER_GOAL:
+        db.close()
+        engine.dispose()
+        os.remove(path)
+        engine = create_engine(f"sqlite:///{path}")
+        Base.metadata.create_all(bind=engine)
+        t0 = time.perf_counter()
+        generate(engine, total_tasks)
+        print(f"生成 {total_tasks} 条任务耗时 {time.perf_counter() - t0:.1f}s")
+        db = sessionmaker(bind=engine)()
+    print(f"数据库: {path}，任务数 {db.scalar(select(func.count(Task.id)))}，用户数 {USERS}")
+    
+    indexes = user_indexes()
+    with engine.begin() as conn:
+        for index in indexes:
+            index.drop(bind=conn, checkfirst=True)
+        conn.execute(text("ANALYZE"))
+    measure(engine, db, "不建 user_id 索引")
+    
+    with engine.begin() as conn:
+        for index in indexes:
+            index.create(bind=conn, checkfirst=True)
+        conn.execute(text("ANALYZE"))
+    measure(engine, db, "索引: " + ", ".join(index.name for index in indexes))
+    db.close()
+
+if __name__ == "__main__":
+    main()
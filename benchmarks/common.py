@@ -0,0 +1,90 @@
+"""
+基准测试公共工具：内存数据库、测试数据生成与SQL计数
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from models.database import Base
+from models.models import User, Goal, Task
+from services.task_service import TaskService
+
+def make_session(url: str = "sqlite://"):
+    """创建独立的基准测试数据库会话，默认使用内存SQLite"""
+    engine = create_engine(
+        url,
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    return engine, sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+
+def seed_user(db, goals: int = 10, tasks_per_goal: int = 50, start: datetime = None,
+              spread_days: int = 365, username: str = "bench_user") -> User:
+    """生成一个带有目标和任务的测试用户，任务截止时间均匀分布在 spread_days 天内"""
+    start = start or datetime(2024, 1, 1)
+    user = User(username=username, email=f"{username}@example.com", hashed_password="x")
+    db.add(user)
+    db.flush()
+    
+    task_service = TaskService()
+    statuses = ["pending", "in_progress", "completed"]
+    priorities = ["low", "medium", "high"]
+    total = goals * tasks_per_goal
+    for g in range(goals):
+        goal = Goal(
+            title=f"目标{g}",
+            description="基准测试目标",
+            category=["健身", "学习", "工作", "其他"][g % 4],
+            start_date=start,
+            end_date=start + timedelta(days=spread_days),
+            user_id=user.id,
+            total_count=tasks_per_goal,
+            completed_count=sum(1 for t in range(tasks_per_goal) if statuses[t % 3] == "completed")
+        )
+        db.add(goal)
+        db.flush()
+        tasks = [
+            Task(
+                title=f"任务{g}-{t}",
+                description="基准测试任务",
+                due_date=start + timedelta(minutes=(g * tasks_per_goal + t) * spread_days * 1440 // total),
+                priority=priorities[t % 3],
+                status=statuses[t % 3],
+                estimated_duration=30,
+                goal_id=goal.id,
+                user_id=user.id
+            )
+            for t in range(tasks_per_goal)
+        ]
+        db.add_all(tasks)
+        # 与目标上的计数一样直接写入，每日统计需要同步累加
+        task_service.adjust_daily_stats(db, task_service.daily_deltas(tasks))
+    db.commit()
+    return user
+
+class QueryCounter:
+    """统计代码块内执行的SQL语句数量"""
+    
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+    
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+    
+    def __enter__(self):
+        self.count = 0
+        event.listen(self.engine, "before_cursor_execute", self._on_execute)
+        return self
+    
+    def __exit__(self, *exc):
+        event.remove(self.engine, "before_cursor_execute", self._on_execute)
+        return False
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+本地模拟模型服务，实现 HTTPModelBackend 的接口约定，可配置响应延迟，并统计调用次数和峰值并发
+
+运行: python benchmarks/fake_model_server.py [端口] [延迟秒数]
+然后设置 PLANNER_BACKEND=http PLANNER_MODEL_URL=http://127.0.0.1:8001/plan 启动应用
+"""
+
+import asyncio
+import sys
+import threading
+import time
+from datetime import datetime
+
+import common  # noqa: F401  设置导入路径
+import uvicorn
+from fastapi import FastAPI
+from services.ai_planner import AIPlanner
+
+def make_app(latency: float = 0.2) -> FastAPI:
+    """创建模拟模型服务；latency 可在运行中通过 app.state.latency 修改"""
+    app = FastAPI()
+    app.state.latency = latency
+    app.state.stats = {"calls": 0, "active": 0, "peak": 0}
+    planner = AIPlanner()
+    
+    @app.post("/plan")
+    async def plan(goal: dict):
+        stats = app.state.stats
+        stats["calls"] += 1
+        stats["active"] += 1
+        stats["peak"] = max(stats["peak"], stats["active"])
+        try:
+            await asyncio.sleep(app.state.latency)
+        finally:
+            stats["active"] -= 1
+        tasks = planner.plan_goal(
+            goal["title"], goal["description"], goal["category"],
+            datetime.fromisoformat(goal["start_date"]), datetime.fromisoformat(goal["end_date"])
+        )
+        # 标出由模型生成的任务，便于和模板回退区分
+        return {"tasks": [
+            {**task, "title": f"[模型] {task['title']}", "due_date": task["due_date"].isoformat()}
+            for task in tasks
+        ]}
+    
+    @app.get("/stats")
+    async def stats():
+        return app.state.stats
+    
+    return app
+
+def serve_in_thread(app: FastAPI, port: int) -> uvicorn.Server:
+    """在后台线程中启动服务，返回后可通过 server.should_exit = True 停止"""
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return server
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8001
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.2
+    uvicorn.run(make_app(latency), host="127.0.0.1", port=port)
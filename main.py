@@ -1,4 +1,5 @@
 from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi.middleware.cors import CORSMiddleware
@@ -8,15 +9,21 @@ from datetime import datetime
 # 导入模型和数据库
 from models.database import engine, Base
 from models import models
+from models.migrations import run_migrations
 
 # 导入API路由
-from api import goals_router, tasks_router, users_router, dashboard_router
+from api import goals_router, tasks_router, users_router, dashboard_router, notifications_router, search_router
 
 # 导入服务
 from services.notification_service import NotificationService
+from services.password_service import password_hasher
+from services.bulk_planner import bulk_planner
+from services.model_planner import model_planner
+from services.change_stream import change_stream
 
-# 创建数据库表
+# 创建数据库表并执行迁移
 Base.metadata.create_all(bind=engine)
+run_migrations(engine)
 
 # 创建FastAPI应用
 app = FastAPI(
@@ -45,10 +52,11 @@ app.include_router(goals_router, prefix="/api")
 app.include_router(tasks_router, prefix="/api")
 app.include_router(users_router, prefix="/api")
 app.include_router(dashboard_router, prefix="/api")
+app.include_router(notifications_router, prefix="/api")
+app.include_router(search_router, prefix="/api")
 
-# 启动通知服务
+# 通知服务在应用启动事件中启动，仅导入模块不会启动后台线程
 notification_service = NotificationService()
-notification_service.start_scheduler()
 
 @app.get("/")
 async def home(request: Request):
@@ -80,10 +88,27 @@ async def create_goal_page(request: Request):
     """创建目标页面"""
     return templates.TemplateResponse("create_goal.html", {"request": request})
 
+@app.get("/events")
+async def dashboard_events():
+    """仪表板变更推送（Server-Sent Events），任务和目标写入后推送增量，代替定时轮询"""
+    # 这里简化处理，假设用户ID为1
+    return StreamingResponse(
+        change_stream.iter_sse(user_id=1),
+        media_type="text/event-stream",
+        # 禁止缓存，并关闭反向代理（如 nginx）的响应缓冲，事件才能立即送达
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/events/stats")
+async def dashboard_events_stats():
+    """仪表板推送的连接数和事件统计"""
+    return dict(change_stream.stats, connections=change_stream.connection_count())
+
 @app.on_event("startup")
 async def startup_event():
     """应用启动时的初始化"""
     print("🚀 生活管家AI Agent 启动中...")
+    notification_service.start_scheduler()
     print("📅 通知服务已启动")
     print("🌐 访问地址: http://localhost:8000")
 
@@ -93,6 +118,9 @@ async def shutdown_event():
     print("🛑 正在关闭生活管家AI Agent...")
     notification_service.stop_scheduler()
     print("✅ 通知服务已停止")
+    password_hasher.shutdown()
+    bulk_planner.shutdown()
+    model_planner.shutdown()
 
 if __name__ == "__main__":
     uvicorn.run(
@@ -1,4 +1,5 @@
 from .database import Base, engine, SessionLocal
-from .models import User, Goal, Task, TaskProgress
+from .models import User, Goal, Task, TaskProgress, DailyStat, NotificationOutbox, Notification, ScheduledJob
+from .migrations import run_migrations
 
-__all__ = ['Base', 'engine', 'SessionLocal', 'User', 'Goal', 'Task', 'TaskProgress'] 
\ No newline at end of file
+__all__ = ['Base', 'engine', 'SessionLocal', 'User', 'Goal', 'Task', 'TaskProgress', 'DailyStat', 'NotificationOutbox', 'Notification', 'ScheduledJob', 'run_migrations'] 
\ No newline at end of file
@@ -1,15 +1,137 @@
-from sqlalchemy import create_engine
+import os
+from dataclasses import dataclass, replace
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncEngine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
 
-# 使用SQLite数据库，便于部署
-SQLALCHEMY_DATABASE_URL = "sqlite:///./life_agent.db"
+# 使用SQLite数据库，便于部署；可通过环境变量 DATABASE_URL 覆盖
+SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./life_agent.db")
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
+# 只读连接地址，默认与主库相同（SQLite 下通过 query_only 保证只读）
+SQLALCHEMY_READ_DATABASE_URL = os.getenv("DATABASE_READ_URL", SQLALCHEMY_DATABASE_URL)
+
+def to_async_url(url: str) -> str:
+    """将同步驱动地址转换为异步驱动地址（SQLite 使用 aiosqlite）"""
+    if url.startswith("sqlite:"):
+        return "sqlite+aiosqlite:" + url[len("sqlite:"):]
+    return url
+
+# 异步连接地址，默认由同步地址推导
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", to_async_url(SQLALCHEMY_DATABASE_URL))
+ASYNC_READ_DATABASE_URL = os.getenv("ASYNC_DATABASE_READ_URL", to_async_url(SQLALCHEMY_READ_DATABASE_URL))
+
+@dataclass(frozen=True)
+class DatabaseProfile:
+    """数据库运行参数：SQLite PRAGMA 与连接池配置"""
+    journal_mode: str = "WAL"
+    synchronous: str = "NORMAL"
+    cache_size: int = -64000  # 负数表示KB，约64MB
+    mmap_size: int = 268435456  # 256MB
+    busy_timeout: int = 5000  # 毫秒
+    pool_size: int = 5
+    max_overflow: int = 10
+    pool_timeout: int = 30
+    pool_recycle: int = 3600
+
+# 预置配置，通过环境变量 DATABASE_PROFILE 选择
+DATABASE_PROFILES = {
+    "production": DatabaseProfile(),
+    "development": DatabaseProfile(
+        synchronous="FULL",
+        cache_size=-8000,
+        mmap_size=0,
+        pool_size=2,
+        max_overflow=5
+    ),
+}
+
+def load_database_profile() -> DatabaseProfile:
+    """加载数据库配置，单项参数可用 SQLITE_* / DB_POOL_* 环境变量覆盖"""
+    profile = DATABASE_PROFILES[os.getenv("DATABASE_PROFILE", "production")]
+    overrides = {
+        "journal_mode": os.getenv("SQLITE_JOURNAL_MODE"),
+        "synchronous": os.getenv("SQLITE_SYNCHRONOUS"),
+        "cache_size": os.getenv("SQLITE_CACHE_SIZE"),
+        "mmap_size": os.getenv("SQLITE_MMAP_SIZE"),
+        "busy_timeout": os.getenv("SQLITE_BUSY_TIMEOUT"),
+        "pool_size": os.getenv("DB_POOL_SIZE"),
+        "max_overflow": os.getenv("DB_MAX_OVERFLOW"),
+        "pool_timeout": os.getenv("DB_POOL_TIMEOUT"),
+        "pool_recycle": os.getenv("DB_POOL_RECYCLE"),
+    }
+    for field, value in overrides.items():
+        if value is not None:
+            current = getattr(profile, field)
+            profile = replace(profile, **{field: type(current)(value)})
+    return profile
+
+DATABASE_PROFILE = load_database_profile()
+
+def _apply_sqlite_pragmas(engine: Engine, profile: DatabaseProfile, read_only: bool = False):
+    """在每个新连接上设置 PRAGMA"""
+    if engine.dialect.name != "sqlite":
+        return
+    
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"PRAGMA journal_mode={profile.journal_mode}")
+        cursor.execute(f"PRAGMA synchronous={profile.synchronous}")
+        cursor.execute(f"PRAGMA cache_size={int(profile.cache_size)}")
+        cursor.execute(f"PRAGMA mmap_size={int(profile.mmap_size)}")
+        cursor.execute(f"PRAGMA busy_timeout={int(profile.busy_timeout)}")
+        if read_only:
+            cursor.execute("PRAGMA query_only=ON")
+        cursor.close()
+
+def _engine_options(url: str, profile: DatabaseProfile, poolclass) -> dict:
+    """按配置生成引擎参数：显式连接池参数 + SQLite 连接参数"""
+    options = {
+        "poolclass": poolclass,
+        "pool_size": profile.pool_size,
+        "max_overflow": profile.max_overflow,
+        "pool_timeout": profile.pool_timeout,
+        "pool_recycle": profile.pool_recycle,
+        "pool_pre_ping": True,
+    }
+    if url.startswith("sqlite"):
+        if url.split("://", 1)[1] in ("", "/:memory:"):
+            # 内存数据库只能存在于单个连接中，不使用连接池参数
+            options = {}
+        options["connect_args"] = {"check_same_thread": False}
+    return options
+
+def create_database_engine(url: str, profile: DatabaseProfile = DATABASE_PROFILE,
+                           read_only: bool = False) -> Engine:
+    """按配置创建同步引擎"""
+    engine = create_engine(url, **_engine_options(url, profile, QueuePool))
+    _apply_sqlite_pragmas(engine, profile, read_only=read_only)
+    return engine
+
+def create_async_database_engine(url: str, profile: DatabaseProfile = DATABASE_PROFILE,
+                                 read_only: bool = False) -> AsyncEngine:
+    """按配置创建异步引擎，PRAGMA 注册在其底层同步引擎上"""
+    engine = create_async_engine(url, **_engine_options(url, profile, AsyncAdaptedQueuePool))
+    _apply_sqlite_pragmas(engine.sync_engine, profile, read_only=read_only)
+    return engine
+
+engine = create_database_engine(SQLALCHEMY_DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# 只读引擎，供 GET 接口使用，不与写请求争用连接
+read_engine = create_database_engine(SQLALCHEMY_READ_DATABASE_URL, read_only=True)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
+# 异步引擎，供 async 路由使用；同步引擎继续服务写接口和通知调度线程
+async_engine = create_async_database_engine(ASYNC_DATABASE_URL)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+async_read_engine = create_async_database_engine(ASYNC_READ_DATABASE_URL, read_only=True)
+AsyncReadSessionLocal = async_sessionmaker(async_read_engine, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
 def get_db():
@@ -17,4 +139,19 @@ def get_db():
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
+
+def get_read_db():
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def get_async_read_db():
+    async with AsyncReadSessionLocal() as db:
+        yield db
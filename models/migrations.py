@@ -0,0 +1,157 @@
+from typing import List, Tuple
+from sqlalchemy import inspect, literal, text, select, func, update, case, delete, insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+from .database import Base
+from .models import Goal, Task, DailyStat
+
+def ensure_columns(engine: Engine) -> List[Tuple[str, str]]:
+    """为已存在的表补加模型中新增的列，返回新增的 (表名, 列名)
+
+    create_all 不会修改已有的表，旧的 life_agent.db 需要通过 ALTER TABLE 补齐；
+    列上声明的标量默认值会作为 DEFAULT 写入，已有行同时获得该值
+    """
+    added = []
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                ddl = f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(dialect=engine.dialect)}"
+                if column.default is not None and column.default.is_scalar:
+                    default = literal(column.default.arg).compile(
+                        dialect=engine.dialect, compile_kwargs={"literal_binds": True}
+                    )
+                    ddl += f" DEFAULT {default}"
+                conn.execute(text(ddl))
+                added.append((table.name, column.name))
+    return added
+
+def backfill_goal_counts(engine: Engine):
+    """按现有任务回填目标的任务计数和进度（旧库首次补加计数列时执行）"""
+    total = (
+        select(func.count(Task.id))
+        .where(Task.goal_id == Goal.id)
+        .scalar_subquery()
+    )
+    completed = (
+        select(func.count(Task.id))
+        .where(Task.goal_id == Goal.id, Task.status == "completed")
+        .scalar_subquery()
+    )
+    with engine.begin() as conn:
+        conn.execute(update(Goal.__table__).values(total_count=total, completed_count=completed))
+        conn.execute(
+            update(Goal.__table__)
+            .where(Goal.total_count > 0)
+            .values(progress=Goal.completed_count * 100.0 / Goal.total_count)
+        )
+
+def backfill_task_users(engine: Engine):
+    """按所属目标回填任务的 user_id（旧库首次补加该列时执行）"""
+    owner = select(Goal.user_id).where(Goal.id == Task.goal_id).scalar_subquery()
+    with engine.begin() as conn:
+        conn.execute(update(Task.__table__).values(user_id=owner))
+
+def rebuild_daily_stats(engine: Engine):
+    """按任务表重新汇总每日统计（按用户和截止日期一次 GROUP BY），已删除目标下的任务不计入"""
+    day = func.date(Task.due_date)
+    totals = (
+        select(
+            Task.user_id,
+            day,
+            func.count(Task.id),
+            func.sum(case((Task.status == "completed", 1), else_=0)),
+            func.coalesce(func.sum(Task.estimated_duration), 0)
+        )
+        .where(Task.goal_id.isnot(None), Task.user_id.isnot(None), Task.due_date.isnot(None))
+        .group_by(Task.user_id, day)
+    )
+    with engine.begin() as conn:
+        conn.execute(delete(DailyStat.__table__))
+        conn.execute(insert(DailyStat.__table__).from_select(
+            ["user_id", "date", "tasks_due", "tasks_completed", "minutes_planned"], totals
+        ))
+
+def ensure_daily_stats(engine: Engine):
+    """每日统计为空而已有任务时（旧库首次创建该表）按任务表回填"""
+    with engine.connect() as conn:
+        empty = conn.scalar(select(DailyStat.user_id).limit(1)) is None
+        has_tasks = conn.scalar(select(Task.id).where(Task.due_date.isnot(None)).limit(1)) is not None
+    if empty and has_tasks:
+        rebuild_daily_stats(engine)
+
+# 全文索引：目标和任务的标题、描述各建一张 FTS5 外部内容表（不重复保存正文），由触发器与原表同步。
+# trigram 分词按连续三个字符建索引，不依赖空格分词，中文等 CJK 文本也能按任意子串检索；
+# 只有标题或描述变化时才更新索引，状态、进度等频繁更新不触发重建
+SEARCH_TABLES = {"goals_fts": "goals", "tasks_fts": "tasks"}
+
+def search_index_ddl(fts_table: str, content_table: str) -> List[str]:
+    return [
+        f"""CREATE VIRTUAL TABLE IF NOT EXISTS {fts_table} USING fts5(
+            title, description, content='{content_table}', content_rowid='id', tokenize='trigram'
+        )""",
+        f"""CREATE TRIGGER IF NOT EXISTS {fts_table}_ai AFTER INSERT ON {content_table} BEGIN
+            INSERT INTO {fts_table}(rowid, title, description) VALUES (new.id, new.title, new.description);
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {fts_table}_ad AFTER DELETE ON {content_table} BEGIN
+            INSERT INTO {fts_table}({fts_table}, rowid, title, description)
+            VALUES ('delete', old.id, old.title, old.description);
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {fts_table}_au AFTER UPDATE OF title, description ON {content_table} BEGIN
+            INSERT INTO {fts_table}({fts_table}, rowid, title, description)
+            VALUES ('delete', old.id, old.title, old.description);
+            INSERT INTO {fts_table}(rowid, title, description) VALUES (new.id, new.title, new.description);
+        END""",
+    ]
+
+def ensure_search_index(engine: Engine) -> bool:
+    """创建全文索引表和同步触发器，新建时按已有数据重建索引；返回全文检索是否可用
+
+    仅支持 SQLite（需要编译了 FTS5，Python 自带的 SQLite 默认包含）
+    """
+    if engine.dialect.name != "sqlite":
+        return False
+    inspector = inspect(engine)
+    try:
+        with engine.begin() as conn:
+            for fts_table, content_table in SEARCH_TABLES.items():
+                created = not inspector.has_table(fts_table)
+                for ddl in search_index_ddl(fts_table, content_table):
+                    conn.execute(text(ddl))
+                if created:
+                    conn.execute(text(f"INSERT INTO {fts_table}({fts_table}) VALUES ('rebuild')"))
+    except OperationalError as e:
+        print(f"全文索引不可用: {e}")
+        return False
+    return True
+
+# 已被更长的复合索引取代的旧索引（新索引以其列为前缀），删除以减少写入时的索引维护
+SUPERSEDED_INDEXES = ["ix_tasks_goal_id_status"]
+
+def ensure_indexes(engine: Engine):
+    """为已存在的表补建模型中声明的索引，并删除已被取代的旧索引
+
+    create_all 只会为新建的表创建索引，旧的 life_agent.db 需要在这里补齐
+    """
+    with engine.begin() as conn:
+        for name in SUPERSEDED_INDEXES:
+            conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(bind=conn, checkfirst=True)
+
+def run_migrations(engine: Engine):
+    """执行数据库迁移步骤，所有步骤均可重复执行"""
+    added = ensure_columns(engine)
+    if ("goals", "total_count") in added:
+        backfill_goal_counts(engine)
+    if ("tasks", "user_id") in added:
+        backfill_task_users(engine)
+    ensure_daily_stats(engine)
+    ensure_search_index(engine)
+    ensure_indexes(engine)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, Float
+from sqlalchemy import Column, Integer, String, Text, Date, DateTime, Boolean, ForeignKey, Float, Index, JSON
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from .database import Base
@@ -10,10 +10,15 @@ class User(Base):
     username = Column(String, unique=True, index=True)
     email = Column(String, unique=True, index=True)
     hashed_password = Column(String)
+    timezone = Column(String)  # IANA 时区名称，为空时使用 DEFAULT_TIMEZONE
+    daily_reminder_time = Column(String, default="09:00")  # 本地时间 HH:MM
+    progress_reminder_time = Column(String, default="18:00")
+    next_daily_reminder_at = Column(DateTime, index=True)  # 下一次提醒时间（UTC）
+    next_progress_reminder_at = Column(DateTime, index=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     
     goals = relationship("Goal", back_populates="user")
-    
+
 class Goal(Base):
     __tablename__ = "goals"
     
@@ -25,12 +30,19 @@ class Goal(Base):
     end_date = Column(DateTime)
     status = Column(String, default="active")  # active, completed, paused
     progress = Column(Float, default=0.0)  # 0-100
+    total_count = Column(Integer, default=0)  # 任务总数，随任务增删在同一事务内维护
+    completed_count = Column(Integer, default=0)  # 已完成任务数
     user_id = Column(Integer, ForeignKey("users.id"))
     created_at = Column(DateTime, default=datetime.utcnow)
     
     user = relationship("User", back_populates="goals")
     tasks = relationship("Task", back_populates="goal")
     
+    __table_args__ = (
+        Index("ix_goals_user_id_status", "user_id", "status"),
+        Index("ix_goals_user_id_category", "user_id", "category"),
+    )
+
 class Task(Base):
     __tablename__ = "tasks"
     
@@ -42,11 +54,20 @@ class Task(Base):
     status = Column(String, default="pending")  # pending, in_progress, completed
     estimated_duration = Column(Integer)  # 预计完成时间（分钟）
     goal_id = Column(Integer, ForeignKey("goals.id"))
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)  # 所属目标的用户，冗余保存以便按用户查询任务时直接走索引
     created_at = Column(DateTime, default=datetime.utcnow)
     
     goal = relationship("Goal", back_populates="tasks")
     progress = relationship("TaskProgress", back_populates="task")
     
+    __table_args__ = (
+        Index("ix_tasks_goal_id_due_date", "goal_id", "due_date"),
+        Index("ix_tasks_goal_id_status_due_date", "goal_id", "status", "due_date"),
+        # TaskQuery 的跨目标查询：按用户过滤，状态为等值条件，截止时间用于区间和排序
+        Index("ix_tasks_user_id_due_date", "user_id", "due_date"),
+        Index("ix_tasks_user_id_status_due_date", "user_id", "status", "due_date"),
+    )
+
 class TaskProgress(Base):
     __tablename__ = "task_progress"
     
@@ -57,4 +78,62 @@ class TaskProgress(Base):
     notes = Column(Text)
     created_at = Column(DateTime, default=datetime.utcnow)
     
-    task = relationship("Task", back_populates="progress") 
\ No newline at end of file
+    task = relationship("Task", back_populates="progress")
+
+# 按用户、日期预先汇总的任务统计，随任务增删和状态变化在同一事务内增量维护；
+# 任务按截止时间（UTC）所在的日期归入某一天，与仪表板摘要中“今日完成率”的口径一致
+class DailyStat(Base):
+    __tablename__ = "daily_stats"
+    
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    date = Column(Date, primary_key=True)
+    tasks_due = Column(Integer, default=0)
+    tasks_completed = Column(Integer, default=0)  # 当天到期的任务中已完成的数量
+    minutes_planned = Column(Integer, default=0)  # 当天到期任务的预计时长之和（分钟）
+
+class NotificationOutbox(Base):
+    __tablename__ = "notification_outbox"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    channel = Column(String)
+    payload = Column(Text)  # JSON格式的通知内容
+    status = Column(String, default="pending")  # pending, sending, failed
+    attempts = Column(Integer, default=0)
+    next_attempt_at = Column(DateTime, default=datetime.utcnow)
+    last_error = Column(Text)
+    claim_token = Column(String)  # 认领批次标识，多进程下区分各自认领的通知
+    claimed_at = Column(DateTime)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        Index("ix_notification_outbox_status_next_attempt", "status", "next_attempt_at"),
+        Index("ix_notification_outbox_claim_token", "claim_token"),
+    )
+
+class Notification(Base):
+    __tablename__ = "notifications"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"))
+    type = Column(String)  # daily_tasks, progress_update, info 等
+    message = Column(Text)
+    payload = Column(JSON)  # 完整的通知内容
+    is_read = Column(Boolean, default=False)
+    read_at = Column(DateTime)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        Index("ix_notifications_user_id_created_at", "user_id", "created_at"),
+    )
+
+class ScheduledJob(Base):
+    __tablename__ = "scheduled_jobs"
+    
+    name = Column(String, primary_key=True)
+    schedule = Column(String)  # "daily HH:MM" 或 "every <秒数>"
+    next_run_at = Column(DateTime)  # UTC
+    lease_owner = Column(String)  # 当前持有租约的进程
+    lease_expires_at = Column(DateTime)
+    last_run_at = Column(DateTime)
+    last_status = Column(String)  # success, error
+    last_error = Column(Text)
\ No newline at end of file
@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Dict, Any
 
 class UserBase(BaseModel):
     username: str
@@ -8,9 +8,20 @@ class UserBase(BaseModel):
 
 class UserCreate(UserBase):
     password: str
+    timezone: Optional[str] = None
+    daily_reminder_time: Optional[str] = None
+    progress_reminder_time: Optional[str] = None
+
+class UserPreferences(BaseModel):
+    timezone: Optional[str] = None  # IANA 时区名称，如 Asia/Shanghai
+    daily_reminder_time: Optional[str] = None  # 本地时间 HH:MM
+    progress_reminder_time: Optional[str] = None
 
 class User(UserBase):
     id: int
+    timezone: Optional[str] = None
+    daily_reminder_time: Optional[str] = None
+    progress_reminder_time: Optional[str] = None
     created_at: datetime
     
     class Config:
@@ -30,12 +41,32 @@ class Goal(GoalBase):
     id: int
     status: str
     progress: float
+    total_count: int = 0
+    completed_count: int = 0
     user_id: int
     created_at: datetime
     
     class Config:
         from_attributes = True
 
+class GoalFields(BaseModel):
+    """按 ?fields= 只返回部分字段的目标，未请求的字段不出现在响应中"""
+    id: int
+    title: Optional[str] = None
+    description: Optional[str] = None
+    category: Optional[str] = None
+    start_date: Optional[datetime] = None
+    end_date: Optional[datetime] = None
+    status: Optional[str] = None
+    progress: Optional[float] = None
+    total_count: Optional[int] = None
+    completed_count: Optional[int] = None
+    user_id: Optional[int] = None
+    created_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
+
 class TaskBase(BaseModel):
     title: str
     description: str
@@ -55,6 +86,21 @@ class Task(TaskBase):
     class Config:
         from_attributes = True
 
+class TaskFields(BaseModel):
+    """按 ?fields= 只返回部分字段的任务，未请求的字段不出现在响应中"""
+    id: int
+    title: Optional[str] = None
+    description: Optional[str] = None
+    due_date: Optional[datetime] = None
+    priority: Optional[str] = None
+    estimated_duration: Optional[int] = None
+    status: Optional[str] = None
+    goal_id: Optional[int] = None
+    created_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
+
 class TaskProgressBase(BaseModel):
     completed: bool
     notes: Optional[str] = None
@@ -71,6 +117,10 @@ class TaskProgress(TaskProgressBase):
     class Config:
         from_attributes = True
 
+class GoalImportResult(BaseModel):
+    goal_ids: List[int] = []
+    metrics: Dict[str, Any] = {}
+
 class GoalWithTasks(Goal):
     tasks: List[Task] = []
     
@@ -81,4 +131,45 @@ class TaskWithProgress(Task):
     progress: List[TaskProgress] = []
     
     class Config:
-        from_attributes = True 
\ No newline at end of file
+        from_attributes = True
+
+class Notification(BaseModel):
+    id: int
+    user_id: int
+    type: str
+    message: Optional[str] = None
+    payload: Dict[str, Any] = {}
+    is_read: bool
+    read_at: Optional[datetime] = None
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+class NotificationPage(BaseModel):
+    items: List[Notification] = []
+    next_cursor: Optional[int] = None
+
+class GoalSearchHit(BaseModel):
+    id: int
+    title: str
+    category: Optional[str] = None
+    status: Optional[str] = None
+    progress: Optional[float] = None
+    snippet: str  # 已转义的 HTML，命中词用 <mark> 包裹
+    score: float
+
+class TaskSearchHit(BaseModel):
+    id: int
+    goal_id: Optional[int] = None
+    title: str
+    status: Optional[str] = None
+    priority: Optional[str] = None
+    due_date: Optional[datetime] = None
+    snippet: str
+    score: float
+
+class SearchResults(BaseModel):
+    query: str
+    goals: List[GoalSearchHit] = []
+    tasks: List[TaskSearchHit] = []
@@ -2,5 +2,23 @@ from .goal_service import GoalService
 from .task_service import TaskService
 from .notification_service import NotificationService
 from .ai_planner import AIPlanner
+from .dashboard_stats_service import DashboardStatsService
+from .async_goal_service import AsyncGoalService
+from .async_task_service import AsyncTaskService
+from .password_service import PasswordHasher, password_hasher
+from .notification_fanout import NotificationFanout, FanoutMetrics
+from .notification_dispatcher import NotificationDispatcher
+from .notification_channels import NotificationChannel, ConsoleChannel, StubChannel
+from .notification_history_service import NotificationHistoryService
+from .job_scheduler import JobScheduler
+from .reminder_service import ReminderService
+from .task_templates import TemplateRegistry, get_template_registry, reload_templates
+from .plan_index import PlanIndex
+from .bulk_planner import BulkPlanner, BatchImportMetrics, bulk_planner
+from .planner_backends import PlannerBackend, TemplateBackend, HTTPModelBackend
+from .model_planner import ModelPlanner, PlanCache, model_planner
+from .read_cache import ReadCache, SharedCacheBackend, RedisCacheBackend, read_cache
+from .change_stream import ChangeStream, change_stream
+from .search_service import SearchService
 
-__all__ = ['GoalService', 'TaskService', 'NotificationService', 'AIPlanner'] 
\ No newline at end of file
+__all__ = ['GoalService', 'TaskService', 'NotificationService', 'AIPlanner', 'DashboardStatsService', 'AsyncGoalService', 'AsyncTaskService', 'PasswordHasher', 'password_hasher', 'NotificationFanout', 'FanoutMetrics', 'NotificationDispatcher', 'NotificationChannel', 'ConsoleChannel', 'StubChannel', 'NotificationHistoryService', 'JobScheduler', 'ReminderService', 'TemplateRegistry', 'get_template_registry', 'reload_templates', 'PlanIndex', 'BulkPlanner', 'BatchImportMetrics', 'bulk_planner', 'PlannerBackend', 'TemplateBackend', 'HTTPModelBackend', 'ModelPlanner', 'PlanCache', 'model_planner', 'ReadCache', 'SharedCacheBackend', 'RedisCacheBackend', 'read_cache', 'ChangeStream', 'change_stream', 'SearchService'] 
\ No newline at end of file
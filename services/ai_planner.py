@@ -1,155 +1,180 @@
-from datetime import datetime, timedelta
-from typing import List, Dict, Any
-import json
+from datetime import datetime, timedelta, timezone, tzinfo
+from functools import lru_cache
+from typing import List, Dict, Any, Mapping, Optional, Sequence, Tuple, Union
+import numpy as np
+from .task_templates import TemplateRegistry, StageTemplate, TaskTemplate, GENERIC_CATEGORY, get_template_registry
+from .plan_index import PlanIndex
+
+_WEEK = np.timedelta64(7, "D")
+_DAY = np.timedelta64(1, "D")
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+def _naive_utc(value: datetime) -> datetime:
+    """带时区的时间换算为不带时区的 UTC 时间，不带时区的原样返回"""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+def _to_datetime64(values: Sequence[datetime]) -> np.ndarray:
+    """datetime 列表转为 datetime64[us] 数组，先换算成整数微秒，比直接 np.array 转换快数倍
+    
+    带时区的时间按 UTC 换算，datetime64 本身不保存时区
+    """
+    return np.fromiter(((_naive_utc(value) - _EPOCH) // _MICROSECOND for value in values),
+                       dtype=np.int64, count=len(values)).view("datetime64[us]")
+
+def restore_tzinfo(due_dates: List[datetime], tz: Optional[tzinfo]) -> List[datetime]:
+    """把按 UTC 计算出的截止时间换回目标开始时间的时区，与 plan_goal 逐个推进得到的结果一致"""
+    if tz is None:
+        return due_dates
+    return [due_date.replace(tzinfo=timezone.utc).astimezone(tz) for due_date in due_dates]
+
+@lru_cache(maxsize=64)
+def _template_layout(stages: Tuple[StageTemplate, ...]):
+    """把阶段模板展开为逐任务的数组：任务模板、阶段起始周数、阶段周数、阶段内序号、阶段任务数"""
+    templates, stage_start_weeks, stage_weeks, task_index, task_count = [], [], [], [], []
+    weeks_before = 0
+    for stage in stages:
+        for i, task in enumerate(stage.tasks):
+            templates.append(task)
+            stage_start_weeks.append(weeks_before)
+            stage_weeks.append(stage.duration_weeks)
+            task_index.append(i)
+            task_count.append(len(stage.tasks))
+        weeks_before += stage.duration_weeks
+    return (
+        tuple(templates),
+        np.array(stage_start_weeks, dtype=np.int64),
+        np.array(stage_weeks, dtype=np.int64),
+        np.array(task_index, dtype=np.int64),
+        np.array(task_count, dtype=np.int64)
+    )
 
 class AIPlanner:
     """AI规划器，负责将大目标拆解为可执行的小任务"""
     
-    def __init__(self):
-        self.task_templates = {
-            "健身": {
-                "阶段1": {
-                    "duration_weeks": 2,
-                    "tasks": [
-                        {"title": "制定运动计划", "description": "确定每周运动3-4次，每次30-45分钟", "duration": 30},
-                        {"title": "准备运动装备", "description": "购买合适的运动鞋和运动服", "duration": 60},
-                        {"title": "建立运动习惯", "description": "每天固定时间进行轻度运动", "duration": 30},
-                        {"title": "记录运动日志", "description": "记录每次运动的内容和感受", "duration": 10}
-                    ]
-                },
-                "阶段2": {
-                    "duration_weeks": 2,
-                    "tasks": [
-                        {"title": "增加运动强度", "description": "逐步增加运动强度和时间", "duration": 45},
-                        {"title": "尝试不同运动", "description": "尝试跑步、游泳、健身等不同运动", "duration": 60},
-                        {"title": "制定营养计划", "description": "学习基本的营养知识", "duration": 30},
-                        {"title": "调整作息时间", "description": "确保充足的睡眠和休息", "duration": 20}
-                    ]
-                },
-                "阶段3": {
-                    "duration_weeks": 2,
-                    "tasks": [
-                        {"title": "优化饮食结构", "description": "增加蛋白质摄入，减少垃圾食品", "duration": 45},
-                        {"title": "制定详细计划", "description": "制定每周详细的运动和饮食计划", "duration": 60},
-                        {"title": "寻找运动伙伴", "description": "找到志同道合的运动伙伴", "duration": 30},
-                        {"title": "参加健身课程", "description": "参加专业的健身课程", "duration": 90}
-                    ]
-                },
-                "阶段4": {
-                    "duration_weeks": 2,
-                    "tasks": [
-                        {"title": "巩固运动习惯", "description": "保持稳定的运动频率和强度", "duration": 45},
-                        {"title": "评估健身效果", "description": "测量体重、体脂等指标", "duration": 30},
-                        {"title": "调整目标计划", "description": "根据进展调整下一步目标", "duration": 45},
-                        {"title": "建立长期计划", "description": "制定长期的健身和健康计划", "duration": 60}
-                    ]
-                }
-            },
-            "学习": {
-                "阶段1": {
-                    "duration_weeks": 2,
-                    "tasks": [
-                        {"title": "确定学习目标", "description": "明确要学习的技能或知识", "duration": 30},
-                        {"title": "制定学习计划", "description": "制定详细的学习时间表", "duration": 45},
-                        {"title": "准备学习资源", "description": "收集相关的书籍、课程等资源", "duration": 60},
-                        {"title": "建立学习环境", "description": "创造良好的学习环境", "duration": 30}
-                    ]
-                },
-                "阶段2": {
-                    "duration_weeks": 2,
-                    "tasks": [
-                        {"title": "开始基础学习", "description": "从基础知识开始学习", "duration": 60},
-                        {"title": "记录学习笔记", "description": "整理和记录学习内容", "duration": 30},
-                        {"title": "寻找学习伙伴", "description": "找到学习伙伴或加入学习小组", "duration": 30},
-                        {"title": "实践应用", "description": "将学到的知识应用到实践中", "duration": 90}
-                    ]
-                }
-            },
-            "工作": {
-                "阶段1": {
-                    "duration_weeks": 2,
-                    "tasks": [
-                        {"title": "分析现状", "description": "分析当前工作状况和问题", "duration": 60},
-                        {"title": "设定工作目标", "description": "明确工作改进的具体目标", "duration": 45},
-                        {"title": "制定行动计划", "description": "制定详细的改进计划", "duration": 60},
-                        {"title": "学习新技能", "description": "学习工作相关的新技能", "duration": 90}
-                    ]
-                }
-            }
-        }
+    def __init__(self, registry: Optional[TemplateRegistry] = None):
+        # 默认使用进程内共享的模板注册表，模板包重新加载后新的规划立即生效
+        self._registry = registry
+    
+    @property
+    def registry(self) -> TemplateRegistry:
+        return self._registry or get_template_registry()
+    
+    @property
+    def task_templates(self) -> Mapping[str, Tuple[StageTemplate, ...]]:
+        """按类别索引的只读模板"""
+        return self.registry.categories
     
     def plan_goal(self, goal_title: str, goal_description: str, category: str, 
                   start_date: datetime, end_date: datetime) -> List[Dict[str, Any]]:
         """为指定目标制定详细的任务计划"""
         
-        # 计算总周数
-        total_weeks = (end_date - start_date).days // 7
-        
-        # 获取对应类别的任务模板
-        if category in self.task_templates:
-            template = self.task_templates[category]
-        else:
-            # 使用通用模板
-            template = self._get_generic_template()
+        # 获取对应类别的任务模板，没有时使用通用模板
+        template = self.registry.get(category)
         
         tasks = []
         current_date = start_date
         
         # 为每个阶段创建任务
-        for stage_name, stage_info in template.items():
+        for stage in template:
             if current_date >= end_date:
                 break
-                
-            stage_duration = stage_info["duration_weeks"]
-            stage_end_date = min(current_date + timedelta(weeks=stage_duration), end_date)
+            
+            stage_end_date = min(current_date + timedelta(weeks=stage.duration_weeks), end_date)
             
             # 为阶段内的每个任务分配时间
-            stage_tasks = stage_info["tasks"]
-            days_per_task = (stage_end_date - current_date).days // len(stage_tasks)
+            days_per_task = (stage_end_date - current_date).days // len(stage.tasks)
             
-            for i, task_template in enumerate(stage_tasks):
+            for i, task_template in enumerate(stage.tasks):
                 task_due_date = current_date + timedelta(days=i * days_per_task)
                 if task_due_date >= end_date:
                     break
-                    
-                task = {
-                    "title": f"{stage_name}: {task_template['title']}",
-                    "description": task_template['description'],
+                
+                tasks.append({
+                    "title": task_template.title,
+                    "description": task_template.description,
                     "due_date": task_due_date,
                     "priority": "medium",
-                    "estimated_duration": task_template['duration']
-                }
-                tasks.append(task)
+                    "estimated_duration": task_template.duration
+                })
             
             current_date = stage_end_date
         
         return tasks
     
-    def _get_generic_template(self) -> Dict[str, Any]:
-        """获取通用任务模板"""
-        return {
-            "阶段1": {
-                "duration_weeks": 2,
-                "tasks": [
-                    {"title": "目标分析", "description": "深入分析目标的具体要求", "duration": 60},
-                    {"title": "制定计划", "description": "制定详细的执行计划", "duration": 90},
-                    {"title": "准备资源", "description": "准备所需的资源和工具", "duration": 60},
-                    {"title": "开始执行", "description": "开始执行计划的第一步", "duration": 45}
-                ]
-            },
-            "阶段2": {
-                "duration_weeks": 2,
-                "tasks": [
-                    {"title": "持续推进", "description": "按照计划持续推进", "duration": 60},
-                    {"title": "记录进展", "description": "记录执行过程中的进展", "duration": 30},
-                    {"title": "调整优化", "description": "根据进展调整计划", "duration": 45},
-                    {"title": "寻求支持", "description": "寻找必要的支持和帮助", "duration": 30}
+    def plan_goals(self, goals: Sequence[Any]) -> List[List[Dict[str, Any]]]:
+        """批量规划目标，结果与逐个调用 plan_goal 一致
+        
+        goals 中的元素需要有 title、description、category、start_date、end_date 属性；
+        同一模板的目标一起用 NumPy 计算全部截止时间
+        """
+        registry = self.registry
+        plans: List[List[Dict[str, Any]]] = [[] for _ in goals]
+        
+        # 按模板分组；模板元组在注册表中唯一，用 id 分组避免逐个哈希整棵模板
+        by_template: Dict[int, Tuple[Tuple[StageTemplate, ...], List[int]]] = {}
+        for i, goal in enumerate(goals):
+            stages = registry.get(goal.category)
+            by_template.setdefault(id(stages), (stages, []))[1].append(i)
+        
+        for stages, indexes in by_template.values():
+            templates, due_dates, mask = self.schedule_due_dates(
+                stages,
+                [goals[i].start_date for i in indexes],
+                [goals[i].end_date for i in indexes]
+            )
+            bases = [
+                {
+                    "title": task_template.title,
+                    "description": task_template.description,
+                    "priority": "medium",
+                    "estimated_duration": task_template.duration
+                }
+                for task_template in templates
+            ]
+            for i, row_dates, row_mask in zip(indexes, due_dates.tolist(), mask.tolist()):
+                row_dates = restore_tzinfo(row_dates, goals[i].start_date.tzinfo)
+                plans[i] = [
+                    {**base, "due_date": due_date}
+                    for base, due_date, keep in zip(bases, row_dates, row_mask)
+                    if keep
                 ]
-            }
-        }
+        return plans
     
-    def get_daily_tasks(self, all_tasks: List[Dict[str, Any]], target_date: datetime) -> List[Dict[str, Any]]:
-        """获取指定日期的任务列表"""
+    def schedule_due_dates(self, stages: Tuple[StageTemplate, ...], start_dates: Sequence[datetime],
+                           end_dates: Sequence[datetime]) -> Tuple[Tuple[TaskTemplate, ...], np.ndarray, np.ndarray]:
+        """向量化计算一批目标在同一模板下的任务截止时间
+        
+        返回 (任务模板, 截止时间矩阵, 有效掩码)，矩阵的行对应目标、列对应模板中的任务；
+        阶段 k 的开始时间为 min(开始时间 + 前 k 个阶段的周数, 结束时间)，与 plan_goal 的逐阶段推进等价
+        """
+        templates, stage_start_weeks, stage_weeks, task_index, task_count = _template_layout(stages)
+        starts = _to_datetime64(start_dates)[:, None]
+        ends = _to_datetime64(end_dates)[:, None]
+        
+        stage_starts = np.minimum(starts + stage_start_weeks * _WEEK, ends)
+        stage_ends = np.minimum(stage_starts + stage_weeks * _WEEK, ends)
+        days_per_task = ((stage_ends - stage_starts) // _DAY) // task_count
+        due_dates = stage_starts + task_index * days_per_task * _DAY
+        mask = (stage_starts < ends) & (due_dates < ends)
+        return templates, due_dates, mask
+    
+    def index_plan(self, tasks: Sequence[Dict[str, Any]]) -> PlanIndex:
+        """为计划建立按日期的索引，之后按天或按区间查询为 O(log n)"""
+        return PlanIndex(tasks)
+    
+    def _get_generic_template(self) -> Tuple[StageTemplate, ...]:
+        """获取通用任务模板"""
+        return self.registry.get(GENERIC_CATEGORY)
+    
+    def get_daily_tasks(self, all_tasks: Union[List[Dict[str, Any]], PlanIndex],
+                        target_date: datetime) -> List[Dict[str, Any]]:
+        """获取指定日期的任务列表，需要反复按日期查询时先用 index_plan 建立索引再传入"""
+        if isinstance(all_tasks, PlanIndex):
+            return all_tasks.tasks_on(target_date)
+        
         daily_tasks = []
         for task in all_tasks:
             task_date = task['due_date']
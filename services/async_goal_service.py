@@ -0,0 +1,65 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Dict, Iterable, Sequence
+from models.models import Goal
+from .goal_service import progress_from_counts
+from .keyset import entity_columns, keyset_page, fetch_page
+
+class AsyncGoalService:
+    """GoalService 的异步只读版本，供 async 路由使用
+    
+    写操作仍走同步的 GoalService，保证事务内的附带逻辑只维护一份
+    """
+    
+    # 单条语句中 IN 列表的最大参数个数，低于 SQLite 默认的变量上限
+    IN_BATCH_SIZE = 500
+    
+    async def _user_goals_page(self, db: AsyncSession, user_id: int, *criteria, after: Optional[int] = None,
+                               limit: Optional[int] = None, fields: Optional[Sequence[str]] = None) -> list:
+        """按 id 键集分页查询用户目标；指定 fields 时只选取这些列并返回字典"""
+        stmt = select(*entity_columns(Goal, fields)).where(Goal.user_id == user_id, *criteria)
+        return await fetch_page(db, keyset_page(stmt, Goal.id, after, limit), fields)
+    
+    async def get_user_goals(self, db: AsyncSession, user_id: int, after: Optional[int] = None,
+                             limit: Optional[int] = None, fields: Optional[Sequence[str]] = None) -> List[Goal]:
+        """获取用户的所有目标"""
+        return await self._user_goals_page(db, user_id, after=after, limit=limit, fields=fields)
+    
+    async def get_goal(self, db: AsyncSession, goal_id: int, user_id: int) -> Optional[Goal]:
+        """获取特定目标"""
+        return await db.scalar(select(Goal).where(Goal.id == goal_id, Goal.user_id == user_id))
+    
+    async def calculate_goal_progress(self, db: AsyncSession, goal_id: int) -> float:
+        """计算目标完成进度"""
+        progress_map = await self.calculate_progress_for_goals(db, [goal_id])
+        return progress_map.get(goal_id, 0.0)
+    
+    async def calculate_progress_for_goals(self, db: AsyncSession, goal_ids: Iterable[int]) -> Dict[int, float]:
+        """批量读取目标完成进度，直接使用目标上的任务计数，不再聚合任务表"""
+        goal_ids = list(dict.fromkeys(goal_ids))
+        progress_map = {goal_id: 0.0 for goal_id in goal_ids}
+        
+        for i in range(0, len(goal_ids), self.IN_BATCH_SIZE):
+            batch = goal_ids[i:i + self.IN_BATCH_SIZE]
+            result = await db.execute(
+                select(Goal.id, Goal.completed_count, Goal.total_count).where(Goal.id.in_(batch))
+            )
+            for row in result:
+                progress_map[row.id] = progress_from_counts(row.completed_count, row.total_count)
+        
+        return progress_map
+    
+    async def get_goals_by_category(self, db: AsyncSession, user_id: int, category: str,
+                                    after: Optional[int] = None, limit: Optional[int] = None,
+                                    fields: Optional[Sequence[str]] = None) -> List[Goal]:
+        """按类别获取目标"""
+        return await self._user_goals_page(
+            db, user_id, Goal.category == category, after=after, limit=limit, fields=fields
+        )
+    
+    async def get_active_goals(self, db: AsyncSession, user_id: int, after: Optional[int] = None,
+                               limit: Optional[int] = None, fields: Optional[Sequence[str]] = None) -> List[Goal]:
+        """获取活跃目标"""
+        return await self._user_goals_page(
+            db, user_id, Goal.status == "active", after=after, limit=limit, fields=fields
+        )
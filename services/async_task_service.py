@@ -0,0 +1,77 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime, timedelta
+from typing import Any, List, Optional, Sequence
+from models.models import Task, TaskProgress, Goal
+from .keyset import entity_columns, keyset_page, fetch_page
+from .task_query import TaskQuery
+
+class AsyncTaskService:
+    """TaskService 的异步只读版本，供 async 路由使用
+
+    写操作仍走同步的 TaskService，保证事务内的附带逻辑只维护一份
+    """
+    
+    def _user_tasks(self, user_id: int, fields: Optional[Sequence[str]] = None):
+        """构造用户任务查询：通过 goals.user_id 联表过滤；指定 fields 时只选取这些列"""
+        return select(*entity_columns(Task, fields)).select_from(Task).join(
+            Goal, Task.goal_id == Goal.id
+        ).where(Goal.user_id == user_id)
+    
+    async def query_tasks(self, db: AsyncSession, user_id: int, query: TaskQuery,
+                          fields: Optional[Sequence[str]] = None) -> List[Any]:
+        """按组合条件查询用户的任务；指定 fields 时只选取这些列（另含 id 和排序列）并返回字典"""
+        selected = query.selected_fields(fields)
+        return await fetch_page(db, query.statement(user_id, selected), selected)
+    
+    async def get_goal_tasks(self, db: AsyncSession, goal_id: int) -> List[Task]:
+        """获取目标的所有任务"""
+        result = await db.scalars(select(Task).where(Task.goal_id == goal_id))
+        return result.all()
+    
+    async def get_task(self, db: AsyncSession, task_id: int) -> Optional[Task]:
+        """获取特定任务"""
+        return await db.scalar(select(Task).where(Task.id == task_id))
+    
+    async def get_daily_tasks(self, db: AsyncSession, user_id: int, target_date: datetime) -> List[Task]:
+        """获取指定日期的任务"""
+        start_of_day = target_date.replace(hour=0, minute=0, second=0, microsecond=0)
+        end_of_day = start_of_day + timedelta(days=1)
+        
+        result = await db.scalars(self._user_tasks(user_id).where(
+            Task.due_date >= start_of_day,
+            Task.due_date < end_of_day
+        ))
+        return result.all()
+    
+    async def get_overdue_tasks(self, db: AsyncSession, user_id: int, after: Optional[int] = None,
+                                limit: Optional[int] = None, fields: Optional[Sequence[str]] = None) -> List[Task]:
+        """获取逾期任务（按任务ID键集分页）"""
+        stmt = self._user_tasks(user_id, fields).where(
+            Task.due_date < datetime.utcnow(),
+            Task.status.in_(["pending", "in_progress"])
+        )
+        return await fetch_page(db, keyset_page(stmt, Task.id, after, limit), fields)
+    
+    async def get_upcoming_tasks(self, db: AsyncSession, user_id: int, days: int = 7, after: Optional[int] = None,
+                                 limit: Optional[int] = None, fields: Optional[Sequence[str]] = None) -> List[Task]:
+        """获取即将到来的任务（按任务ID键集分页）"""
+        start_date = datetime.utcnow()
+        end_date = start_date + timedelta(days=days)
+        
+        stmt = self._user_tasks(user_id, fields).where(
+            Task.due_date >= start_date,
+            Task.due_date <= end_date,
+            Task.status.in_(["pending", "in_progress"])
+        )
+        return await fetch_page(db, keyset_page(stmt, Task.id, after, limit), fields)
+    
+    async def get_task_progress(self, db: AsyncSession, task_id: int) -> List[TaskProgress]:
+        """获取任务进度记录"""
+        result = await db.scalars(select(TaskProgress).where(TaskProgress.task_id == task_id))
+        return result.all()
+    
+    async def get_tasks_by_priority(self, db: AsyncSession, user_id: int, priority: str) -> List[Task]:
+        """按优先级获取任务"""
+        result = await db.scalars(self._user_tasks(user_id).where(Task.priority == priority))
+        return result.all()
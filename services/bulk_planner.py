@@ -0,0 +1,160 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from .ai_planner import AIPlanner, restore_tzinfo
+from .task_templates import TemplateRegistry, get_template_registry, reload_templates
+
+# 规划进程池大小，默认与CPU核数相同；为 1 时始终在当前进程内规划
+PLANNER_WORKERS = int(os.getenv("PLANNER_WORKERS", str(os.cpu_count() or 1)))
+
+# 每个子进程一次处理的目标数
+PLANNER_CHUNK_SIZE = int(os.getenv("PLANNER_CHUNK_SIZE", "2000"))
+
+# 目标数达到该值才使用进程池，小批量时进程间传输的开销大于并行带来的收益
+PLANNER_PROCESS_MIN_GOALS = int(os.getenv("PLANNER_PROCESS_MIN_GOALS", "5000"))
+
+# 单组排期结果：(类别, 组内目标在本批中的下标, 截止时间矩阵, 有效掩码)
+ScheduleGroup = Tuple[str, np.ndarray, np.ndarray, np.ndarray]
+
+def _schedule_groups(registry: TemplateRegistry, categories: Sequence[str], start_dates: Sequence[datetime],
+                     end_dates: Sequence[datetime]) -> List[ScheduleGroup]:
+    """按模板分组计算一批目标的任务截止时间
+    
+    只返回 NumPy 数组，不返回任务字典：标题、描述等字符串由调用方从模板注册表中复用，
+    在子进程中执行时进程间只传输紧凑的截止时间矩阵
+    """
+    planner = AIPlanner(registry)
+    by_template: Dict[int, Tuple[str, List[int]]] = {}
+    for i, category in enumerate(categories):
+        by_template.setdefault(id(registry.get(category)), (category, []))[1].append(i)
+    
+    groups = []
+    for category, indexes in by_template.values():
+        _, due_dates, mask = planner.schedule_due_dates(
+            registry.get(category),
+            [start_dates[i] for i in indexes],
+            [end_dates[i] for i in indexes]
+        )
+        groups.append((category, np.array(indexes, dtype=np.int64), due_dates, mask))
+    return groups
+
+def _schedule_chunk(categories: Sequence[str], start_dates: Sequence[datetime],
+                    end_dates: Sequence[datetime], template_source: str) -> List[ScheduleGroup]:
+    """在进程池中执行的排期函数，子进程与父进程使用同一份模板包（"builtin" 对应内置模板）"""
+    registry = get_template_registry()
+    if registry.source != template_source:
+        registry = reload_templates("" if template_source == "builtin" else template_source)
+    return _schedule_groups(registry, categories, start_dates, end_dates)
+
+@dataclass
+class BatchImportMetrics:
+    """单次批量导入的耗时统计（毫秒）"""
+    goals: int = 0
+    tasks: int = 0
+    workers: int = 1
+    plan_ms: float = 0.0
+    insert_ms: float = 0.0
+    total_ms: float = 0.0
+    
+    @property
+    def tasks_per_second(self) -> float:
+        return self.tasks * 1000 / self.total_ms if self.total_ms else 0.0
+    
+    def to_dict(self) -> Dict[str, Any]:
+        data = {key: round(value, 1) if isinstance(value, float) else value for key, value in asdict(self).items()}
+        data["tasks_per_second"] = round(self.tasks_per_second, 1)
+        return data
+
+class BulkPlanner:
+    """批量规划：大批量目标按块分给进程池计算截止时间，父进程复用模板直接生成待插入的任务行"""
+    
+    def __init__(self, max_workers: int = PLANNER_WORKERS, chunk_size: int = PLANNER_CHUNK_SIZE,
+                 process_min_goals: int = PLANNER_PROCESS_MIN_GOALS):
+        self.max_workers = max_workers
+        self.chunk_size = chunk_size
+        self.process_min_goals = process_min_goals
+        self._executor: Optional[ProcessPoolExecutor] = None
+    
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """首次使用时再创建进程池，避免导入模块时就启动子进程
+        
+        进程池在已运行事件循环和后台线程的应用进程中创建，通过 forkserver（不支持时用 spawn）启动子进程，
+        避免 fork 继承其它线程持有的锁；子进程按 template_source 加载与父进程相同的模板包
+        """
+        if self._executor is None:
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers, mp_context=multiprocessing.get_context(method)
+            )
+        return self._executor
+    
+    def workers_for(self, count: int) -> int:
+        """本批实际使用的进程数，1 表示在当前进程内规划"""
+        if self.max_workers <= 1 or count < self.process_min_goals:
+            return 1
+        return min(self.max_workers, -(-count // self.chunk_size))
+    
+    def plan_task_rows(self, goals: Sequence[Any], goal_ids: Sequence[int],
+                       planner: Optional[AIPlanner] = None) -> List[Dict[str, Any]]:
+        """为一批目标生成可直接批量插入的任务行，按目标顺序排列，每个目标内的顺序与 plan_goal 一致
+        
+        goals 中的元素需要有 category、start_date、end_date 属性
+        """
+        registry = (planner or AIPlanner()).registry
+        categories = [goal.category for goal in goals]
+        start_dates = [goal.start_date for goal in goals]
+        end_dates = [goal.end_date for goal in goals]
+        
+        if self.workers_for(len(goals)) == 1:
+            chunks = [(0, _schedule_groups(registry, categories, start_dates, end_dates))]
+        else:
+            executor = self._get_executor()
+            offsets = range(0, len(goals), self.chunk_size)
+            futures = [
+                executor.submit(
+                    _schedule_chunk,
+                    categories[offset:offset + self.chunk_size],
+                    start_dates[offset:offset + self.chunk_size],
+                    end_dates[offset:offset + self.chunk_size],
+                    registry.source
+                )
+                for offset in offsets
+            ]
+            chunks = [(offset, future.result()) for offset, future in zip(offsets, futures)]
+        
+        per_goal: List[List[Dict[str, Any]]] = [[] for _ in goals]
+        for offset, groups in chunks:
+            for category, indexes, due_dates, mask in groups:
+                # 同一模板的任务公共字段只构建一次
+                bases = [
+                    {
+                        "title": task_template.title,
+                        "description": task_template.description,
+                        "priority": "medium",
+                        "estimated_duration": task_template.duration
+                    }
+                    for stage in registry.get(category)
+                    for task_template in stage.tasks
+                ]
+                for i, row_dates, row_mask in zip((indexes + offset).tolist(), due_dates.tolist(), mask.tolist()):
+                    goal_id = goal_ids[i]
+                    row_dates = restore_tzinfo(row_dates, start_dates[i].tzinfo)
+                    per_goal[i] = [
+                        {**base, "due_date": due_date, "goal_id": goal_id}
+                        for base, due_date, keep in zip(bases, row_dates, row_mask)
+                        if keep
+                    ]
+        return [row for rows in per_goal for row in rows]
+    
+    def shutdown(self):
+        """关闭进程池"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+# 模块级单例，应用内共享同一个进程池
+bulk_planner = BulkPlanner()
@@ -0,0 +1,119 @@
+import asyncio
+import json
+import os
+import threading
+from collections import defaultdict
+from typing import Any, AsyncIterator, Dict, Set
+
+# 每个连接最多积压的事件数，超出后丢弃积压并让客户端整体刷新一次
+SSE_QUEUE_SIZE = int(os.getenv("SSE_QUEUE_SIZE", "100"))
+
+# 空闲连接发送保活注释的间隔（秒），防止代理因空闲断开连接
+SSE_KEEPALIVE_SECONDS = float(os.getenv("SSE_KEEPALIVE_SECONDS", "25"))
+
+# 客户端断线后的重连间隔（毫秒）
+SSE_RETRY_MS = int(os.getenv("SSE_RETRY_MS", "5000"))
+
+class Subscription:
+    """一个仪表板连接：所属用户、事件队列和所在的事件循环"""
+    
+    __slots__ = ("user_id", "queue", "loop")
+    
+    def __init__(self, user_id: int, queue_size: int):
+        self.user_id = user_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.loop = asyncio.get_running_loop()
+
+class ChangeStream:
+    """按用户分发数据变更的进程内发布订阅
+    
+    写路径在任意线程中发布，事件通过 call_soon_threadsafe 投递到各连接所在的事件循环；
+    空闲连接只占用一个等待中的协程和一个空队列，没有订阅者的用户发布时没有任何开销
+    """
+    
+    def __init__(self, queue_size: int = SSE_QUEUE_SIZE, keepalive: float = SSE_KEEPALIVE_SECONDS,
+                 retry_ms: int = SSE_RETRY_MS):
+        self.queue_size = queue_size
+        self.keepalive = keepalive
+        self.retry_ms = retry_ms
+        self.stats = {"published": 0, "delivered": 0, "overflows": 0}
+        self._subscribers: Dict[int, Set[Subscription]] = defaultdict(set)
+        self._lock = threading.Lock()
+    
+    def subscribe(self, user_id: int) -> Subscription:
+        """在连接所在的事件循环中调用"""
+        subscription = Subscription(user_id, self.queue_size)
+        with self._lock:
+            self._subscribers[user_id].add(subscription)
+        return subscription
+    
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.user_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.user_id]
+    
+    def has_subscribers(self, user_id: int) -> bool:
+        """用户当前是否有打开的仪表板，没有时发布方可以跳过构造增量所需的查询"""
+        return user_id in self._subscribers
+    
+    def connection_count(self) -> int:
+        with self._lock:
+            return sum(len(subscribers) for subscribers in self._subscribers.values())
+    
+    def publish(self, user_id: int, event: Dict[str, Any]):
+        """向用户的所有连接发布事件，可在任意线程中调用"""
+        if user_id is None:
+            return
+        with self._lock:
+            subscribers = list(self._subscribers.get(user_id, ()))
+        self._dispatch(subscribers, event)
+    
+    def publish_all(self, event: Dict[str, Any]):
+        """向所有连接发布事件（如批量维护后要求全部刷新）"""
+        with self._lock:
+            subscribers = [s for group in self._subscribers.values() for s in group]
+        self._dispatch(subscribers, event)
+    
+    def _dispatch(self, subscribers, event: Dict[str, Any]):
+        self.stats["published"] += 1
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(self._deliver, subscription, event)
+            except RuntimeError:
+                # 事件循环已关闭，连接随之结束
+                pass
+    
+    def _deliver(self, subscription: Subscription, event: Dict[str, Any]):
+        """在连接所在的事件循环中执行；积压过多时用一次整体刷新代替丢失的增量"""
+        queue = subscription.queue
+        try:
+            queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.stats["overflows"] += 1
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait({"type": "resync"})
+        self.stats["delivered"] += 1
+    
+    async def iter_sse(self, user_id: int) -> AsyncIterator[str]:
+        """订阅用户的变更并编码为 Server-Sent Events，连接断开时生成器被取消并退订"""
+        subscription = self.subscribe(user_id)
+        try:
+            # 连接（包括断线重连）建立后客户端先整体加载一次，之后只接收增量
+            yield f"retry: {self.retry_ms}\nevent: ready\ndata: {{}}\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscription.queue.get(), self.keepalive)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                data = json.dumps(event, ensure_ascii=False, default=str, separators=(",", ":"))
+                yield f"event: {event['type']}\ndata: {data}\n\n"
+        finally:
+            self.unsubscribe(subscription)
+
+# 模块级单例，写路径和推送连接共用
+change_stream = ChangeStream()
@@ -0,0 +1,138 @@
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, case, and_
+from datetime import date, datetime, timedelta
+from typing import Dict, Any, Optional
+from models.models import Goal, Task, DailyStat
+
+class DashboardStatsService:
+    """仪表板统计服务，所有数字均在SQL中聚合，不创建ORM对象"""
+    
+    OPEN_STATUSES = ("pending", "in_progress")
+    
+    # 分析数据中始终列出的目标类别（没有目标时为 0）
+    CATEGORIES = ("健身", "学习", "工作", "其他")
+    
+    def _count_if(self, condition):
+        """SUM(CASE WHEN condition THEN 1 ELSE 0 END)"""
+        return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+    
+    def goal_counts_statement(self, user_id: int):
+        """目标总数与活跃目标数的聚合语句"""
+        return select(
+            func.count(Goal.id).label("total_goals"),
+            self._count_if(Goal.status == "active").label("active_goals")
+        ).where(Goal.user_id == user_id)
+    
+    def task_counts_statement(self, user_id: int, now: datetime = None, upcoming_days: int = 7):
+        """今日任务、今日完成、逾期和即将到来任务数的聚合语句"""
+        now = now or datetime.utcnow()
+        start_of_day = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        end_of_day = start_of_day + timedelta(days=1)
+        upcoming_end = now + timedelta(days=upcoming_days)
+        
+        is_today = and_(Task.due_date >= start_of_day, Task.due_date < end_of_day)
+        is_open = Task.status.in_(self.OPEN_STATUSES)
+        
+        return select(
+            self._count_if(is_today).label("today_tasks"),
+            self._count_if(and_(is_today, Task.status == "completed")).label("completed_today"),
+            self._count_if(and_(Task.due_date < now, is_open)).label("overdue_tasks"),
+            self._count_if(and_(Task.due_date >= now, Task.due_date <= upcoming_end, is_open)).label("upcoming_tasks")
+        ).join(Goal, Task.goal_id == Goal.id).where(Goal.user_id == user_id)
+    
+    def get_goal_counts(self, db: Session, user_id: int) -> Dict[str, int]:
+        """统计目标总数与活跃目标数"""
+        return dict(db.execute(self.goal_counts_statement(user_id)).one()._mapping)
+    
+    def get_task_counts(self, db: Session, user_id: int, now: datetime = None,
+                        upcoming_days: int = 7) -> Dict[str, int]:
+        """统计今日任务、今日完成、逾期和即将到来的任务数"""
+        statement = self.task_counts_statement(user_id, now, upcoming_days)
+        return dict(db.execute(statement).one()._mapping)
+    
+    def get_summary(self, db: Session, user_id: int) -> Dict[str, Any]:
+        """获取仪表板摘要（两次聚合查询）"""
+        return self._build_summary(
+            self.get_goal_counts(db, user_id),
+            self.get_task_counts(db, user_id)
+        )
+    
+    async def get_summary_async(self, db: AsyncSession, user_id: int) -> Dict[str, Any]:
+        """get_summary 的异步版本"""
+        goal_counts = (await db.execute(self.goal_counts_statement(user_id))).one()._mapping
+        task_counts = (await db.execute(self.task_counts_statement(user_id))).one()._mapping
+        return self._build_summary(dict(goal_counts), dict(task_counts))
+    
+    def _build_summary(self, goal_counts: Dict[str, int], task_counts: Dict[str, int]) -> Dict[str, Any]:
+        """组装摘要并计算今日完成率"""
+        total_tasks = task_counts["today_tasks"]
+        completed_tasks = task_counts["completed_today"]
+        
+        return {
+            "total_goals": goal_counts["total_goals"],
+            "active_goals": goal_counts["active_goals"],
+            "today_tasks": total_tasks,
+            "completed_today": completed_tasks,
+            "completion_rate": self._completion_rate(completed_tasks, total_tasks),
+            "overdue_tasks": task_counts["overdue_tasks"],
+            "upcoming_tasks": task_counts["upcoming_tasks"]
+        }
+    
+    def daily_stats_statement(self, user_id: int, start: date, end: date):
+        """[start, end) 内的每日统计，沿 (user_id, date) 主键做一次区间扫描"""
+        return select(
+            DailyStat.date, DailyStat.tasks_due, DailyStat.tasks_completed, DailyStat.minutes_planned
+        ).where(
+            DailyStat.user_id == user_id,
+            DailyStat.date >= start,
+            DailyStat.date < end
+        ).order_by(DailyStat.date)
+    
+    def category_counts_statement(self, user_id: int):
+        """各类别目标数的 GROUP BY 聚合语句（(user_id, category) 索引覆盖）"""
+        return select(Goal.category, func.count(Goal.id).label("goals")).where(
+            Goal.user_id == user_id
+        ).group_by(Goal.category)
+    
+    def get_analytics(self, db: Session, user_id: int, days: int = 7, today: Optional[date] = None) -> Dict[str, Any]:
+        """今天之前 days 天的完成趋势和各类别目标数（两次查询，均不读取任务表）
+        
+        每天的完成率为当天到期任务中已完成的比例，当天没有到期任务时为 None
+        """
+        today = today or datetime.utcnow().date()
+        start = today - timedelta(days=days)
+        stats = {row.date: row for row in db.execute(self.daily_stats_statement(user_id, start, today))}
+        
+        category_stats = dict.fromkeys(self.CATEGORIES, 0)
+        for row in db.execute(self.category_counts_statement(user_id)):
+            category_stats[row.category] = row.goals
+        
+        label_format = "%m-%d" if days <= 31 else "%Y-%m-%d"
+        trend = {"labels": [], "data": [], "tasks_due": [], "tasks_completed": [], "minutes_planned": []}
+        for offset in range(days):
+            day = start + timedelta(days=offset)
+            row = stats.get(day)
+            due, completed, minutes = (row.tasks_due, row.tasks_completed, row.minutes_planned) if row else (0, 0, 0)
+            trend["labels"].append(day.strftime(label_format))
+            trend["data"].append(self._completion_rate(completed, due) if due > 0 else None)
+            trend["tasks_due"].append(due)
+            trend["tasks_completed"].append(completed)
+            trend["minutes_planned"].append(minutes)
+        
+        total_due = sum(trend["tasks_due"])
+        total_completed = sum(trend["tasks_completed"])
+        return {
+            "days": days,
+            "category_stats": category_stats,
+            "completion_trend": trend,
+            "totals": {
+                "tasks_due": total_due,
+                "tasks_completed": total_completed,
+                "minutes_planned": sum(trend["minutes_planned"]),
+                "completion_rate": self._completion_rate(total_completed, total_due)
+            }
+        }
+    
+    def _completion_rate(self, completed: int, total: int) -> float:
+        return round(completed / total * 100, 1) if total > 0 else 0
@@ -1,45 +1,95 @@
 from sqlalchemy.orm import Session
+from sqlalchemy import func, case, update, insert
+import time
 from datetime import datetime
-from typing import List, Optional
-from models.models import Goal, User
+from typing import List, Optional, Dict, Iterable, Tuple
+from models.models import Goal, User, Task
 from models.schemas import GoalCreate
+from .task_service import TaskService, goal_delta
 from .ai_planner import AIPlanner
+from .bulk_planner import BatchImportMetrics, bulk_planner
+from .model_planner import model_planner
+from .read_cache import read_cache
+from .change_stream import change_stream
+
+def progress_from_counts(completed_count: int, total_count: int) -> float:
+    """由目标上的任务计数得出完成进度（0-100）"""
+    if not total_count:
+        return 0.0
+    return min(completed_count * 100.0 / total_count, 100.0)
 
 class GoalService:
+    # 单条语句中 IN 列表的最大参数个数，低于 SQLite 默认的变量上限
+    IN_BATCH_SIZE = 500
+    
     def __init__(self):
         self.ai_planner = AIPlanner()
     
     def create_goal(self, db: Session, goal_data: GoalCreate, user_id: int) -> Goal:
         """创建新目标并自动生成任务计划"""
-        # 创建目标
-        goal = Goal(
-            title=goal_data.title,
-            description=goal_data.description,
-            category=goal_data.category,
-            start_date=goal_data.start_date,
-            end_date=goal_data.end_date,
-            user_id=user_id
-        )
-        db.add(goal)
-        db.commit()
-        db.refresh(goal)
+        return self.create_goals(db, [goal_data], user_id)[0]
+    
+    def create_goals(self, db: Session, goals_data: List[GoalCreate], user_id: int,
+                     metrics: Optional[BatchImportMetrics] = None) -> List[Goal]:
+        """批量创建目标，目标和规划出的全部任务在同一事务中写入
         
-        # 使用AI规划器生成任务
-        tasks = self.ai_planner.plan_goal(
-            goal_data.title,
-            goal_data.description,
-            goal_data.category,
-            goal_data.start_date,
-            goal_data.end_date
-        )
+        传入 metrics 时记录规划、写入各阶段的耗时和任务吞吐量
+        """
+        metrics = metrics or BatchImportMetrics()
+        if not goals_data:
+            return []
+        t0 = time.perf_counter()
         
-        # 创建任务
-        from .task_service import TaskService
-        task_service = TaskService()
-        for task_data in tasks:
-            task_service.create_task(db, task_data, goal.id)
+        # 配置了模型后端时先完成规划再开启写事务，避免等待模型期间占用数据库写锁
+        plans = model_planner.plan_goals(goals_data) if model_planner.enabled else None
+        t_model = time.perf_counter()
         
-        return goal
+        # 一条多行 INSERT ... RETURNING 写入全部目标，按参数顺序返回ID，不经过 ORM 工作单元
+        goal_ids = db.execute(
+            insert(Goal).returning(Goal.id, sort_by_parameter_order=True),
+            [
+                {
+                    "title": goal_data.title,
+                    "description": goal_data.description,
+                    "category": goal_data.category,
+                    "start_date": goal_data.start_date,
+                    "end_date": goal_data.end_date,
+                    "user_id": user_id
+                }
+                for goal_data in goals_data
+            ]
+        ).scalars().all()
+        
+        # 批量规划任务：大批量时由进程池计算截止时间，直接生成待插入的任务行
+        t1 = time.perf_counter()
+        if plans is None:
+            task_rows = bulk_planner.plan_task_rows(goals_data, goal_ids, self.ai_planner)
+        else:
+            task_rows = [{**task, "goal_id": goal_id} for goal_id, tasks in zip(goal_ids, plans) for task in tasks]
+        t2 = time.perf_counter()
+        
+        # 一条 executemany 插入全部任务并一次提交
+        TaskService().bulk_create_tasks(db, task_rows, user_id)
+        db.commit()
+        read_cache.invalidate_user(user_id)
+        # 批量导入只推送一条事件，仪表板收到后整体刷新
+        change_stream.publish(user_id, {"type": "goals_created", "count": len(goal_ids)})
+        t3 = time.perf_counter()
+        
+        # 按批次一次性加载创建的目标，按传入顺序返回
+        loaded = {}
+        for i in range(0, len(goal_ids), self.IN_BATCH_SIZE):
+            for goal in db.query(Goal).filter(Goal.id.in_(goal_ids[i:i + self.IN_BATCH_SIZE])):
+                loaded[goal.id] = goal
+        goals = [loaded[goal_id] for goal_id in goal_ids]
+        
+        metrics.goals = len(goals)
+        metrics.tasks = len(task_rows)
+        metrics.workers = bulk_planner.workers_for(len(goals))
+        metrics.plan_ms = (t_model - t0 + t2 - t1) * 1000
+        metrics.insert_ms = (t3 - t2 + t1 - t_model) * 1000
+        metrics.total_ms = (t3 - t0) * 1000
+        return goals
     
     def get_user_goals(self, db: Session, user_id: int) -> List[Goal]:
         """获取用户的所有目标"""
@@ -57,36 +107,88 @@ class GoalService:
             if progress >= 100:
                 goal.status = "completed"
             db.commit()
+            read_cache.invalidate_user(goal.user_id)
             db.refresh(goal)
+            change_stream.publish(goal.user_id, {"type": "goal_progress", "goal": goal_delta(goal)})
         return goal
     
     def delete_goal(self, db: Session, goal_id: int, user_id: int) -> bool:
         """删除目标"""
         goal = db.query(Goal).filter(Goal.id == goal_id, Goal.user_id == user_id).first()
         if goal:
+            # 目标删除后其任务不再属于用户的计划，先从每日统计中减去
+            TaskService().subtract_goal_daily_stats(db, goal_id)
             db.delete(goal)
             db.commit()
+            read_cache.invalidate_user(user_id)
+            change_stream.publish(user_id, {"type": "goal_deleted", "goal_id": goal_id})
             return True
         return False
     
     def calculate_goal_progress(self, db: Session, goal_id: int) -> float:
         """计算目标完成进度"""
-        from .task_service import TaskService
-        task_service = TaskService()
+        return self.calculate_progress_for_goals(db, [goal_id]).get(goal_id, 0.0)
+    
+    def calculate_progress_for_goals(self, db: Session, goal_ids: Iterable[int]) -> Dict[int, float]:
+        """批量读取目标完成进度，直接使用目标上的任务计数，不再聚合任务表"""
+        goal_ids = list(dict.fromkeys(goal_ids))
+        progress_map = {goal_id: 0.0 for goal_id in goal_ids}
         
-        goal = db.query(Goal).filter(Goal.id == goal_id).first()
-        if not goal:
-            return 0.0
+        for i in range(0, len(goal_ids), self.IN_BATCH_SIZE):
+            batch = goal_ids[i:i + self.IN_BATCH_SIZE]
+            rows = db.query(Goal.id, Goal.completed_count, Goal.total_count).filter(Goal.id.in_(batch)).all()
+            for row in rows:
+                progress_map[row.id] = progress_from_counts(row.completed_count, row.total_count)
         
-        tasks = task_service.get_goal_tasks(db, goal_id)
-        if not tasks:
-            return 0.0
+        return progress_map
+    
+    def count_tasks_for_goals(self, db: Session, goal_ids: Iterable[int]) -> Dict[int, Tuple[int, int]]:
+        """按任务表实际统计目标的 (任务总数, 已完成数)，每批目标一次 GROUP BY 聚合查询"""
+        goal_ids = list(dict.fromkeys(goal_ids))
+        counts = {goal_id: (0, 0) for goal_id in goal_ids}
         
-        completed_tasks = sum(1 for task in tasks if task.status == "completed")
-        total_tasks = len(tasks)
+        for i in range(0, len(goal_ids), self.IN_BATCH_SIZE):
+            batch = goal_ids[i:i + self.IN_BATCH_SIZE]
+            rows = db.query(
+                Task.goal_id,
+                func.count(Task.id).label("total_tasks"),
+                func.sum(case((Task.status == "completed", 1), else_=0)).label("completed_tasks")
+            ).filter(Task.goal_id.in_(batch)).group_by(Task.goal_id).all()
+            
+            for row in rows:
+                counts[row.goal_id] = (row.total_tasks, row.completed_tasks)
         
-        progress = (completed_tasks / total_tasks) * 100
-        return min(progress, 100.0)
+        return counts
+    
+    def reconcile_goal_counts(self, db: Session, page_size: int = IN_BATCH_SIZE) -> int:
+        """一致性检查：按目标ID分页比对计数与任务表，只修正不一致的目标，返回修正数量"""
+        fixed = 0
+        last_id = 0
+        while True:
+            goals = db.query(Goal.id, Goal.total_count, Goal.completed_count).filter(
+                Goal.id > last_id
+            ).order_by(Goal.id).limit(page_size).all()
+            if not goals:
+                return fixed
+            last_id = goals[-1].id
+            
+            actual = self.count_tasks_for_goals(db, [goal.id for goal in goals])
+            rows = [
+                {
+                    "id": goal.id,
+                    "total_count": actual[goal.id][0],
+                    "completed_count": actual[goal.id][1],
+                    "progress": progress_from_counts(actual[goal.id][1], actual[goal.id][0])
+                }
+                for goal in goals
+                if (goal.total_count, goal.completed_count) != actual[goal.id]
+            ]
+            if rows:
+                db.execute(update(Goal), rows)
+                db.commit()
+                read_cache.invalidate_all()
+                change_stream.publish_all({"type": "resync"})
+                fixed += len(rows)
     
     def get_goals_by_category(self, db: Session, user_id: int, category: str) -> List[Goal]:
         """按类别获取目标"""
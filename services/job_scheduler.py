@@ -0,0 +1,269 @@
+import os
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Optional
+from sqlalchemy import select, update, or_
+from models.database import SessionLocal
+from models.models import ScheduledJob
+
+# 租约时长（秒），持有租约的进程崩溃后，其他进程在租约过期后接管任务
+JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", "300"))
+
+# 没有任务到期时的最长休眠时间（秒），用于发现其他进程释放或过期的租约
+JOB_MAX_SLEEP_SECONDS = float(os.getenv("JOB_MAX_SLEEP_SECONDS", "300"))
+
+# 同时执行的任务数
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+
+def compute_next_run(schedule: str, after: datetime) -> datetime:
+    """根据调度规则计算 after（UTC）之后的下一次执行时间（UTC）
+    
+    支持 "daily HH:MM"（服务器本地时间）和 "every <秒数>"
+    """
+    kind, _, value = schedule.partition(" ")
+    if kind == "every":
+        return after + timedelta(seconds=float(value))
+    if kind == "daily":
+        hour, minute = (int(part) for part in value.split(":"))
+        local_after = after.replace(tzinfo=timezone.utc).astimezone()
+        candidate = local_after.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        if candidate <= local_after:
+            candidate += timedelta(days=1)
+        return candidate.astimezone(timezone.utc).replace(tzinfo=None)
+    raise ValueError(f"无法识别的调度规则: {schedule}")
+
+class JobScheduler:
+    """数据库驱动的任务调度器
+    
+    任务的下一次执行时间存放在 scheduled_jobs 表中，多个进程通过行级租约竞争，
+    同一时刻每个任务只会在一个进程中执行；调度线程按最近的到期时间休眠，
+    停止时立即唤醒退出
+    """
+    
+    def __init__(self, session_factory=SessionLocal, owner: Optional[str] = None,
+                 lease_seconds: int = JOB_LEASE_SECONDS, max_sleep: float = JOB_MAX_SLEEP_SECONDS,
+                 workers: int = JOB_WORKERS):
+        self.session_factory = session_factory
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.lease_seconds = lease_seconds
+        self.max_sleep = max_sleep
+        self.workers = workers
+        self.jobs: Dict[str, Callable[[], object]] = {}
+        self.schedules: Dict[str, str] = {}
+        
+        self._running: Dict[str, Future] = {}
+        self._running_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+    
+    def register(self, name: str, func: Callable[[], object], schedule: str):
+        """注册任务；表中不存在时创建，调度规则变化时重新计算下一次执行时间"""
+        compute_next_run(schedule, datetime.utcnow())  # 提前校验规则
+        self.jobs[name] = func
+        self.schedules[name] = schedule
+        
+        db = self.session_factory()
+        try:
+            job = db.get(ScheduledJob, name)
+            if job is None:
+                db.add(ScheduledJob(
+                    name=name,
+                    schedule=schedule,
+                    next_run_at=compute_next_run(schedule, datetime.utcnow())
+                ))
+            elif job.schedule != schedule:
+                job.schedule = schedule
+                job.next_run_at = compute_next_run(schedule, datetime.utcnow())
+            db.commit()
+        except Exception:
+            # 其他进程同时注册了同名任务
+            db.rollback()
+        finally:
+            db.close()
+        self._wakeup.set()
+    
+    def start(self):
+        """启动调度线程"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="job")
+        self._thread = threading.Thread(target=self._run, name="job-scheduler", daemon=True)
+        self._thread.start()
+    
+    def stop(self, timeout: float = 5.0):
+        """立即停止调度，最多等待 timeout 秒让正在执行的任务结束"""
+        self._stopping.set()
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+        
+        deadline = time.monotonic() + timeout
+        with self._running_lock:
+            running = list(self._running.values())
+        for future in running:
+            try:
+                future.result(timeout=max(0.0, deadline - time.monotonic()))
+            except Exception:
+                pass
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+    
+    def run_now(self, name: str):
+        """将任务的下一次执行时间提前到现在"""
+        db = self.session_factory()
+        try:
+            db.execute(update(ScheduledJob).where(ScheduledJob.name == name).values(next_run_at=datetime.utcnow()))
+            db.commit()
+        finally:
+            db.close()
+        self._wakeup.set()
+    
+    def _run(self):
+        while not self._stopping.is_set():
+            self._wakeup.clear()
+            try:
+                self._renew_leases()
+                for name in self._due_jobs():
+                    if self._stopping.is_set():
+                        break
+                    if self._acquire(name):
+                        self._submit(name)
+                timeout = self._seconds_until_next_wakeup()
+            except Exception as e:
+                print(f"任务调度出错: {e}")
+                timeout = self.max_sleep
+            self._wakeup.wait(timeout)
+    
+    def _due_jobs(self):
+        """本进程注册的、已到期且租约空闲或已过期的任务"""
+        now = datetime.utcnow()
+        with self._running_lock:
+            running = set(self._running)
+        candidates = [name for name in self.jobs if name not in running]
+        if not candidates:
+            return []
+        db = self.session_factory()
+        try:
+            return db.execute(
+                select(ScheduledJob.name).where(
+                    ScheduledJob.name.in_(candidates),
+                    ScheduledJob.next_run_at <= now,
+                    or_(ScheduledJob.lease_owner.is_(None), ScheduledJob.lease_expires_at < now)
+                )
+            ).scalars().all()
+        finally:
+            db.close()
+    
+    def _acquire(self, name: str) -> bool:
+        """条件更新获取租约，只有一个进程能更新成功"""
+        now = datetime.utcnow()
+        db = self.session_factory()
+        try:
+            result = db.execute(
+                update(ScheduledJob)
+                .where(
+                    ScheduledJob.name == name,
+                    ScheduledJob.next_run_at <= now,
+                    or_(ScheduledJob.lease_owner.is_(None), ScheduledJob.lease_expires_at < now)
+                )
+                .values(lease_owner=self.owner, lease_expires_at=now + timedelta(seconds=self.lease_seconds))
+            )
+            db.commit()
+            return result.rowcount == 1
+        finally:
+            db.close()
+    
+    def _submit(self, name: str):
+        started_at = datetime.utcnow()
+        future = self._executor.submit(self.jobs[name])
+        with self._running_lock:
+            self._running[name] = future
+        future.add_done_callback(lambda f: self._finish(name, f, started_at))
+    
+    def _finish(self, name: str, future: Future, started_at: datetime):
+        """任务结束：记录结果，计算下一次执行时间并释放租约"""
+        error = None
+        if future.cancelled():
+            error = "cancelled"
+        elif future.exception() is not None:
+            error = f"{type(future.exception()).__name__}: {future.exception()}"
+            print(f"任务 {name} 执行失败: {error}")
+        
+        db = self.session_factory()
+        try:
+            values = {"lease_owner": None, "lease_expires_at": None}
+            if error != "cancelled":
+                values.update(
+                    next_run_at=compute_next_run(self.schedules[name], datetime.utcnow()),
+                    last_run_at=started_at,
+                    last_status="error" if error else "success",
+                    last_error=error
+                )
+            db.execute(
+                update(ScheduledJob)
+                .where(ScheduledJob.name == name, ScheduledJob.lease_owner == self.owner)
+                .values(**values)
+            )
+            db.commit()
+        finally:
+            db.close()
+            with self._running_lock:
+                self._running.pop(name, None)
+            self._wakeup.set()
+    
+    def _renew_leases(self):
+        """延长本进程正在执行的任务的租约"""
+        with self._running_lock:
+            running = list(self._running)
+        if not running:
+            return
+        db = self.session_factory()
+        try:
+            db.execute(
+                update(ScheduledJob)
+                .where(ScheduledJob.name.in_(running), ScheduledJob.lease_owner == self.owner)
+                .values(lease_expires_at=datetime.utcnow() + timedelta(seconds=self.lease_seconds))
+            )
+            db.commit()
+        finally:
+            db.close()
+    
+    def _seconds_until_next_wakeup(self) -> float:
+        """距离下一次需要醒来的秒数：最近的到期时间或被他人持有的租约过期时间"""
+        with self._running_lock:
+            running = set(self._running)
+        timeout = self.max_sleep
+        if running:
+            # 执行中的任务需要定期续租
+            timeout = min(timeout, self.lease_seconds / 3)
+        
+        candidates = [name for name in self.jobs if name not in running]
+        if not candidates:
+            return timeout
+        
+        db = self.session_factory()
+        try:
+            rows = db.execute(
+                select(ScheduledJob.next_run_at, ScheduledJob.lease_owner, ScheduledJob.lease_expires_at)
+                .where(ScheduledJob.name.in_(candidates))
+            ).all()
+        finally:
+            db.close()
+        if not rows:
+            return timeout
+        
+        # 被其他进程持有的任务，要等到租约过期才可能接管
+        next_due = min(
+            max(row.next_run_at, row.lease_expires_at) if row.lease_owner and row.lease_expires_at else row.next_run_at
+            for row in rows
+        )
+        return min(timeout, max(0.0, (next_due - datetime.utcnow()).total_seconds()))
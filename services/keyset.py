@@ -0,0 +1,26 @@
+from typing import Any, List, Optional, Sequence
+from sqlalchemy.ext.asyncio import AsyncSession
+
+def entity_columns(entity, fields: Optional[Sequence[str]] = None) -> list:
+    """查询的选取项：未指定 fields 时为整个实体，否则只选取这些列"""
+    return [getattr(entity, name) for name in fields] if fields else [entity]
+
+def keyset_page(stmt, id_column, after: Optional[int] = None, limit: Optional[int] = None):
+    """按主键的键集分页：取 id 大于 after 的记录，按 id 升序
+    
+    与 OFFSET 不同，翻到后面的页时不需要先扫描并丢弃前面的行，翻页期间有插入或删除也不会重复或遗漏
+    """
+    if after is not None:
+        stmt = stmt.where(id_column > after)
+    stmt = stmt.order_by(id_column)
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    return stmt
+
+async def fetch_page(db: AsyncSession, stmt, fields: Optional[Sequence[str]] = None) -> List[Any]:
+    """执行 entity_columns 构造的查询：整个实体时返回 ORM 对象，只选部分列时返回字典"""
+    if fields:
+        result = await db.execute(stmt)
+        return [dict(row) for row in result.mappings()]
+    result = await db.scalars(stmt)
+    return result.all()
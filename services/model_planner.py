@@ -0,0 +1,198 @@
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from .ai_planner import AIPlanner
+from .planner_backends import PlannerBackend, TemplateBackend, BACKEND_TYPES
+
+# 规划后端：template（内置模板，默认）或 http（模型服务）
+PLANNER_BACKEND = os.getenv("PLANNER_BACKEND", "template")
+
+# 单个目标的规划超时时间（秒，含排队等待），超时后使用模板规划
+PLANNER_TIMEOUT_SECONDS = float(os.getenv("PLANNER_TIMEOUT_SECONDS", "10"))
+
+# 同时进行的模型调用上限
+PLANNER_MAX_CONCURRENCY = int(os.getenv("PLANNER_MAX_CONCURRENCY", "4"))
+
+# 规划结果缓存的条目数上限和有效期（秒）
+PLANNER_CACHE_SIZE = int(os.getenv("PLANNER_CACHE_SIZE", "1024"))
+PLANNER_CACHE_TTL_SECONDS = float(os.getenv("PLANNER_CACHE_TTL_SECONDS", "86400"))
+
+# 缓存的规划：(不含截止时间的任务字段, 截止时间相对目标开始时间的偏移)
+CachedPlan = Tuple[Tuple[Dict[str, Any], timedelta], ...]
+
+def plan_cache_key(title: str, description: str, category: str,
+                   start_date: datetime, end_date: datetime) -> str:
+    """按 (标题, 描述, 类别, 时长) 计算内容地址，开始时间不同但时长相同的目标共用同一份规划"""
+    duration = int((end_date - start_date).total_seconds())
+    raw = json.dumps([title, description or "", category, duration], ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+class PlanCache:
+    """LRU + TTL 规划缓存，只在规划器的事件循环线程中访问"""
+    
+    def __init__(self, maxsize: int = PLANNER_CACHE_SIZE, ttl: float = PLANNER_CACHE_TTL_SECONDS,
+                 clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, CachedPlan]]" = OrderedDict()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def get(self, key: str) -> Optional[CachedPlan]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, plan = entry
+        if expires_at <= self.clock():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return plan
+    
+    def put(self, key: str, plan: CachedPlan):
+        self._entries[key] = (self.clock() + self.ttl, plan)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+class ModelPlanner:
+    """调用规划后端（模型服务）的规划器
+    
+    相同内容的规划命中缓存或合并到同一个进行中的请求，模型调用数受信号量限制，
+    超时或失败时回退到模板规划。所有调用在独立线程的事件循环上执行，
+    同步服务和不同请求线程共享同一份缓存、进行中的请求和并发上限
+    """
+    
+    def __init__(self, backend: PlannerBackend, fallback: Optional[AIPlanner] = None,
+                 timeout: float = PLANNER_TIMEOUT_SECONDS, max_concurrency: int = PLANNER_MAX_CONCURRENCY,
+                 cache: Optional[PlanCache] = None):
+        self.backend = backend
+        self.fallback = fallback or AIPlanner()
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.cache = cache or PlanCache()
+        self.stats = {"requests": 0, "cache_hits": 0, "coalesced": 0, "model_calls": 0, "fallbacks": 0}
+        
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+    
+    @property
+    def enabled(self) -> bool:
+        """是否配置了模板以外的后端；未配置时由调用方直接走批量模板规划"""
+        return not isinstance(self.backend, TemplateBackend)
+    
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        """首次使用时在后台线程中启动事件循环"""
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, name="model-planner", daemon=True)
+                self._thread.start()
+            return self._loop
+    
+    def submit(self, title: str, description: str, category: str,
+               start_date: datetime, end_date: datetime) -> Future:
+        """从任意线程提交规划，返回 concurrent.futures.Future"""
+        return asyncio.run_coroutine_threadsafe(
+            self._plan_goal(title, description, category, start_date, end_date), self._get_loop()
+        )
+    
+    async def plan_goal(self, title: str, description: str, category: str,
+                        start_date: datetime, end_date: datetime) -> List[Dict[str, Any]]:
+        """异步规划单个目标，可在任意事件循环中等待"""
+        return await asyncio.wrap_future(self.submit(title, description, category, start_date, end_date))
+    
+    def plan_goals(self, goals: Sequence[Any]) -> List[List[Dict[str, Any]]]:
+        """同步批量规划，各目标并发请求；goals 中的元素需要有 title、description、category、start_date、end_date 属性"""
+        futures = [
+            self.submit(goal.title, goal.description, goal.category, goal.start_date, goal.end_date)
+            for goal in goals
+        ]
+        return [future.result() for future in futures]
+    
+    async def _plan_goal(self, title: str, description: str, category: str,
+                         start_date: datetime, end_date: datetime) -> List[Dict[str, Any]]:
+        self.stats["requests"] += 1
+        key = plan_cache_key(title, description, category, start_date, end_date)
+        plan = self.cache.get(key)
+        if plan is not None:
+            self.stats["cache_hits"] += 1
+            return self._materialize(plan, start_date)
+        
+        # 相同内容的规划已在进行中时等待同一个结果，不重复调用模型
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._call_backend(key, title, description, category, start_date, end_date))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.stats["coalesced"] += 1
+        
+        plan = await asyncio.shield(task)
+        if plan is None:
+            self.stats["fallbacks"] += 1
+            return self.fallback.plan_goal(title, description, category, start_date, end_date)
+        return self._materialize(plan, start_date)
+    
+    async def _call_backend(self, key: str, title: str, description: str, category: str,
+                            start_date: datetime, end_date: datetime) -> Optional[CachedPlan]:
+        """调用后端并写入缓存，超时或失败时返回 None（失败结果不缓存）"""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+        
+        async def call():
+            async with self._slots:
+                self.stats["model_calls"] += 1
+                return await self.backend.plan(title, description, category, start_date, end_date)
+        
+        try:
+            tasks = await asyncio.wait_for(call(), self.timeout)
+        except Exception as e:
+            print(f"模型规划失败，使用模板规划: {type(e).__name__}: {e}")
+            return None
+        
+        plan = tuple(
+            ({field: value for field, value in task.items() if field != "due_date"}, task["due_date"] - start_date)
+            for task in tasks
+        )
+        self.cache.put(key, plan)
+        return plan
+    
+    def _materialize(self, plan: CachedPlan, start_date: datetime) -> List[Dict[str, Any]]:
+        """按目标的开始时间还原截止时间"""
+        return [{**fields, "due_date": start_date + offset} for fields, offset in plan]
+    
+    def shutdown(self, timeout: float = 10.0):
+        """关闭后端连接并停止事件循环"""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self.backend.close(), loop).result(timeout)
+        finally:
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(timeout)
+            loop.close()
+        self._inflight.clear()
+        self._slots = None
+
+def build_backend(name: str = PLANNER_BACKEND) -> PlannerBackend:
+    """按名称创建规划后端"""
+    return BACKEND_TYPES[name]()
+
+# 模块级单例，应用内共享缓存和并发上限
+model_planner = ModelPlanner(build_backend())
@@ -0,0 +1,55 @@
+import asyncio
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List
+
+class NotificationChannel(ABC):
+    """通知渠道接口，渠道以批为单位发送，整批失败时抛出异常由调度器重试"""
+    
+    name: str = ""
+    
+    # 单批最多包含的通知数
+    batch_size: int = 100
+    
+    # 单批发送超时时间（秒）
+    timeout: float = 30.0
+    
+    @abstractmethod
+    async def send_batch(self, notifications: List[Dict[str, Any]]) -> None:
+        """发送一批通知"""
+
+class ConsoleChannel(NotificationChannel):
+    """控制台渠道，输出到标准输出"""
+    
+    name = "console"
+    
+    async def send_batch(self, notifications: List[Dict[str, Any]]) -> None:
+        for notification in notifications:
+            print(f"发送通知: {notification}")
+
+class StubChannel(NotificationChannel):
+    """本地桩渠道，记录收到的通知，可模拟延迟和失败，用于测试调度器"""
+    
+    def __init__(self, name: str = "stub", fail_times: int = 0, delay: float = 0.0, batch_size: int = 100):
+        self.name = name
+        self.fail_times = fail_times
+        self.delay = delay
+        self.batch_size = batch_size
+        self.sent: List[Dict[str, Any]] = []
+        self.batches: List[int] = []
+        self.calls = 0
+    
+    async def send_batch(self, notifications: List[Dict[str, Any]]) -> None:
+        self.calls += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.fail_times > 0:
+            self.fail_times -= 1
+            raise RuntimeError(f"{self.name} 渠道模拟发送失败")
+        self.sent.extend(notifications)
+        self.batches.append(len(notifications))
+
+# 内置渠道，NOTIFICATION_CHANNELS 环境变量按名称选择
+CHANNEL_TYPES = {
+    ConsoleChannel.name: ConsoleChannel,
+    "stub": StubChannel,
+}
@@ -0,0 +1,392 @@
+import asyncio
+import json
+import os
+import random
+import threading
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence
+from sqlalchemy import select, update, delete, insert, func, or_, event
+from sqlalchemy.orm import Session
+from models.database import SessionLocal
+from models.models import NotificationOutbox, Notification
+from .notification_channels import NotificationChannel, CHANNEL_TYPES
+from .notification_history_service import NotificationHistoryService
+
+# 启用的渠道，逗号分隔
+NOTIFICATION_CHANNELS = os.getenv("NOTIFICATION_CHANNELS", "console")
+
+# 最大尝试次数，超过后标记为 failed
+NOTIFICATION_MAX_ATTEMPTS = int(os.getenv("NOTIFICATION_MAX_ATTEMPTS", "5"))
+
+# 指数退避的初始间隔和上限（秒）
+NOTIFICATION_RETRY_BASE_SECONDS = float(os.getenv("NOTIFICATION_RETRY_BASE_SECONDS", "5"))
+NOTIFICATION_RETRY_MAX_SECONDS = float(os.getenv("NOTIFICATION_RETRY_MAX_SECONDS", "600"))
+
+# 每个渠道内存中最多排队的批次数，队列满时停止从发件箱认领新通知
+NOTIFICATION_MAX_PENDING_BATCHES = int(os.getenv("NOTIFICATION_MAX_PENDING_BATCHES", "4"))
+
+# 发件箱写缓冲达到该数量时立即落库
+NOTIFICATION_OUTBOX_FLUSH_SIZE = int(os.getenv("NOTIFICATION_OUTBOX_FLUSH_SIZE", "500"))
+
+# 无事可做时的最长休眠时间（秒）
+NOTIFICATION_POLL_SECONDS = float(os.getenv("NOTIFICATION_POLL_SECONDS", "5"))
+
+# 认领后超过该时间仍未完成的通知视为认领者已退出，重新进入待发送状态
+NOTIFICATION_CLAIM_TIMEOUT_SECONDS = float(os.getenv("NOTIFICATION_CLAIM_TIMEOUT_SECONDS", "300"))
+
+def build_channels(names: str = NOTIFICATION_CHANNELS) -> List[NotificationChannel]:
+    """按名称创建渠道实例"""
+    return [CHANNEL_TYPES[name.strip()]() for name in names.split(",") if name.strip()]
+
+class NotificationDispatcher:
+    """通知投递调度器
+    
+    通知先批量写入 notification_outbox 表（同一事务内追加通知历史），再由独立线程中的
+    asyncio 循环按渠道认领、分批发送；失败按指数退避重试。多个进程可以同时运行调度器，
+    每条通知只会被一个进程认领，认领者崩溃后超时未完成的通知会重新投递
+    """
+    
+    def __init__(self, channels: Optional[List[NotificationChannel]] = None, session_factory=SessionLocal,
+                 max_attempts: int = NOTIFICATION_MAX_ATTEMPTS,
+                 retry_base_seconds: float = NOTIFICATION_RETRY_BASE_SECONDS,
+                 retry_max_seconds: float = NOTIFICATION_RETRY_MAX_SECONDS,
+                 max_pending_batches: int = NOTIFICATION_MAX_PENDING_BATCHES,
+                 flush_size: int = NOTIFICATION_OUTBOX_FLUSH_SIZE,
+                 poll_interval: float = NOTIFICATION_POLL_SECONDS,
+                 claim_timeout: float = NOTIFICATION_CLAIM_TIMEOUT_SECONDS,
+                 history_service: Optional[NotificationHistoryService] = NotificationHistoryService()):
+        if channels is None:
+            channels = build_channels()
+        self.channels: Dict[str, NotificationChannel] = {channel.name: channel for channel in channels}
+        self.session_factory = session_factory
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+        self.retry_max_seconds = retry_max_seconds
+        self.max_pending_batches = max_pending_batches
+        self.flush_size = flush_size
+        self.poll_interval = poll_interval
+        self.claim_timeout = claim_timeout
+        self.history_service = history_service
+        self.stats = {"enqueued": 0, "sent": 0, "retried": 0, "failed": 0}
+        
+        self._buffer: List[Dict[str, Any]] = []
+        self._history_buffer: List[Dict[str, Any]] = []
+        self._buffer_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stopping: Optional[asyncio.Event] = None
+    
+    # ---------- 生产者（线程安全） ----------
+    
+    def enqueue(self, notification: Dict[str, Any], channels: Optional[Sequence[str]] = None):
+        """将通知加入写缓冲，缓冲满时批量写入发件箱"""
+        payload = json.dumps(notification, ensure_ascii=False, default=str)
+        rows = [{"channel": name, "payload": payload} for name in (channels or self.channels)]
+        history_row = self.history_service.build_row(notification) if self.history_service else None
+        with self._buffer_lock:
+            self._buffer.extend(rows)
+            if history_row is not None:
+                self._history_buffer.append(history_row)
+            should_flush = len(self._buffer) >= self.flush_size
+        if should_flush:
+            self.flush()
+    
+    def flush(self, db: Optional[Session] = None) -> int:
+        """把写缓冲中的通知和通知历史在一个事务内批量写入
+        
+        传入 db 时写入调用方的事务、由调用方提交，可与其它写入（如推进提醒时间）原子提交
+        """
+        with self._buffer_lock:
+            rows, self._buffer = self._buffer, []
+            history_rows, self._history_buffer = self._history_buffer, []
+        if not rows and not history_rows:
+            return 0
+        
+        own_session = db is None
+        if own_session:
+            db = self.session_factory()
+        try:
+            if rows:
+                db.execute(insert(NotificationOutbox), rows)
+            if history_rows:
+                db.execute(insert(Notification), history_rows)
+            if own_session:
+                db.commit()
+        except Exception:
+            if own_session:
+                db.rollback()
+            # 写入失败时放回缓冲，下次再试
+            self._restore(rows, history_rows)
+            raise
+        finally:
+            if own_session:
+                db.close()
+        
+        if own_session:
+            self._flushed(len(rows))
+        else:
+            # 调用方提交后这些通知才能被认领；事务回滚时放回缓冲，由下一次写入重试
+            settled = []
+            
+            def settle(committed: bool):
+                if settled:
+                    return
+                settled.append(committed)
+                if committed:
+                    self._flushed(len(rows))
+                else:
+                    self._restore(rows, history_rows)
+            
+            event.listen(db, "after_commit", lambda session: settle(True), once=True)
+            event.listen(db, "after_rollback", lambda session: settle(False), once=True)
+        return len(rows)
+    
+    def _restore(self, rows: List[Dict[str, Any]], history_rows: List[Dict[str, Any]]):
+        """把未能写入的通知放回写缓冲头部"""
+        with self._buffer_lock:
+            self._buffer[:0] = rows
+            self._history_buffer[:0] = history_rows
+    
+    def _flushed(self, count: int):
+        """通知已提交到发件箱，唤醒调度循环"""
+        self._add_stat("enqueued", count)
+        self._wake()
+    
+    # ---------- 生命周期 ----------
+    
+    def start(self):
+        """在后台线程中启动调度循环"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._ready.clear()
+        self._thread = threading.Thread(target=self._run_loop, name="notification-dispatcher", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+    
+    def stop(self, timeout: float = 30.0):
+        """落库剩余缓冲，等待已认领的批次发送完毕后停止"""
+        self.flush()
+        if self._thread and self._loop:
+            self._loop.call_soon_threadsafe(self._stopping.set)
+            self._wake()
+            self._thread.join(timeout)
+        self._thread = None
+    
+    def _wake(self):
+        """从任意线程唤醒调度循环"""
+        loop = self._loop
+        if loop is not None and not loop.is_closed():
+            try:
+                loop.call_soon_threadsafe(self._wakeup.set)
+            except RuntimeError:
+                pass
+    
+    def _run_loop(self):
+        asyncio.run(self._main())
+    
+    async def _main(self):
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._stopping = asyncio.Event()
+        self._ready.set()
+        
+        # 已退出进程认领后未完成的通知重新进入待发送状态
+        try:
+            await asyncio.to_thread(self._release_stale_claims)
+        except Exception as e:
+            print(f"通知调度出错: {e}")
+        
+        queues = {name: asyncio.Queue(maxsize=self.max_pending_batches) for name in self.channels}
+        workers = [
+            asyncio.create_task(self._channel_worker(self.channels[name], queue))
+            for name, queue in queues.items()
+        ]
+        try:
+            while not self._stopping.is_set():
+                self._wakeup.clear()
+                # 数据库暂时不可用（如 SQLite 的 database is locked）时记录错误，稍后重试，调度循环不退出
+                try:
+                    if await self._fill_queues(queues):
+                        continue
+                    
+                    await asyncio.to_thread(self._release_stale_claims)
+                    # 所有渠道队列都满时，等渠道发送完一批后再被唤醒
+                    open_channels = [name for name, queue in queues.items() if not queue.full()]
+                    timeout = await asyncio.to_thread(self._seconds_until_next_due, open_channels)
+                except Exception as e:
+                    print(f"通知调度出错: {e}")
+                    timeout = self.poll_interval
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            for queue in queues.values():
+                await queue.join()
+            for worker in workers:
+                worker.cancel()
+            self._loop = None
+    
+    async def _fill_queues(self, queues: Dict[str, asyncio.Queue]) -> int:
+        """写缓冲落库，再为有空位的渠道认领到期通知放入队列，返回认领的条数"""
+        await asyncio.to_thread(self.flush)
+        claimed = 0
+        for name, queue in queues.items():
+            free_batches = queue.maxsize - queue.qsize()
+            if free_batches <= 0:
+                continue
+            channel = self.channels[name]
+            rows = await asyncio.to_thread(self._claim, name, free_batches * channel.batch_size)
+            claimed += len(rows)
+            for i in range(0, len(rows), channel.batch_size):
+                await queue.put(rows[i:i + channel.batch_size])
+        return claimed
+    
+    async def _channel_worker(self, channel: NotificationChannel, queue: asyncio.Queue):
+        """逐批发送某个渠道的通知
+        
+        发送结果写回发件箱失败时只记录错误，这批通知保持 sending 状态，认领超时后重新投递
+        """
+        while True:
+            batch = await queue.get()
+            try:
+                try:
+                    payloads = [json.loads(row.payload) for row in batch]
+                    await asyncio.wait_for(channel.send_batch(payloads), channel.timeout)
+                except Exception as e:
+                    await asyncio.to_thread(self._reschedule, batch, f"{type(e).__name__}: {e}")
+                else:
+                    await asyncio.to_thread(self._complete, batch)
+            except Exception as e:
+                print(f"通知发送结果写回失败（{channel.name}）: {e}")
+            finally:
+                queue.task_done()
+                self._wakeup.set()
+    
+    # ---------- 发件箱读写（在线程池中执行） ----------
+    
+    def _release_stale_claims(self):
+        """认领超时的通知重新进入待发送状态"""
+        cutoff = datetime.utcnow() - timedelta(seconds=self.claim_timeout)
+        db = self.session_factory()
+        try:
+            db.execute(
+                update(NotificationOutbox)
+                .where(
+                    NotificationOutbox.status == "sending",
+                    or_(NotificationOutbox.claimed_at.is_(None), NotificationOutbox.claimed_at < cutoff)
+                )
+                .values(status="pending", claim_token=None, claimed_at=None)
+            )
+            db.commit()
+        finally:
+            db.close()
+    
+    def _claim(self, channel: str, limit: int) -> List[Any]:
+        """认领到期的待发送通知，标记为 sending
+        
+        用一条带条件的 UPDATE 打上本次认领的标识，再按标识读回，
+        多个进程同时认领时每条通知只会落到其中一个进程
+        """
+        now = datetime.utcnow()
+        token = uuid.uuid4().hex
+        db = self.session_factory()
+        try:
+            due_ids = (
+                select(NotificationOutbox.id)
+                .where(
+                    NotificationOutbox.status == "pending",
+                    NotificationOutbox.next_attempt_at <= now,
+                    NotificationOutbox.channel == channel
+                )
+                .order_by(NotificationOutbox.next_attempt_at, NotificationOutbox.id)
+                .limit(limit)
+            )
+            result = db.execute(
+                update(NotificationOutbox)
+                .where(NotificationOutbox.id.in_(due_ids), NotificationOutbox.status == "pending")
+                .values(status="sending", claim_token=token, claimed_at=now)
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+            if not result.rowcount:
+                return []
+            return db.execute(
+                select(NotificationOutbox.id, NotificationOutbox.payload, NotificationOutbox.attempts)
+                .where(NotificationOutbox.claim_token == token)
+                .order_by(NotificationOutbox.next_attempt_at, NotificationOutbox.id)
+            ).all()
+        finally:
+            db.close()
+    
+    def _complete(self, batch: List[Any]):
+        """发送成功的通知从发件箱删除"""
+        db = self.session_factory()
+        try:
+            db.execute(delete(NotificationOutbox).where(NotificationOutbox.id.in_([row.id for row in batch])))
+            db.commit()
+        finally:
+            db.close()
+        self._add_stat("sent", len(batch))
+    
+    def _reschedule(self, batch: List[Any], error: str):
+        """发送失败：按指数退避安排重试，超过最大次数标记为 failed"""
+        now = datetime.utcnow()
+        rows = []
+        failed = 0
+        for row in batch:
+            attempts = row.attempts + 1
+            if attempts >= self.max_attempts:
+                failed += 1
+                rows.append({"id": row.id, "status": "failed", "attempts": attempts, "last_error": error,
+                             "claim_token": None})
+            else:
+                rows.append({
+                    "id": row.id,
+                    "status": "pending",
+                    "attempts": attempts,
+                    "last_error": error,
+                    "claim_token": None,
+                    "next_attempt_at": now + timedelta(seconds=self._backoff(attempts))
+                })
+        
+        db = self.session_factory()
+        try:
+            db.execute(update(NotificationOutbox), rows)
+            db.commit()
+        finally:
+            db.close()
+        self._add_stat("retried", len(batch) - failed)
+        self._add_stat("failed", failed)
+    
+    def _backoff(self, attempts: int) -> float:
+        """第 attempts 次失败后的等待时间，带随机抖动"""
+        delay = min(self.retry_max_seconds, self.retry_base_seconds * (2 ** (attempts - 1)))
+        return delay * random.uniform(0.5, 1.0)
+    
+    def _seconds_until_next_due(self, channels: List[str]) -> float:
+        """距离指定渠道下一条待发送通知到期的秒数，不超过 poll_interval"""
+        if not channels:
+            return self.poll_interval
+        db = self.session_factory()
+        try:
+            next_due = db.execute(
+                select(func.min(NotificationOutbox.next_attempt_at))
+                .where(
+                    NotificationOutbox.status == "pending",
+                    NotificationOutbox.channel.in_(channels)
+                )
+            ).scalar()
+        finally:
+            db.close()
+        if next_due is None:
+            return self.poll_interval
+        return min(self.poll_interval, max(0.0, (next_due - datetime.utcnow()).total_seconds()))
+    
+    def _add_stat(self, key: str, value: int):
+        with self._stats_lock:
+            self.stats[key] += value
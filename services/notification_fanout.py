@@ -0,0 +1,166 @@
+import os
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass, field, asdict
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from models.models import User, Goal, Task
+
+# 每页用户数，用于 keyset 分页
+NOTIFICATION_PAGE_SIZE = int(os.getenv("NOTIFICATION_PAGE_SIZE", "1000"))
+
+# 构建和发送通知的并发线程数
+NOTIFICATION_CONCURRENCY = int(os.getenv("NOTIFICATION_CONCURRENCY", "8"))
+
+@dataclass
+class FanoutMetrics:
+    """单次推送任务的吞吐量统计"""
+    job: str
+    started_at: datetime = field(default_factory=datetime.utcnow)
+    pages: int = 0
+    users: int = 0
+    notifications: int = 0
+    failures: int = 0
+    duration: float = 0.0
+    
+    @property
+    def users_per_second(self) -> float:
+        return self.users / self.duration if self.duration else 0.0
+    
+    @property
+    def notifications_per_second(self) -> float:
+        return self.notifications / self.duration if self.duration else 0.0
+    
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["started_at"] = self.started_at.isoformat()
+        data["users_per_second"] = round(self.users_per_second, 1)
+        data["notifications_per_second"] = round(self.notifications_per_second, 1)
+        return data
+
+class NotificationFanout:
+    """通知扇出引擎
+    
+    按用户ID做 keyset 分页，每页批量预取任务和目标，
+    再把通知的构建和发送交给有并发上限的线程池
+    """
+    
+    def __init__(self, send: Callable[[Dict[str, Any]], None], page_size: int = NOTIFICATION_PAGE_SIZE,
+                 concurrency: int = NOTIFICATION_CONCURRENCY):
+        self.send = send
+        self.page_size = page_size
+        self.concurrency = concurrency
+        self.last_metrics: Dict[str, FanoutMetrics] = {}
+    
+    def iter_user_pages(self, db: Session, criteria: Sequence[Any] = ()) -> Iterator[Sequence[Any]]:
+        """按 users.id 做 keyset 分页，每页只取通知和提醒调度需要的列，criteria 为额外的筛选条件"""
+        last_id = 0
+        while True:
+            page = db.execute(
+                select(
+                    User.id,
+                    User.username,
+                    User.timezone,
+                    User.daily_reminder_time,
+                    User.progress_reminder_time
+                )
+                .where(User.id > last_id, *criteria)
+                .order_by(User.id)
+                .limit(self.page_size)
+            ).all()
+            if not page:
+                return
+            yield page
+            last_id = page[-1].id
+    
+    def prefetch_daily_tasks(self, db: Session, user_ids: List[int],
+                             target_date: datetime) -> Dict[int, List[Any]]:
+        """一次查询取出整页用户在指定日期的任务，按用户分组"""
+        start_of_day = target_date.replace(hour=0, minute=0, second=0, microsecond=0)
+        end_of_day = start_of_day + timedelta(days=1)
+        
+        rows = db.execute(
+            select(
+                Goal.user_id,
+                Task.title,
+                Task.description,
+                Task.priority,
+                Task.estimated_duration
+            ).join(Goal, Task.goal_id == Goal.id).where(
+                Goal.user_id.in_(user_ids),
+                Task.due_date >= start_of_day,
+                Task.due_date < end_of_day
+            ).order_by(Task.id)
+        ).all()
+        
+        tasks_by_user = defaultdict(list)
+        for row in rows:
+            tasks_by_user[row.user_id].append(row)
+        return tasks_by_user
+    
+    def prefetch_active_goals(self, db: Session, user_ids: List[int]) -> Dict[int, List[Any]]:
+        """一次查询取出整页用户的活跃目标及其任务计数，按用户分组"""
+        rows = db.execute(
+            select(Goal.id, Goal.title, Goal.user_id, Goal.completed_count, Goal.total_count).where(
+                Goal.user_id.in_(user_ids),
+                Goal.status == "active"
+            ).order_by(Goal.id)
+        ).all()
+        
+        goals_by_user = defaultdict(list)
+        for row in rows:
+            goals_by_user[row.user_id].append(row)
+        return goals_by_user
+    
+    def run(self, job: str, db: Session,
+            prepare: Callable[[Session, Sequence[Any]], List[Tuple]],
+            build: Callable[..., Optional[Dict[str, Any]]],
+            criteria: Sequence[Any] = (),
+            finish_page: Optional[Callable[[Session, Sequence[Any]], None]] = None) -> FanoutMetrics:
+        """执行一次扇出
+        
+        prepare 在调度线程上执行，负责整页的数据库读取并返回待发送条目；
+        build 在线程池中执行，根据条目构建通知，返回 None 表示跳过；
+        criteria 限定参与本次扇出的用户；
+        finish_page 在一页的条目全部发送后于调度线程上执行，用于提交这一页的写入
+        """
+        metrics = FanoutMetrics(job=job)
+        lock = threading.Lock()
+        # 限制排队中的条目数，避免一次把整页甚至全部用户压进线程池
+        slots = threading.BoundedSemaphore(self.concurrency * 4)
+        
+        def deliver(item: Tuple):
+            try:
+                notification = build(*item)
+                if notification is not None:
+                    self.send(notification)
+                    with lock:
+                        metrics.notifications += 1
+            except Exception as e:
+                with lock:
+                    metrics.failures += 1
+                print(f"通知发送失败({job}): {e}")
+            finally:
+                slots.release()
+        
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix=f"fanout-{job}") as pool:
+            for page in self.iter_user_pages(db, criteria):
+                metrics.pages += 1
+                metrics.users += len(page)
+                futures = []
+                for item in prepare(db, page):
+                    slots.acquire()
+                    futures.append(pool.submit(deliver, item))
+                if finish_page is not None:
+                    wait(futures)
+                    finish_page(db, page)
+        metrics.duration = time.perf_counter() - t0
+        
+        self.last_metrics[job] = metrics
+        print(f"推送任务 {job} 完成: {metrics.to_dict()}")
+        return metrics
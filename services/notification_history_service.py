@@ -0,0 +1,93 @@
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+from sqlalchemy import select, update, delete, and_, or_
+from sqlalchemy.orm import Session
+from models.models import Notification
+
+# 通知历史保留天数
+NOTIFICATION_RETENTION_DAYS = int(os.getenv("NOTIFICATION_RETENTION_DAYS", "90"))
+
+# 清理任务每批删除的行数，分批提交避免长时间持有写锁
+NOTIFICATION_PRUNE_CHUNK_SIZE = int(os.getenv("NOTIFICATION_PRUNE_CHUNK_SIZE", "1000"))
+
+class NotificationHistoryService:
+    """通知历史：批量追加写入、按 (user_id, created_at) 索引做 keyset 分页读取、分批清理"""
+    
+    def build_row(self, notification: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """将通知转换为可批量插入的历史记录，没有用户的通知不记录"""
+        user_id = notification.get("user_id")
+        if user_id is None:
+            return None
+        return {
+            "user_id": user_id,
+            "type": notification.get("type", "info"),
+            "message": notification.get("message"),
+            "payload": notification,
+            "created_at": datetime.utcnow()
+        }
+    
+    def list_notifications(self, db: Session, user_id: int, before: Optional[int] = None,
+                           limit: int = 20, unread_only: bool = False, days: Optional[int] = None) -> Dict[str, Any]:
+        """按时间倒序分页获取通知，before 为上一页最后一条通知的ID"""
+        query = db.query(Notification).filter(Notification.user_id == user_id)
+        
+        if before is not None:
+            cursor = db.query(Notification.created_at, Notification.id).filter(
+                Notification.id == before,
+                Notification.user_id == user_id
+            ).first()
+            if cursor is None:
+                return {"items": [], "next_cursor": None}
+            query = query.filter(or_(
+                Notification.created_at < cursor.created_at,
+                and_(Notification.created_at == cursor.created_at, Notification.id < cursor.id)
+            ))
+        
+        if days is not None:
+            query = query.filter(Notification.created_at >= datetime.utcnow() - timedelta(days=days))
+        if unread_only:
+            query = query.filter(Notification.is_read.is_(False))
+        
+        items = query.order_by(Notification.created_at.desc(), Notification.id.desc()).limit(limit + 1).all()
+        next_cursor = items[limit - 1].id if len(items) > limit else None
+        return {"items": items[:limit], "next_cursor": next_cursor}
+    
+    def mark_read(self, db: Session, notification_id: int, user_id: int) -> bool:
+        """标记单条通知为已读"""
+        result = db.execute(
+            update(Notification)
+            .where(Notification.id == notification_id, Notification.user_id == user_id)
+            .values(is_read=True, read_at=datetime.utcnow())
+        )
+        db.commit()
+        return result.rowcount > 0
+    
+    def mark_all_read(self, db: Session, user_id: int) -> int:
+        """标记用户全部未读通知为已读"""
+        result = db.execute(
+            update(Notification)
+            .where(Notification.user_id == user_id, Notification.is_read.is_(False))
+            .values(is_read=True, read_at=datetime.utcnow())
+        )
+        db.commit()
+        return result.rowcount
+    
+    def prune(self, session_factory, retention_days: int = NOTIFICATION_RETENTION_DAYS,
+              chunk_size: int = NOTIFICATION_PRUNE_CHUNK_SIZE, pause: float = 0.05) -> int:
+        """删除超过保留期的通知，每批单独提交并短暂让出写锁"""
+        cutoff = datetime.utcnow() - timedelta(days=retention_days)
+        total = 0
+        while True:
+            db = session_factory()
+            try:
+                ids = select(Notification.id).where(Notification.created_at < cutoff).limit(chunk_size)
+                deleted = db.execute(delete(Notification).where(Notification.id.in_(ids))).rowcount
+                db.commit()
+            finally:
+                db.close()
+            total += deleted
+            if deleted < chunk_size:
+                return total
+            time.sleep(pause)
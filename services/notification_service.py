@@ -1,21 +1,28 @@
 from datetime import datetime, timedelta
-from typing import List, Dict, Any
-import schedule
-import time
-import threading
+from collections import defaultdict
+from typing import List, Dict, Any, Optional
 from sqlalchemy.orm import Session
 from models.database import SessionLocal
 from .task_service import TaskService
-from .goal_service import GoalService
+from .goal_service import GoalService, progress_from_counts
 from .ai_planner import AIPlanner
+from .notification_fanout import NotificationFanout
+from .notification_dispatcher import NotificationDispatcher
+from .notification_history_service import NotificationHistoryService
+from .job_scheduler import JobScheduler
+from .reminder_service import ReminderService, REMINDER_SLOT_SECONDS
 
 class NotificationService:
     def __init__(self):
         self.task_service = TaskService()
         self.goal_service = GoalService()
         self.ai_planner = AIPlanner()
+        self.fanout = NotificationFanout(send=self._send_notification)
+        self.history_service = NotificationHistoryService()
+        self.reminder_service = ReminderService()
+        self.dispatcher = NotificationDispatcher(history_service=self.history_service)
+        self.scheduler = JobScheduler()
         self.is_running = False
-        self.scheduler_thread = None
     
     def start_scheduler(self):
         """启动定时任务调度器"""
@@ -24,75 +31,109 @@ class NotificationService:
         
         self.is_running = True
         
-        # 设置每天上午9点推送任务提醒
-        schedule.every().day.at("09:00").do(self.send_daily_notifications)
+        # 启动通知投递调度器
+        self.dispatcher.start()
         
-        # 设置每天下午6点推送进度更新
-        schedule.every().day.at("18:00").do(self.send_progress_updates)
+        # 每个时间片推送本地提醒时间已到的用户的任务提醒和进度更新（默认 09:00 / 18:00，按用户时区）
+        self.scheduler.register("daily_notifications", self.send_daily_notifications, f"every {REMINDER_SLOT_SECONDS}")
+        self.scheduler.register("progress_updates", self.send_progress_updates, f"every {REMINDER_SLOT_SECONDS}")
         
-        # 启动调度器线程
-        self.scheduler_thread = threading.Thread(target=self._run_scheduler)
-        self.scheduler_thread.daemon = True
-        self.scheduler_thread.start()
+        # 设置每天凌晨3点清理过期通知历史
+        self.scheduler.register("prune_notification_history", self.prune_notification_history, "daily 03:00")
+        
+        # 设置每天凌晨3点半核对目标的任务计数
+        self.scheduler.register("reconcile_goal_counts", self.reconcile_goal_counts, "daily 03:30")
+        
+        # 多个进程同时启动时，每个任务只会在持有租约的进程中执行
+        self.scheduler.start()
     
     def stop_scheduler(self):
         """停止定时任务调度器"""
         self.is_running = False
-        if self.scheduler_thread:
-            self.scheduler_thread.join()
-    
-    def _run_scheduler(self):
-        """运行调度器"""
-        while self.is_running:
-            schedule.run_pending()
-            time.sleep(60)  # 每分钟检查一次
+        self.scheduler.stop()
+        self.dispatcher.stop()
     
-    def send_daily_notifications(self):
-        """发送每日任务提醒"""
+    def send_daily_notifications(self, now: Optional[datetime] = None):
+        """向本地提醒时间已到的用户发送当天（用户本地日期）的任务提醒"""
+        now = now or datetime.utcnow()
+        
+        def prepare(db: Session, users) -> List:
+            # 同一页用户可能处于不同时区，按本地日期分组预取任务
+            users_by_date = defaultdict(list)
+            for user in users:
+                local_date = self.reminder_service.local_now(user.timezone, now).date()
+                users_by_date[local_date].append(user)
+            
+            items = []
+            for local_date, date_users in users_by_date.items():
+                tasks_by_user = self.fanout.prefetch_daily_tasks(
+                    db, [user.id for user in date_users], datetime.combine(local_date, datetime.min.time())
+                )
+                items.extend(
+                    (user, tasks_by_user[user.id], local_date.strftime("%Y-%m-%d"))
+                    for user in date_users if tasks_by_user.get(user.id)
+                )
+            return items
+        
         db = SessionLocal()
         try:
-            # 获取所有用户（这里简化处理，实际应该有用户管理）
-            from models.models import User
-            users = db.query(User).all()
-            
-            for user in users:
-                today = datetime.utcnow()
-                daily_tasks = self.task_service.get_daily_tasks(db, user.id, today)
-                
-                if daily_tasks:
-                    notification = self._create_daily_notification(user, daily_tasks)
-                    self._send_notification(notification)
-                    
+            self.reminder_service.backfill(db, now)
+            return self.fanout.run(
+                "daily_tasks", db, prepare, self._create_daily_notification,
+                criteria=self.reminder_service.due_criteria("daily", now),
+                finish_page=lambda db, users: self._commit_page(db, users, "daily", now)
+            )
         finally:
             db.close()
+            self.dispatcher.flush()
     
-    def send_progress_updates(self):
-        """发送进度更新通知"""
-        db = SessionLocal()
-        try:
-            from models.models import User
-            users = db.query(User).all()
+    def send_progress_updates(self, now: Optional[datetime] = None):
+        """向本地提醒时间已到的用户发送进度更新通知"""
+        now = now or datetime.utcnow()
+        
+        def prepare(db: Session, users) -> List:
+            # 进度随任务增删和状态变更增量维护，这里直接读取目标上的任务计数
+            goals_by_user = self.fanout.prefetch_active_goals(db, [user.id for user in users])
             
+            items = []
             for user in users:
-                active_goals = self.goal_service.get_active_goals(db, user.id)
-                
-                for goal in active_goals:
-                    # 计算进度
-                    progress = self.goal_service.calculate_goal_progress(db, goal.id)
-                    
-                    # 更新目标进度
-                    self.goal_service.update_goal_progress(db, goal.id, progress)
-                    
-                    # 生成激励消息
-                    motivation = self.ai_planner.generate_motivation_message(goal.title, progress)
-                    
-                    notification = self._create_progress_notification(user, goal, progress, motivation)
-                    self._send_notification(notification)
-                    
+                local_date = self.reminder_service.local_now(user.timezone, now).strftime("%Y-%m-%d")
+                items.extend(
+                    (user, goal, progress_from_counts(goal.completed_count, goal.total_count), local_date)
+                    for goal in goals_by_user.get(user.id, [])
+                )
+            return items
+        
+        db = SessionLocal()
+        try:
+            self.reminder_service.backfill(db, now)
+            return self.fanout.run(
+                "progress_update", db, prepare, self._build_progress_notification,
+                criteria=self.reminder_service.due_criteria("progress", now),
+                finish_page=lambda db, users: self._commit_page(db, users, "progress", now)
+            )
         finally:
             db.close()
+            self.dispatcher.flush()
+    
+    def _commit_page(self, db: Session, users, kind: str, now: datetime):
+        """一页通知全部进入写缓冲后，把发件箱写入和提醒时间的推进放在同一事务中提交
+        
+        进程在提交前退出时，这一页用户的提醒时间保持不变，下一个时间片会重新推送
+        """
+        self.dispatcher.flush(db)
+        self.reminder_service.advance(db, users, kind, now)
+    
+    def get_fanout_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """获取各推送任务最近一次运行的吞吐量统计"""
+        return {job: metrics.to_dict() for job, metrics in self.fanout.last_metrics.items()}
+    
+    def _build_progress_notification(self, user, goal, progress: float, date: str) -> Dict[str, Any]:
+        """生成激励消息并创建进度通知"""
+        motivation = self.ai_planner.generate_motivation_message(goal.title, progress)
+        return self._create_progress_notification(user, goal, progress, motivation, date)
     
-    def _create_daily_notification(self, user, daily_tasks: List) -> Dict[str, Any]:
+    def _create_daily_notification(self, user, daily_tasks: List, date: str) -> Dict[str, Any]:
         """创建每日通知内容"""
         task_list = []
         for task in daily_tasks:
@@ -107,12 +148,13 @@ class NotificationService:
             "type": "daily_tasks",
             "user_id": user.id,
             "username": user.username,
-            "date": datetime.utcnow().strftime("%Y-%m-%d"),
+            "date": date,
             "tasks": task_list,
             "message": f"早上好，{user.username}！今天你有 {len(daily_tasks)} 个任务需要完成。"
         }
     
-    def _create_progress_notification(self, user, goal, progress: float, motivation: str) -> Dict[str, Any]:
+    def _create_progress_notification(self, user, goal, progress: float, motivation: str,
+                                      date: str) -> Dict[str, Any]:
         """创建进度更新通知内容"""
         return {
             "type": "progress_update",
@@ -121,25 +163,16 @@ class NotificationService:
             "goal_title": goal.title,
             "progress": progress,
             "message": motivation,
-            "date": datetime.utcnow().strftime("%Y-%m-%d")
+            "date": date
         }
     
     def _send_notification(self, notification: Dict[str, Any]):
-        """发送通知（这里可以集成邮件、短信、推送等）"""
-        # 这里简化处理，实际应该集成具体的通知渠道
-        print(f"发送通知: {notification}")
-        
-        # 示例：可以集成邮件服务
-        # self._send_email_notification(notification)
-        
-        # 示例：可以集成短信服务
-        # self._send_sms_notification(notification)
-        
-        # 示例：可以集成推送服务
-        # self._send_push_notification(notification)
+        """发送通知：写入发件箱，由投递调度器按渠道分批发送"""
+        self.dispatcher.enqueue(notification)
     
     def send_immediate_notification(self, user_id: int, message: str, notification_type: str = "info"):
         """发送即时通知"""
+        from models.models import User
         db = SessionLocal()
         try:
             user = db.query(User).filter(User.id == user_id).first()
@@ -152,15 +185,48 @@ class NotificationService:
                     "date": datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
                 }
                 self._send_notification(notification)
+                self.dispatcher.flush()
         finally:
             db.close()
     
     def get_user_notifications(self, user_id: int, days: int = 7) -> List[Dict[str, Any]]:
         """获取用户的通知历史"""
-        # 这里简化处理，实际应该从数据库获取通知历史
-        return []
+        db = SessionLocal()
+        try:
+            page = self.history_service.list_notifications(db, user_id, limit=100, days=days)
+            return [
+                {
+                    "id": notification.id,
+                    "type": notification.type,
+                    "message": notification.message,
+                    "is_read": notification.is_read,
+                    "created_at": notification.created_at
+                }
+                for notification in page["items"]
+            ]
+        finally:
+            db.close()
     
-    def mark_notification_read(self, notification_id: int, user_id: int):
+    def mark_notification_read(self, notification_id: int, user_id: int) -> bool:
         """标记通知为已读"""
-        # 这里简化处理，实际应该更新数据库中的通知状态
-        pass 
\ No newline at end of file
+        db = SessionLocal()
+        try:
+            return self.history_service.mark_read(db, notification_id, user_id)
+        finally:
+            db.close()
+    
+    def prune_notification_history(self) -> int:
+        """清理过期的通知历史"""
+        deleted = self.history_service.prune(SessionLocal)
+        print(f"已清理 {deleted} 条过期通知")
+        return deleted
+    
+    def reconcile_goal_counts(self) -> int:
+        """核对目标的任务计数与任务表是否一致，修正偏差"""
+        db = SessionLocal()
+        try:
+            fixed = self.goal_service.reconcile_goal_counts(db)
+        finally:
+            db.close()
+        print(f"目标计数核对完成，修正 {fixed} 个目标")
+        return fixed
\ No newline at end of file
@@ -0,0 +1,83 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Optional
+from passlib.context import CryptContext
+
+# bcrypt 成本因子，可通过环境变量 BCRYPT_ROUNDS 调整
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
+# 哈希进程池大小，默认与CPU核数相同；为 0 时不使用进程池，在事件循环的默认线程池中哈希。
+# bcrypt 扩展计算时释放 GIL，单核机器上进程池只增加进程间传输（bench_signup 中两者均约 11 次/秒），
+# 因此只有一个核时默认为 0；多核时进程池把哈希与共享线程池隔开，并用 queue_size 限制排队数量
+PASSWORD_HASH_WORKERS = int(os.getenv(
+    "PASSWORD_HASH_WORKERS", str(os.cpu_count() if (os.cpu_count() or 1) > 1 else 0)
+))
+
+# 同时排队的哈希请求上限，超出后调用方在事件循环上等待，而不是无限堆积到进程池
+PASSWORD_HASH_QUEUE_SIZE = int(os.getenv("PASSWORD_HASH_QUEUE_SIZE", str(max(PASSWORD_HASH_WORKERS, 1) * 4)))
+
+@lru_cache(maxsize=None)
+def get_crypt_context(rounds: int = BCRYPT_ROUNDS) -> CryptContext:
+    """获取缓存的 CryptContext，每个进程每种成本因子只构造一次"""
+    return CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=rounds)
+
+def _hash_password(password: str, rounds: int) -> str:
+    """在进程池中执行的哈希函数"""
+    return get_crypt_context(rounds).hash(password)
+
+def _verify_password(password: str, hashed_password: str) -> bool:
+    """在进程池中执行的校验函数"""
+    return get_crypt_context().verify(password, hashed_password)
+
+class PasswordHasher:
+    """密码哈希服务：bcrypt 计算放在独立的有界进程池中，不占用事件循环和GIL"""
+    
+    def __init__(self, rounds: int = BCRYPT_ROUNDS, max_workers: int = PASSWORD_HASH_WORKERS,
+                 queue_size: int = PASSWORD_HASH_QUEUE_SIZE):
+        self.rounds = rounds
+        self.max_workers = max_workers
+        self.queue_size = queue_size
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+    
+    def _get_executor(self) -> Optional[ProcessPoolExecutor]:
+        """首次使用时再创建进程池，避免导入模块时就启动子进程；max_workers 为 0 时返回 None（默认线程池）
+        
+        应用进程中已有事件循环、调度器和线程池中的线程，fork 出的子进程可能继承被其它线程持有的锁而卡死，
+        因此通过 forkserver（不支持时用 spawn）启动子进程
+        """
+        if self._executor is None and self.max_workers > 0:
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers, mp_context=multiprocessing.get_context(method)
+            )
+        return self._executor
+    
+    async def _run(self, fn, *args):
+        """在进程池（或默认线程池）中执行，排队数量受 queue_size 限制"""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.queue_size)
+        async with self._slots:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+    
+    async def hash(self, password: str) -> str:
+        """异步计算密码哈希"""
+        return await self._run(_hash_password, password, self.rounds)
+    
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        """异步校验密码"""
+        return await self._run(_verify_password, password, hashed_password)
+    
+    def shutdown(self):
+        """关闭进程池"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+        self._slots = None
+
+# 模块级单例，应用内共享同一个进程池
+password_hasher = PasswordHasher()
@@ -0,0 +1,50 @@
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime
+from typing import Any, Dict, Iterator, List, Sequence, Tuple, Union
+
+class PlanIndex:
+    """按截止日期排序的计划索引
+    
+    构建时按日期排序一次，同一天内保持原计划顺序（与 get_daily_tasks 的结果一致），
+    之后按天或按区间查询都只需两次二分查找，耗时 O(log n + k)
+    """
+    
+    def __init__(self, tasks: Sequence[Dict[str, Any]]):
+        self._tasks: List[Dict[str, Any]] = sorted(tasks, key=lambda task: task["due_date"].toordinal())
+        self._days: List[int] = [task["due_date"].toordinal() for task in self._tasks]
+    
+    def __len__(self) -> int:
+        return len(self._tasks)
+    
+    def tasks_on(self, day: Union[date, datetime]) -> List[Dict[str, Any]]:
+        """某一天的任务"""
+        ordinal = day.toordinal()
+        return self._tasks[bisect_left(self._days, ordinal):bisect_right(self._days, ordinal)]
+    
+    def tasks_between(self, start: datetime, end: datetime) -> List[Dict[str, Any]]:
+        """截止时间落在 [start, end) 内的任务，按日期排列
+        
+        先按日期二分定位，只有首尾两天需要再比较具体时间
+        """
+        first_day, last_day = start.toordinal(), end.toordinal()
+        lo = bisect_left(self._days, first_day)
+        hi = bisect_right(self._days, last_day)
+        first_end = bisect_right(self._days, first_day, lo, hi)
+        last_begin = bisect_left(self._days, last_day, first_end, hi)
+        
+        def within(tasks):
+            return [task for task in tasks if start <= task["due_date"] < end]
+        
+        return (
+            within(self._tasks[lo:first_end])
+            + self._tasks[first_end:last_begin]
+            + within(self._tasks[last_begin:hi])
+        )
+    
+    def days(self) -> Iterator[Tuple[date, List[Dict[str, Any]]]]:
+        """按日期顺序逐日产出 (日期, 任务列表)，只包含有任务的日期"""
+        i = 0
+        while i < len(self._days):
+            j = bisect_right(self._days, self._days[i], i)
+            yield date.fromordinal(self._days[i]), self._tasks[i:j]
+            i = j
@@ -0,0 +1,96 @@
+import os
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from .ai_planner import AIPlanner
+
+# 模型服务地址，接口约定见 HTTPModelBackend
+PLANNER_MODEL_URL = os.getenv("PLANNER_MODEL_URL", "http://127.0.0.1:8001/plan")
+
+# 调用模型服务时附带的 API Key（Authorization: Bearer ...），为空时不发送
+PLANNER_MODEL_API_KEY = os.getenv("PLANNER_MODEL_API_KEY", "")
+
+class PlannerBackend(ABC):
+    """任务规划后端接口，输入目标信息，输出与 AIPlanner.plan_goal 格式相同的任务列表"""
+    
+    name: str = ""
+    
+    @abstractmethod
+    async def plan(self, title: str, description: str, category: str,
+                   start_date: datetime, end_date: datetime) -> List[Dict[str, Any]]:
+        """为目标生成任务，失败时抛出异常，由调用方回退到模板规划"""
+    
+    async def close(self) -> None:
+        """释放连接等资源"""
+
+class TemplateBackend(PlannerBackend):
+    """模板后端，直接使用内置模板规划"""
+    
+    name = "template"
+    
+    def __init__(self, planner: Optional[AIPlanner] = None):
+        self.planner = planner or AIPlanner()
+    
+    async def plan(self, title: str, description: str, category: str,
+                   start_date: datetime, end_date: datetime) -> List[Dict[str, Any]]:
+        return self.planner.plan_goal(title, description, category, start_date, end_date)
+
+class HTTPModelBackend(PlannerBackend):
+    """通过 HTTP 调用模型服务的后端
+    
+    请求: POST {title, description, category, start_date, end_date}（时间为 ISO 格式）
+    响应: {"tasks": [{"title", "description", "due_date", "priority", "estimated_duration"}]}
+    """
+    
+    name = "http"
+    
+    PRIORITIES = ("low", "medium", "high")
+    
+    def __init__(self, url: str = PLANNER_MODEL_URL, api_key: str = PLANNER_MODEL_API_KEY):
+        self.url = url
+        self.api_key = api_key
+        self._client = None
+    
+    def _get_client(self):
+        """首次调用时创建异步客户端，复用连接池"""
+        if self._client is None:
+            import httpx
+            headers = {"Authorization": f"Bearer {self.api_key}"} if self.api_key else {}
+            # 超时由 ModelPlanner 统一控制，这里不再单独设置
+            self._client = httpx.AsyncClient(headers=headers, timeout=None)
+        return self._client
+    
+    async def plan(self, title: str, description: str, category: str,
+                   start_date: datetime, end_date: datetime) -> List[Dict[str, Any]]:
+        response = await self._get_client().post(self.url, json={
+            "title": title,
+            "description": description,
+            "category": category,
+            "start_date": start_date.isoformat(),
+            "end_date": end_date.isoformat()
+        })
+        response.raise_for_status()
+        return [self._parse_task(task, end_date) for task in response.json()["tasks"]]
+    
+    def _parse_task(self, task: Dict[str, Any], end_date: datetime) -> Dict[str, Any]:
+        """校验模型返回的任务，截止时间不晚于目标结束时间"""
+        due_date = datetime.fromisoformat(task["due_date"])
+        priority = task.get("priority", "medium")
+        return {
+            "title": str(task["title"]),
+            "description": str(task.get("description") or ""),
+            "due_date": min(due_date, end_date),
+            "priority": priority if priority in self.PRIORITIES else "medium",
+            "estimated_duration": int(task.get("estimated_duration") or 0)
+        }
+    
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+# 内置后端，PLANNER_BACKEND 环境变量按名称选择
+BACKEND_TYPES = {
+    TemplateBackend.name: TemplateBackend,
+    HTTPModelBackend.name: HTTPModelBackend,
+}
@@ -0,0 +1,208 @@
+import json
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import date, datetime
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+# 是否启用读缓存
+READ_CACHE_ENABLED = os.getenv("READ_CACHE_ENABLED", "true").lower() == "true"
+
+# 进程内缓存的条目数上限
+READ_CACHE_SIZE = int(os.getenv("READ_CACHE_SIZE", "4096"))
+
+# 缓存有效期（秒）；写入会立即让该用户的缓存失效，有效期只约束随当前时间变化的查询（逾期、即将到来等）
+READ_CACHE_TTL_SECONDS = float(os.getenv("READ_CACHE_TTL_SECONDS", "60"))
+
+# 共享缓存地址（Redis），多进程部署时各进程共用缓存和失效版本；为空时只使用进程内缓存
+READ_CACHE_REDIS_URL = os.getenv("READ_CACHE_REDIS_URL", "")
+
+# 应用的 worker 进程数（gunicorn 和 uvicorn 都以该变量作为默认进程数）。
+# 多于一个进程时各进程的版本互不可见，没有共享缓存地址就关闭读缓存和 ETag
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"无法序列化 {type(value).__name__}")
+
+class SharedCacheBackend(ABC):
+    """多进程共享的缓存后端，保存缓存值和各用户的数据版本"""
+    
+    @abstractmethod
+    def get(self, key: str) -> Optional[str]:
+        """读取缓存值，不存在时返回 None"""
+    
+    @abstractmethod
+    def set(self, key: str, value: str, ttl: float) -> None:
+        """写入缓存值"""
+    
+    @abstractmethod
+    def get_counter(self, key: str) -> int:
+        """读取计数器，不存在时为 0"""
+    
+    @abstractmethod
+    def incr(self, key: str) -> int:
+        """计数器加一并返回新值"""
+
+class RedisCacheBackend(SharedCacheBackend):
+    """Redis 共享缓存（需要安装 redis）"""
+    
+    def __init__(self, url: str = READ_CACHE_REDIS_URL, prefix: str = "life_agent:cache:"):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("使用共享读缓存需要安装 redis")
+        self.client = redis.Redis.from_url(url, decode_responses=True)
+        self.prefix = prefix
+    
+    def get(self, key: str) -> Optional[str]:
+        return self.client.get(self.prefix + key)
+    
+    def set(self, key: str, value: str, ttl: float) -> None:
+        self.client.set(self.prefix + key, value, px=int(ttl * 1000))
+    
+    def get_counter(self, key: str) -> int:
+        return int(self.client.get(self.prefix + key) or 0)
+    
+    def incr(self, key: str) -> int:
+        return self.client.incr(self.prefix + key)
+
+class ReadCache:
+    """按用户和查询缓存读结果的读穿透缓存
+    
+    缓存键包含用户的数据版本，写路径提交后递增版本即可让该用户的全部缓存失效；
+    提交前开始的读取只会写入旧版本的键，不会在失效后被读到。
+    配置了共享后端时，版本和缓存值都存放在共享后端，进程内缓存作为一级缓存。
+    etags 表示版本能否用作 ETag：版本只在本进程内递增且有多个进程时，其它进程的写入不会改变它
+    """
+    
+    def __init__(self, maxsize: int = READ_CACHE_SIZE, ttl: float = READ_CACHE_TTL_SECONDS,
+                 shared: Optional[SharedCacheBackend] = None, enabled: bool = READ_CACHE_ENABLED,
+                 etags: bool = True):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.shared = shared
+        self.enabled = enabled
+        self.etags = etags
+        self.stats = {"hits": 0, "misses": 0, "invalidations": 0}
+        
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._versions: Dict[int, int] = {}
+        # 进程启动时的纪元，避免重启后版本从 0 重新计数时与旧的版本号重复
+        self._epoch = time.time_ns() // 1000
+        self._lock = threading.Lock()
+    
+    def version(self, user_id: int) -> str:
+        """用户当前的数据版本"""
+        if self.shared is not None:
+            return f"{self.shared.get_counter('epoch')}.{self.shared.get_counter(f'version:{user_id}')}"
+        with self._lock:
+            return f"{self._epoch:x}.{self._versions.get(user_id, 0)}"
+    
+    def invalidate_user(self, user_id: Optional[int]):
+        """用户的数据发生变化，之后的读取不再命中旧缓存"""
+        if user_id is None:
+            return
+        if self.shared is not None:
+            self.shared.incr(f"version:{user_id}")
+        with self._lock:
+            self._versions[user_id] = self._versions.get(user_id, 0) + 1
+            self.stats["invalidations"] += 1
+    
+    def invalidate_all(self):
+        """批量维护（如计数校正）影响多个用户时，让全部缓存失效"""
+        if self.shared is not None:
+            self.shared.incr("epoch")
+        with self._lock:
+            self._epoch += 1
+            self._entries.clear()
+            self.stats["invalidations"] += 1
+    
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats, size=len(self._entries))
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+        return stats
+    
+    def _lookup(self, key: str) -> Tuple[bool, Any]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self.stats["hits"] += 1
+                    return True, entry[1]
+                del self._entries[key]
+        
+        if self.shared is not None:
+            raw = self.shared.get(key)
+            if raw is not None:
+                value = json.loads(raw)
+                self._store(key, value, shared=False)
+                with self._lock:
+                    self.stats["hits"] += 1
+                return True, value
+        
+        with self._lock:
+            self.stats["misses"] += 1
+        return False, None
+    
+    def _store(self, key: str, value: Any, shared: bool = True):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        if shared and self.shared is not None:
+            self.shared.set(key, json.dumps(value, ensure_ascii=False, default=_json_default), self.ttl)
+    
+    def _dump(self, value: Any, schema) -> Any:
+        """ORM 对象按响应模型转换为普通数据再缓存，缓存中不保留与会话绑定的对象"""
+        if schema is None or value is None:
+            return value
+        if isinstance(value, list):
+            return [schema.model_validate(item).model_dump() for item in value]
+        return schema.model_validate(value).model_dump()
+    
+    async def get_or_load(self, user_id: int, query: str, loader: Callable[[], Awaitable[Any]],
+                          schema=None) -> Any:
+        """命中时直接返回缓存，否则执行 loader 并写入缓存；schema 为 ORM 结果对应的响应模型"""
+        if not self.enabled:
+            return await loader()
+        key = f"{user_id}:{self.version(user_id)}:{query}"
+        found, value = self._lookup(key)
+        if found:
+            return value
+        value = self._dump(await loader(), schema)
+        self._store(key, value)
+        return value
+    
+    def get_or_load_sync(self, user_id: int, query: str, loader: Callable[[], Any], schema=None) -> Any:
+        """get_or_load 的同步版本"""
+        if not self.enabled:
+            return loader()
+        key = f"{user_id}:{self.version(user_id)}:{query}"
+        found, value = self._lookup(key)
+        if found:
+            return value
+        value = self._dump(loader(), schema)
+        self._store(key, value)
+        return value
+
+def build_read_cache() -> ReadCache:
+    """按部署方式创建读缓存：有共享后端时跨进程失效，单进程时使用进程内缓存，多进程且无共享后端时关闭"""
+    if READ_CACHE_REDIS_URL:
+        return ReadCache(shared=RedisCacheBackend())
+    if WEB_CONCURRENCY > 1:
+        print(f"WEB_CONCURRENCY={WEB_CONCURRENCY} 但未配置 READ_CACHE_REDIS_URL，"
+              f"各进程无法互相失效缓存，读缓存和 ETag 已关闭")
+        return ReadCache(enabled=False, etags=False)
+    return ReadCache()
+
+# 模块级单例，读路由和写路径共用
+read_cache = build_read_cache()
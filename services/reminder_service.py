@@ -0,0 +1,132 @@
+import os
+import re
+from datetime import datetime, timedelta, timezone, time as dt_time
+from typing import Any, Optional, Sequence
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from sqlalchemy import select, update, or_
+from sqlalchemy.orm import Session
+from models.models import User
+from models.schemas import UserPreferences
+
+# 未设置时区的用户使用的默认时区
+DEFAULT_TIMEZONE = os.getenv("DEFAULT_TIMEZONE", "Asia/Shanghai")
+
+# 提醒调度的时间片长度（秒），每个时间片只处理本地提醒时间落在其中的用户
+REMINDER_SLOT_SECONDS = int(os.getenv("REMINDER_SLOT_SECONDS", "300"))
+
+# 提醒类型 -> (用户的提醒时间列, 下一次提醒时间列)
+REMINDER_KINDS = {
+    "daily": (User.daily_reminder_time, User.next_daily_reminder_at),
+    "progress": (User.progress_reminder_time, User.next_progress_reminder_at),
+}
+
+_TIME_PATTERN = re.compile(r"^([01]\d|2[0-3]):([0-5]\d)$")
+
+class ReminderService:
+    """按用户时区和提醒时间安排提醒
+    
+    每个用户的下一次提醒时间（UTC）存放在 users 表的索引列上，
+    调度器每个时间片只取出已到期的用户，负载随各用户的本地提醒时间分散到全天
+    """
+    
+    def validate_timezone(self, name: str) -> str:
+        """校验 IANA 时区名称，如 Asia/Shanghai"""
+        try:
+            ZoneInfo(name)
+        except (ZoneInfoNotFoundError, ValueError):
+            raise ValueError(f"无效的时区: {name}")
+        return name
+    
+    def validate_time(self, value: str) -> str:
+        """校验 HH:MM 格式的提醒时间"""
+        if not _TIME_PATTERN.match(value or ""):
+            raise ValueError(f"无效的提醒时间: {value}，应为 HH:MM 格式")
+        return value
+    
+    def local_now(self, tz_name: Optional[str], now: Optional[datetime] = None) -> datetime:
+        """用户本地的当前时间（不带时区信息，与任务截止日期的存储方式一致）"""
+        now = now or datetime.utcnow()
+        tz = ZoneInfo(tz_name or DEFAULT_TIMEZONE)
+        return now.replace(tzinfo=timezone.utc).astimezone(tz).replace(tzinfo=None)
+    
+    def next_fire_at(self, tz_name: Optional[str], local_time: str, after: datetime) -> datetime:
+        """after（UTC）之后用户本地 local_time 的下一次出现时间，返回 UTC
+        
+        按本地日期逐日构造，夏令时切换日也落在正确的本地时间
+        """
+        tz = ZoneInfo(tz_name or DEFAULT_TIMEZONE)
+        hour, minute = (int(part) for part in local_time.split(":"))
+        after_utc = after.replace(tzinfo=timezone.utc)
+        local_date = after_utc.astimezone(tz).date()
+        while True:
+            candidate = datetime.combine(local_date, dt_time(hour, minute), tzinfo=tz).astimezone(timezone.utc)
+            if candidate > after_utc:
+                return candidate.replace(tzinfo=None)
+            local_date += timedelta(days=1)
+    
+    def schedule_user(self, user: User, now: Optional[datetime] = None):
+        """根据用户当前的时区和提醒时间重新计算下一次提醒时间"""
+        now = now or datetime.utcnow()
+        for time_column, next_column in REMINDER_KINDS.values():
+            local_time = getattr(user, time_column.key) or time_column.default.arg
+            setattr(user, time_column.key, local_time)
+            setattr(user, next_column.key, self.next_fire_at(user.timezone, local_time, now))
+    
+    def update_preferences(self, db: Session, user: User, preferences: UserPreferences) -> User:
+        """更新用户的时区和提醒时间，未提供的字段保持不变"""
+        if preferences.timezone is not None:
+            user.timezone = self.validate_timezone(preferences.timezone)
+        for time_column, _ in REMINDER_KINDS.values():
+            value = getattr(preferences, time_column.key)
+            if value is not None:
+                setattr(user, time_column.key, self.validate_time(value))
+        self.schedule_user(user)
+        db.commit()
+        db.refresh(user)
+        return user
+    
+    def due_criteria(self, kind: str, now: datetime) -> Sequence[Any]:
+        """某类提醒在 now 时刻已到期的用户筛选条件"""
+        _, next_column = REMINDER_KINDS[kind]
+        return (next_column <= now,)
+    
+    def advance(self, db: Session, users: Sequence[Any], kind: str, now: datetime):
+        """把一页用户的下一次提醒推进到 now 之后，单条批量 UPDATE 后提交"""
+        time_column, next_column = REMINDER_KINDS[kind]
+        rows = [
+            {
+                "id": user.id,
+                next_column.key: self.next_fire_at(
+                    user.timezone, getattr(user, time_column.key) or time_column.default.arg, now
+                )
+            }
+            for user in users
+        ]
+        if rows:
+            db.execute(update(User), rows)
+            db.commit()
+    
+    def backfill(self, db: Session, now: Optional[datetime] = None, page_size: int = 1000) -> int:
+        """为尚未安排提醒的用户（如迁移前注册的用户）计算下一次提醒时间"""
+        now = now or datetime.utcnow()
+        total = 0
+        while True:
+            users = db.execute(
+                select(User.id, User.timezone, User.daily_reminder_time, User.progress_reminder_time)
+                .where(or_(User.next_daily_reminder_at.is_(None), User.next_progress_reminder_at.is_(None)))
+                .order_by(User.id)
+                .limit(page_size)
+            ).all()
+            if not users:
+                return total
+            rows = []
+            for user in users:
+                row = {"id": user.id}
+                for time_column, next_column in REMINDER_KINDS.values():
+                    local_time = getattr(user, time_column.key) or time_column.default.arg
+                    row[time_column.key] = local_time
+                    row[next_column.key] = self.next_fire_at(user.timezone, local_time, now)
+                rows.append(row)
+            db.execute(update(User), rows)
+            db.commit()
+            total += len(rows)
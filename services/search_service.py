@@ -0,0 +1,155 @@
+import html
+import os
+import re
+from typing import Any, Dict, List, Tuple
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# 每类结果（目标、任务）最多返回的条数上限
+SEARCH_MAX_LIMIT = int(os.getenv("SEARCH_MAX_LIMIT", "50"))
+
+# 片段中命中词前后保留的大致字符数
+SEARCH_SNIPPET_CHARS = int(os.getenv("SEARCH_SNIPPET_CHARS", "24"))
+
+# 标题命中的权重（描述为 1）
+SEARCH_TITLE_WEIGHT = float(os.getenv("SEARCH_TITLE_WEIGHT", "10"))
+
+# snippet() 先用控制字符标记命中位置，转义正文后再替换为 <mark>，用户内容中的 HTML 不会被当作标签
+_OPEN, _CLOSE = "\x02", "\x03"
+
+# trigram 分词只能匹配至少 3 个字符的子串
+TRIGRAM_MIN_CHARS = 3
+
+class SearchService:
+    """目标和任务的全文检索（SQLite FTS5，trigram 分词）
+    
+    查询按空白拆分为多个词，各词同时满足：不少于 3 个字符的词走 FTS 索引（MATCH），按 bm25 排序并由
+    snippet() 生成高亮片段；中文里常见的 1~2 个字的词 trigram 无法匹配，改用 LIKE 过滤：与长词同时出现时
+    在 FTS 命中的记录上过滤，只有短词时直接查原表
+    """
+    
+    def parse_query(self, query: str) -> Tuple[List[str], List[str]]:
+        """拆分为 (走索引的长词, 用 LIKE 匹配的短词)"""
+        terms = [term.replace('"', "") for term in query.split()]
+        terms = [term for term in terms if term]
+        return (
+            [term for term in terms if len(term) >= TRIGRAM_MIN_CHARS],
+            [term for term in terms if len(term) < TRIGRAM_MIN_CHARS]
+        )
+    
+    def _match_expression(self, terms: List[str]) -> str:
+        """每个词作为一个 FTS 短语（双引号包裹），多个词之间为 AND"""
+        return " AND ".join(f'"{term}"' for term in terms)
+    
+    def _like_pattern(self, term: str) -> str:
+        return "%" + re.sub(r"([\\%_])", r"\\\1", term) + "%"
+    
+    def _owner_filter(self, content_table: str) -> str:
+        """只检索用户自己的记录；删除目标后遗留的任务（goal_id 被置空）不再返回"""
+        owner = f"{content_table}.user_id = :user_id"
+        if content_table == "tasks":
+            owner += " AND tasks.goal_id IS NOT NULL"
+        return owner
+    
+    def _statement(self, fts_table: str, content_table: str, columns: str, long_terms: List[str],
+                   short_terms: List[str]):
+        """构造单张表的检索语句，返回 (语句, 参数)"""
+        params: Dict[str, Any] = {}
+        like = []
+        for i, term in enumerate(short_terms):
+            params[f"like{i}"] = self._like_pattern(term)
+            like.append(f"(%(t)s.title LIKE :like{i} ESCAPE '\\' OR %(t)s.description LIKE :like{i} ESCAPE '\\')")
+        if not long_terms:
+            return self._short_statement(content_table, columns, like), params
+        
+        params["match"] = self._match_expression(long_terms)
+        where = [self._owner_filter(content_table), f"{fts_table} MATCH :match"]
+        where += [condition % {"t": fts_table} for condition in like]
+        # trigram 分词下每个字符起始一个词元，片段长度按字符数折算，上限为 snippet() 允许的 64
+        snippet = f"snippet({fts_table}, -1, '{_OPEN}', '{_CLOSE}', '…', {min(SEARCH_SNIPPET_CHARS * 2, 64)})"
+        statement = text(f"""
+            SELECT {columns}, {fts_table}.title AS fts_title, {fts_table}.description AS fts_description,
+                   {snippet} AS snippet, bm25({fts_table}, {SEARCH_TITLE_WEIGHT}, 1.0) AS rank
+            FROM {fts_table} JOIN {content_table} ON {content_table}.id = {fts_table}.rowid
+            WHERE {' AND '.join(where)}
+            ORDER BY rank, {content_table}.id DESC
+            LIMIT :limit
+        """)
+        return statement, params
+    
+    def _short_statement(self, content_table: str, columns: str, like: List[str]):
+        """只有短词时没有相关度：标题命中的排在前面，其次是只有描述命中的，同组内较新的在前
+        
+        LIKE 用不上索引，常见词会命中大量记录；两组各自按ID倒序读取、取满一页即停止，
+        不必对全部命中排序。直接查原表，外部内容的 FTS 表按 rowid 回表读取反而更慢
+        """
+        owner = self._owner_filter(content_table)
+        matches = " AND ".join(condition % {"t": content_table} for condition in like)
+        title_hit = f"{content_table}.title LIKE :like0 ESCAPE '\\'"
+        groups = [
+            f"""SELECT * FROM (
+                SELECT {columns}, {content_table}.title AS fts_title, {content_table}.description AS fts_description,
+                       NULL AS snippet, {rank} AS rank
+                FROM {content_table}
+                WHERE {owner} AND {matches} AND {condition}
+                ORDER BY {content_table}.id DESC
+                LIMIT :limit
+            )"""
+            for rank, condition in ((-1, title_hit), (0, f"NOT ({title_hit})"))
+        ]
+        return text(f"{' UNION ALL '.join(groups)} ORDER BY rank, id DESC LIMIT :limit")
+    
+    def _highlight(self, raw_snippet: str) -> str:
+        return html.escape(raw_snippet).replace(_OPEN, "<mark>").replace(_CLOSE, "</mark>")
+    
+    def _snippet_for(self, title: str, description: str, terms: List[str]) -> str:
+        """短词查询没有 snippet()：在描述（或标题）中找到第一个命中的词，截取其前后的片段并高亮"""
+        for source in (description or "", title or ""):
+            lowered = source.lower()
+            hits = [(lowered.find(term.lower()), term) for term in terms]
+            hits = [(pos, term) for pos, term in hits if pos >= 0]
+            if not hits:
+                continue
+            pos, _ = min(hits)
+            start = max(pos - SEARCH_SNIPPET_CHARS, 0)
+            end = min(pos + SEARCH_SNIPPET_CHARS, len(source))
+            fragment = html.escape(source[start:end])
+            for term in sorted(set(terms), key=len, reverse=True):
+                fragment = re.sub(re.escape(html.escape(term)), lambda m: f"<mark>{m.group(0)}</mark>",
+                                  fragment, flags=re.IGNORECASE)
+            return ("…" if start > 0 else "") + fragment + ("…" if end < len(source) else "")
+        return html.escape((description or title or "")[:SEARCH_SNIPPET_CHARS * 2])
+    
+    async def _search_table(self, db: AsyncSession, user_id: int, fts_table: str, content_table: str,
+                            columns: str, long_terms: List[str], short_terms: List[str],
+                            limit: int) -> List[Dict[str, Any]]:
+        statement, params = self._statement(fts_table, content_table, columns, long_terms, short_terms)
+        result = await db.execute(statement, {**params, "user_id": user_id, "limit": limit})
+        hits = []
+        for row in result.mappings():
+            hit = {key: value for key, value in row.items() if key not in ("fts_title", "fts_description", "rank")}
+            hit["snippet"] = (
+                self._highlight(row["snippet"]) if row["snippet"] is not None
+                else self._snippet_for(row["fts_title"], row["fts_description"], short_terms)
+            )
+            hit["score"] = round(-row["rank"], 4)
+            hits.append(hit)
+        return hits
+    
+    async def search(self, db: AsyncSession, user_id: int, query: str, limit: int = 20) -> Dict[str, Any]:
+        """检索用户的目标和任务，两类结果分别按相关度排序"""
+        long_terms, short_terms = self.parse_query(query)
+        if not long_terms and not short_terms:
+            return {"query": query, "goals": [], "tasks": []}
+        limit = min(limit, SEARCH_MAX_LIMIT)
+        goals = await self._search_table(
+            db, user_id, "goals_fts", "goals",
+            "goals.id, goals.title, goals.category, goals.status, goals.progress",
+            long_terms, short_terms, limit
+        )
+        tasks = await self._search_table(
+            db, user_id, "tasks_fts", "tasks",
+            "tasks.id, tasks.goal_id, tasks.title, tasks.status, tasks.priority, tasks.due_date",
+            long_terms, short_terms, limit
+        )
+        return {"query": query, "goals": goals, "tasks": tasks}
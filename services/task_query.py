@@ -0,0 +1,160 @@
+import base64
+import json
+from dataclasses import dataclass, replace
+from datetime import datetime
+from typing import Any, Optional, Sequence, Tuple
+from sqlalchemy import select, tuple_, and_, or_, union_all
+from models.models import Task
+from .keyset import entity_columns
+
+# 可用的排序方式：名称 -> (排序列, 是否降序)；前缀 - 表示降序，同值时按任务ID排序。
+# 只提供有索引支撑的排序，每种排序都能按索引顺序读取并在取满一页后停止
+TASK_SORTS = {
+    "id": ("id", False),
+    "-id": ("id", True),
+    "due_date": ("due_date", False),
+    "-due_date": ("due_date", True),
+}
+
+@dataclass(frozen=True)
+class TaskQuery:
+    """可组合的任务查询：各条件之间为 AND，每个方法返回新的查询，原查询不变
+    
+    TaskQuery().for_goal(3).with_status("pending", "in_progress").due_between(start, end).sorted_by("due_date")
+    
+    排序按 (排序列, id) 做键集分页，游标是上一页最后一行的排序值和ID；没有截止时间的任务按 SQLite 的
+    NULL 顺序排列（升序在最前、降序在最后），游标停在这些行上时同样能继续翻页；
+    条件与模型上的 (user_id/goal_id, status, due_date) 复合索引对应，过滤、排序和翻页都能走索引
+    """
+    goal_id: Optional[int] = None
+    status: Tuple[str, ...] = ()
+    priority: Tuple[str, ...] = ()
+    due_from: Optional[datetime] = None
+    due_to: Optional[datetime] = None
+    sort: str = "id"
+    after: Optional[str] = None
+    limit: Optional[int] = None
+    
+    def __post_init__(self):
+        """排序方式或游标无效时抛出 ValueError"""
+        if self.sort not in TASK_SORTS:
+            raise ValueError(f"不支持的排序方式: {self.sort}，可选: {', '.join(TASK_SORTS)}")
+        if self.after is not None:
+            self._decode_cursor()
+    
+    def for_goal(self, goal_id: Optional[int]) -> "TaskQuery":
+        return replace(self, goal_id=goal_id)
+    
+    def with_status(self, *status: str) -> "TaskQuery":
+        return replace(self, status=tuple(status))
+    
+    def with_priority(self, *priority: str) -> "TaskQuery":
+        return replace(self, priority=tuple(priority))
+    
+    def due_between(self, due_from: Optional[datetime] = None, due_to: Optional[datetime] = None) -> "TaskQuery":
+        """截止时间在 [due_from, due_to) 内，任一端为 None 表示不限"""
+        return replace(self, due_from=due_from, due_to=due_to)
+    
+    def sorted_by(self, sort: str) -> "TaskQuery":
+        return replace(self, sort=sort, after=None)
+    
+    def page(self, after: Optional[str] = None, limit: Optional[int] = None) -> "TaskQuery":
+        return replace(self, after=after, limit=limit)
+    
+    @property
+    def sort_column(self) -> str:
+        return TASK_SORTS[self.sort][0]
+    
+    def selected_fields(self, fields: Optional[Sequence[str]]) -> Optional[Tuple[str, ...]]:
+        """只选部分列时补上生成游标所需的 id 和排序列"""
+        if not fields:
+            return None
+        extra = [name for name in ("id", self.sort_column) if name not in fields]
+        return tuple(extra) + tuple(fields)
+    
+    def cursor_for(self, row: Any) -> str:
+        """一行（ORM 对象或字典）对应的游标；按ID排序时就是ID本身"""
+        get = row.get if isinstance(row, dict) else lambda name: getattr(row, name)
+        if self.sort_column == "id":
+            return str(get("id"))
+        value = get(self.sort_column)
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        raw = json.dumps([value, get("id")], separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+    
+    def _decode_cursor(self) -> Tuple[Any, int]:
+        """解析游标，格式不正确时抛出 ValueError"""
+        try:
+            if self.sort_column == "id":
+                return None, int(self.after)
+            raw = base64.urlsafe_b64decode(self.after + "=" * (-len(self.after) % 4))
+            value, last_id = json.loads(raw)
+            if value is not None:
+                value = datetime.fromisoformat(value)
+            return value, int(last_id)
+        except (ValueError, TypeError):
+            raise ValueError("无效的分页游标")
+    
+    def statement(self, user_id: int, fields: Optional[Sequence[str]] = None):
+        """构造查询语句；fields 为 selected_fields 的结果，为 None 时选取整个任务"""
+        # 按任务上冗余的 user_id 过滤，不联表；(user_id, status, due_date) 等索引同时满足过滤和排序。
+        # 删除目标后其任务的 goal_id 被置空但仍保留 user_id，不再属于用户的任务列表
+        stmt = select(*entity_columns(Task, fields)).where(Task.user_id == user_id, Task.goal_id.isnot(None))
+        if self.goal_id is not None:
+            stmt = stmt.where(Task.goal_id == self.goal_id)
+        if self.status:
+            stmt = stmt.where(Task.status.in_(self.status))
+        if self.priority:
+            stmt = stmt.where(Task.priority.in_(self.priority))
+        if self.due_from is not None:
+            stmt = stmt.where(Task.due_date >= self.due_from)
+        if self.due_to is not None:
+            stmt = stmt.where(Task.due_date < self.due_to)
+        
+        column, descending = TASK_SORTS[self.sort]
+        sort_column = getattr(Task, column)
+        if self.after is not None:
+            value, last_id = self._decode_cursor()
+            after_id = Task.id < last_id if descending else Task.id > last_id
+            if column == "id":
+                stmt = stmt.where(after_id)
+            elif value is None:
+                # 游标停在没有截止时间的行上：升序时之后是其余 NULL 行和全部非空值，降序时只剩其余 NULL 行
+                null_rest = and_(sort_column.is_(None), after_id)
+                stmt = stmt.where(null_rest if descending else or_(null_rest, sort_column.isnot(None)))
+            elif descending:
+                # 降序时 NULL 排在最后：行值比较排除了 NULL，再接上 NULL 行。
+                # 两部分各自按索引读取，直接写成 OR 会让 SQLite 放弃按 (排序列, id) 定位起点
+                key = tuple_(sort_column, Task.id)
+                return self._union_pages(
+                    stmt.where(key < (value, last_id)), stmt.where(sort_column.is_(None)), column, fields
+                )
+            else:
+                stmt = stmt.where(tuple_(sort_column, Task.id) > (value, last_id))
+        return self._ordered(stmt, column, descending)
+    
+    def _ordered(self, stmt, column: str, descending: bool, columns=Task):
+        """按 (排序列, id) 排序并限制行数；columns 为排序列所在的实体或列集合"""
+        sort_column = getattr(columns, column)
+        if column == "id":
+            stmt = stmt.order_by(columns.id.desc() if descending else columns.id)
+        elif descending:
+            stmt = stmt.order_by(sort_column.desc(), columns.id.desc())
+        else:
+            stmt = stmt.order_by(sort_column, columns.id)
+        if self.limit is not None:
+            stmt = stmt.limit(self.limit)
+        return stmt
+    
+    def _union_pages(self, head, tail, column: str, fields: Optional[Sequence[str]]):
+        """依次取 head 和 tail 两部分（各自排序并限制行数），合并后再取一页"""
+        parts = [select(self._ordered(part, column, True).subquery()) for part in (head, tail)]
+        stmt = self._ordered(union_all(*parts), column, True, parts[0].selected_columns)
+        return stmt if fields else select(Task).from_statement(stmt)
+    
+    def cache_key(self) -> str:
+        return (
+            f"goal={self.goal_id}&status={','.join(self.status)}&priority={','.join(self.priority)}"
+            f"&due_from={self.due_from}&due_to={self.due_to}&sort={self.sort}&after={self.after}&limit={self.limit}"
+        )
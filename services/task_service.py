@@ -1,25 +1,203 @@
 from sqlalchemy.orm import Session
-from datetime import datetime, timedelta
-from typing import List, Optional, Dict, Any
-from models.models import Task, TaskProgress
+from sqlalchemy import insert, update, case, bindparam, func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import List, Optional, Dict, Any, Iterator, Sequence, Tuple
+from models.models import Task, TaskProgress, Goal, DailyStat
 from models.schemas import TaskCreate
+from .read_cache import read_cache
+from .change_stream import change_stream
+from .task_query import TaskQuery
+
+def _goal_counts_statement():
+    """按 goal_id 增量调整任务计数的 UPDATE 语句
+    
+    进度和完成状态在同一条语句中按新计数计算：任务全部完成时目标标记为完成，
+    已完成的目标出现未完成任务时恢复为活跃
+    """
+    goals = Goal.__table__
+    total = goals.c.total_count + bindparam("total_delta")
+    completed = goals.c.completed_count + bindparam("completed_delta")
+    return (
+        update(goals)
+        .where(goals.c.id == bindparam("target_goal_id"))
+        .values(
+            total_count=total,
+            completed_count=completed,
+            progress=case((total > 0, completed * 100.0 / total), else_=0.0),
+            status=case(
+                ((total > 0) & (completed >= total), "completed"),
+                (goals.c.status == "completed", "active"),
+                else_=goals.c.status
+            )
+        )
+    )
+
+def _daily_stats_statement():
+    """按 (user_id, date) 累加每日统计的 UPSERT 语句，当天还没有记录时插入"""
+    stats = DailyStat.__table__
+    stmt = sqlite_insert(stats)
+    return stmt.on_conflict_do_update(
+        index_elements=[stats.c.user_id, stats.c.date],
+        set_={
+            "tasks_due": stats.c.tasks_due + stmt.excluded.tasks_due,
+            "tasks_completed": stats.c.tasks_completed + stmt.excluded.tasks_completed,
+            "minutes_planned": stats.c.minutes_planned + stmt.excluded.minutes_planned
+        }
+    )
+
+def goal_delta(goal) -> Dict[str, Any]:
+    """仪表板增量事件中的目标进度"""
+    return {
+        "id": goal.id,
+        "progress": goal.progress,
+        "status": goal.status,
+        "completed_count": goal.completed_count,
+        "total_count": goal.total_count
+    }
 
 class TaskService:
     def create_task(self, db: Session, task_data: Dict[str, Any], goal_id: int) -> Task:
         """创建新任务"""
+        owner_id = self.goal_owner(db, goal_id)
         task = Task(
             title=task_data["title"],
             description=task_data["description"],
             due_date=task_data["due_date"],
             priority=task_data["priority"],
             estimated_duration=task_data["estimated_duration"],
-            goal_id=goal_id
+            goal_id=goal_id,
+            user_id=owner_id
         )
         db.add(task)
+        self.adjust_goal_counts(db, {goal_id: (1, 0)})
+        self.adjust_daily_stats(db, self.daily_deltas([task], owner_id))
         db.commit()
+        read_cache.invalidate_user(owner_id)
         db.refresh(task)
+        self.publish_change(db, owner_id, {
+            "type": "task_created",
+            "task_id": task.id,
+            "title": task.title,
+            "status": task.status,
+            "priority": task.priority,
+            "due_date": task.due_date
+        }, task.goal_id)
         return task
     
+    def bulk_create_tasks(self, db: Session, task_rows: List[Dict[str, Any]], user_id: Optional[int] = None) -> int:
+        """批量插入任务（executemany）并累加所属目标的任务计数，不提交事务，由调用方统一提交
+        
+        user_id 为这批任务所属目标的用户，作为每一行的 user_id 写入
+        """
+        if task_rows:
+            stmt = insert(Task) if user_id is None else insert(Task).values(user_id=user_id)
+            db.execute(stmt, task_rows)
+            deltas = defaultdict(lambda: [0, 0])
+            for row in task_rows:
+                deltas[row["goal_id"]][0] += 1
+                if row.get("status") == "completed":
+                    deltas[row["goal_id"]][1] += 1
+            self.adjust_goal_counts(db, deltas)
+            self.adjust_daily_stats(db, self.daily_deltas(task_rows, user_id))
+        return len(task_rows)
+    
+    def adjust_goal_counts(self, db: Session, deltas: Dict[int, Tuple[int, int]]):
+        """在当前事务中按 {goal_id: (总数增量, 完成数增量)} 调整目标的任务计数和进度"""
+        rows = [
+            {"target_goal_id": goal_id, "total_delta": total_delta, "completed_delta": completed_delta}
+            for goal_id, (total_delta, completed_delta) in deltas.items()
+            if goal_id is not None and (total_delta or completed_delta)
+        ]
+        if rows:
+            # 先把挂起的 ORM 变更写入，再执行 Core 语句，并让已加载的目标对象重新读取计数
+            db.flush()
+            db.execute(_goal_counts_statement(), rows)
+            for goal in db.identity_map.values():
+                if isinstance(goal, Goal) and goal.id in deltas:
+                    db.expire(goal, ["total_count", "completed_count", "progress", "status"])
+    
+    def daily_deltas(self, tasks: Sequence[Any], user_id: Optional[int] = None,
+                     sign: int = 1) -> Dict[Tuple[int, date], List[int]]:
+        """任务（ORM 对象或插入行）对每日统计的增量 {(user_id, 日期): [到期数, 完成数, 分钟数]}
+        
+        sign 为 -1 时得到删除这些任务的增量；没有截止时间或用户的任务不计入
+        """
+        deltas = defaultdict(lambda: [0, 0, 0])
+        for task in tasks:
+            get = task.get if isinstance(task, dict) else lambda name: getattr(task, name)
+            owner = get("user_id") or user_id
+            due_date = get("due_date")
+            if owner is None or due_date is None:
+                continue
+            delta = deltas[(owner, due_date.date())]
+            delta[0] += sign
+            delta[1] += sign * (get("status") == "completed")
+            delta[2] += sign * (get("estimated_duration") or 0)
+        return deltas
+    
+    def adjust_daily_stats(self, db: Session, deltas: Dict[Tuple[int, date], Sequence[int]]):
+        """在当前事务中按 {(user_id, 日期): (到期数增量, 完成数增量, 分钟数增量)} 累加每日统计"""
+        rows = [
+            {"user_id": user_id, "date": day, "tasks_due": due, "tasks_completed": completed,
+             "minutes_planned": minutes}
+            for (user_id, day), (due, completed, minutes) in deltas.items()
+            if due or completed or minutes
+        ]
+        if rows:
+            db.flush()
+            db.execute(_daily_stats_statement(), rows)
+    
+    def subtract_goal_daily_stats(self, db: Session, goal_id: int):
+        """从每日统计中减去目标下全部任务（删除目标前调用），一次 GROUP BY 汇总"""
+        day = func.date(Task.due_date)
+        rows = db.query(
+            Task.user_id,
+            day.label("day"),
+            func.count(Task.id).label("due"),
+            func.sum(case((Task.status == "completed", 1), else_=0)).label("completed"),
+            func.coalesce(func.sum(Task.estimated_duration), 0).label("minutes")
+        ).filter(
+            Task.goal_id == goal_id, Task.user_id.isnot(None), Task.due_date.isnot(None)
+        ).group_by(Task.user_id, day).all()
+        self.adjust_daily_stats(db, {
+            (row.user_id, date.fromisoformat(row.day)): (-row.due, -row.completed, -row.minutes)
+            for row in rows
+        })
+    
+    def goal_owner(self, db: Session, goal_id: int) -> Optional[int]:
+        """目标所属的用户ID，写入后据此让该用户的读缓存失效"""
+        return db.query(Goal.user_id).filter(Goal.id == goal_id).scalar()
+    
+    def publish_change(self, db: Session, owner_id: Optional[int], event: Dict[str, Any],
+                       goal_id: Optional[int] = None):
+        """提交后向用户的仪表板推送增量事件，附带所属目标提交后的进度；用户没有打开的仪表板时不做查询"""
+        if owner_id is None or not change_stream.has_subscribers(owner_id):
+            return
+        if goal_id is not None:
+            goal = db.query(
+                Goal.id, Goal.progress, Goal.status, Goal.completed_count, Goal.total_count
+            ).filter(Goal.id == goal_id).first()
+            if goal:
+                event["goal"] = goal_delta(goal)
+        change_stream.publish(owner_id, event)
+    
+    def _user_tasks(self, db: Session, user_id: int, *entities):
+        """构造用户任务查询：通过 goals.user_id 联表过滤，避免先加载目标再拼接 IN 列表"""
+        return db.query(*(entities or (Task,))).join(Goal, Task.goal_id == Goal.id).filter(
+            Goal.user_id == user_id
+        )
+    
+    def query_tasks(self, db: Session, user_id: int, query: TaskQuery,
+                    fields: Optional[Sequence[str]] = None) -> List[Any]:
+        """按组合条件查询用户的任务；指定 fields 时只选取这些列（另含 id 和排序列）并返回字典"""
+        selected = query.selected_fields(fields)
+        stmt = query.statement(user_id, selected)
+        if selected:
+            return [dict(row) for row in db.execute(stmt).mappings()]
+        return db.scalars(stmt).all()
+    
     def get_goal_tasks(self, db: Session, goal_id: int) -> List[Task]:
         """获取目标的所有任务"""
         return db.query(Task).filter(Task.goal_id == goal_id).all()
@@ -32,7 +210,12 @@ class TaskService:
         """更新任务状态"""
         task = db.query(Task).filter(Task.id == task_id).first()
         if task:
+            completed_delta = (status == "completed") - (task.status == "completed")
             task.status = status
+            self.adjust_goal_counts(db, {task.goal_id: (0, completed_delta)})
+            if (completed_delta and task.goal_id is not None and task.user_id is not None
+                    and task.due_date is not None):
+                self.adjust_daily_stats(db, {(task.user_id, task.due_date.date()): (0, completed_delta, 0)})
             if status == "completed":
                 # 创建完成记录
                 progress = TaskProgress(
@@ -41,55 +224,89 @@ class TaskService:
                     completion_date=datetime.utcnow()
                 )
                 db.add(progress)
+            owner_id = self.goal_owner(db, task.goal_id)
             db.commit()
+            read_cache.invalidate_user(owner_id)
             db.refresh(task)
+            self.publish_change(db, owner_id, {
+                "type": "task_status", "task_id": task.id, "status": task.status
+            }, task.goal_id)
         return task
     
     def get_daily_tasks(self, db: Session, user_id: int, target_date: datetime) -> List[Task]:
         """获取指定日期的任务"""
-        from models.models import Goal
-        
-        # 获取用户的所有目标
-        goals = db.query(Goal).filter(Goal.user_id == user_id).all()
-        goal_ids = [goal.id for goal in goals]
-        
-        # 获取指定日期的任务
         start_of_day = target_date.replace(hour=0, minute=0, second=0, microsecond=0)
         end_of_day = start_of_day + timedelta(days=1)
         
-        tasks = db.query(Task).filter(
-            Task.goal_id.in_(goal_ids),
+        return self._user_tasks(db, user_id).filter(
             Task.due_date >= start_of_day,
             Task.due_date < end_of_day
         ).all()
+    
+    def get_tasks_in_range(self, db: Session, user_id: int, start_date: datetime, end_date: datetime):
+        """获取时间区间 [start_date, end_date) 内的任务（单次联表查询，只取日历需要的列）"""
+        return self._user_tasks(
+            db,
+            user_id,
+            Task.id,
+            Task.title,
+            Task.status,
+            Task.priority,
+            Task.due_date
+        ).filter(
+            Task.due_date >= start_date,
+            Task.due_date < end_date
+        ).order_by(Task.due_date, Task.id).yield_per(500)
+    
+    def iter_calendar_tasks(self, db: Session, user_id: int, start_date: datetime,
+                            end_date: datetime) -> Iterator[Dict[str, Any]]:
+        """按日期分组逐日产出日历任务，end_date 当天包含在内"""
+        start = start_date.replace(hour=0, minute=0, second=0, microsecond=0)
+        end = end_date.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+        
+        current_day = None
+        bucket = []
+        for row in self.get_tasks_in_range(db, user_id, start, end):
+            day = row.due_date.date()
+            if day != current_day:
+                if bucket:
+                    yield self._calendar_day(current_day, bucket)
+                current_day = day
+                bucket = []
+            bucket.append(row)
         
-        return tasks
+        if bucket:
+            yield self._calendar_day(current_day, bucket)
+    
+    def _calendar_day(self, day, rows) -> Dict[str, Any]:
+        """构造单日的日历条目，同一天内按任务ID排序"""
+        rows.sort(key=lambda row: row.id)
+        return {
+            "date": day.strftime("%Y-%m-%d"),
+            "tasks": [
+                {
+                    "id": row.id,
+                    "title": row.title,
+                    "status": row.status,
+                    "priority": row.priority
+                }
+                for row in rows
+            ]
+        }
     
     def get_overdue_tasks(self, db: Session, user_id: int) -> List[Task]:
         """获取逾期任务"""
-        from models.models import Goal
-        
-        goals = db.query(Goal).filter(Goal.user_id == user_id).all()
-        goal_ids = [goal.id for goal in goals]
-        
-        return db.query(Task).filter(
-            Task.goal_id.in_(goal_ids),
+        return self._user_tasks(db, user_id).filter(
             Task.due_date < datetime.utcnow(),
             Task.status.in_(["pending", "in_progress"])
         ).all()
     
     def get_upcoming_tasks(self, db: Session, user_id: int, days: int = 7) -> List[Task]:
         """获取即将到来的任务"""
-        from models.models import Goal
-        
-        goals = db.query(Goal).filter(Goal.user_id == user_id).all()
-        goal_ids = [goal.id for goal in goals]
-        
         start_date = datetime.utcnow()
         end_date = start_date + timedelta(days=days)
         
-        return db.query(Task).filter(
-            Task.goal_id.in_(goal_ids),
+        return self._user_tasks(db, user_id).filter(
             Task.due_date >= start_date,
             Task.due_date <= end_date,
             Task.status.in_(["pending", "in_progress"])
@@ -104,8 +321,11 @@ class TaskService:
             completion_date=datetime.utcnow() if completed else None
         )
         db.add(progress)
+        owner_id = db.query(Goal.user_id).join(Task, Task.goal_id == Goal.id).filter(Task.id == task_id).scalar()
         db.commit()
+        read_cache.invalidate_user(owner_id)
         db.refresh(progress)
+        self.publish_change(db, owner_id, {"type": "task_progress", "task_id": task_id, "completed": completed})
         return progress
     
     def get_task_progress(self, db: Session, task_id: int) -> List[TaskProgress]:
@@ -117,18 +337,18 @@ class TaskService:
         task = db.query(Task).filter(Task.id == task_id).first()
         if task:
             db.delete(task)
+            self.adjust_goal_counts(db, {task.goal_id: (-1, -(task.status == "completed"))})
+            if task.goal_id is not None:
+                self.adjust_daily_stats(db, self.daily_deltas([task], sign=-1))
+            owner_id = self.goal_owner(db, task.goal_id)
             db.commit()
+            read_cache.invalidate_user(owner_id)
+            self.publish_change(db, owner_id, {"type": "task_deleted", "task_id": task_id}, task.goal_id)
             return True
         return False
     
     def get_tasks_by_priority(self, db: Session, user_id: int, priority: str) -> List[Task]:
         """按优先级获取任务"""
-        from models.models import Goal
-        
-        goals = db.query(Goal).filter(Goal.user_id == user_id).all()
-        goal_ids = [goal.id for goal in goals]
-        
-        return db.query(Task).filter(
-            Task.goal_id.in_(goal_ids),
+        return self._user_tasks(db, user_id).filter(
             Task.priority == priority
-        ).all() 
\ No newline at end of file
+        ).all()
\ No newline at end of file
@@ -0,0 +1,221 @@
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+# 外部模板包路径（JSON，安装了 PyYAML 时也支持 YAML），为空时只使用内置模板
+TASK_TEMPLATE_PACK = os.getenv("TASK_TEMPLATE_PACK", "")
+
+# 检查模板包是否被修改的最小间隔（秒），文件变化后自动重新加载，无需重启
+TASK_TEMPLATE_CHECK_SECONDS = float(os.getenv("TASK_TEMPLATE_CHECK_SECONDS", "5"))
+
+# 没有对应类别模板时使用的通用模板
+GENERIC_CATEGORY = "通用"
+
+# 内置模板：类别 -> 阶段 -> {duration_weeks, tasks}
+BUILTIN_TEMPLATES: Dict[str, Dict[str, Any]] = {
+    "健身": {
+        "阶段1": {
+            "duration_weeks": 2,
+            "tasks": [
+                {"title": "制定运动计划", "description": "确定每周运动3-4次，每次30-45分钟", "duration": 30},
+                {"title": "准备运动装备", "description": "购买合适的运动鞋和运动服", "duration": 60},
+                {"title": "建立运动习惯", "description": "每天固定时间进行轻度运动", "duration": 30},
+                {"title": "记录运动日志", "description": "记录每次运动的内容和感受", "duration": 10}
+            ]
+        },
+        "阶段2": {
+            "duration_weeks": 2,
+            "tasks": [
+                {"title": "增加运动强度", "description": "逐步增加运动强度和时间", "duration": 45},
+                {"title": "尝试不同运动", "description": "尝试跑步、游泳、健身等不同运动", "duration": 60},
+                {"title": "制定营养计划", "description": "学习基本的营养知识", "duration": 30},
+                {"title": "调整作息时间", "description": "确保充足的睡眠和休息", "duration": 20}
+            ]
+        },
+        "阶段3": {
+            "duration_weeks": 2,
+            "tasks": [
+                {"title": "优化饮食结构", "description": "增加蛋白质摄入，减少垃圾食品", "duration": 45},
+                {"title": "制定详细计划", "description": "制定每周详细的运动和饮食计划", "duration": 60},
+                {"title": "寻找运动伙伴", "description": "找到志同道合的运动伙伴", "duration": 30},
+                {"title": "参加健身课程", "description": "参加专业的健身课程", "duration": 90}
+            ]
+        },
+        "阶段4": {
+            "duration_weeks": 2,
+            "tasks": [
+                {"title": "巩固运动习惯", "description": "保持稳定的运动频率和强度", "duration": 45},
+                {"title": "评估健身效果", "description": "测量体重、体脂等指标", "duration": 30},
+                {"title": "调整目标计划", "description": "根据进展调整下一步目标", "duration": 45},
+                {"title": "建立长期计划", "description": "制定长期的健身和健康计划", "duration": 60}
+            ]
+        }
+    },
+    "学习": {
+        "阶段1": {
+            "duration_weeks": 2,
+            "tasks": [
+                {"title": "确定学习目标", "description": "明确要学习的技能或知识", "duration": 30},
+                {"title": "制定学习计划", "description": "制定详细的学习时间表", "duration": 45},
+                {"title": "准备学习资源", "description": "收集相关的书籍、课程等资源", "duration": 60},
+                {"title": "建立学习环境", "description": "创造良好的学习环境", "duration": 30}
+            ]
+        },
+        "阶段2": {
+            "duration_weeks": 2,
+            "tasks": [
+                {"title": "开始基础学习", "description": "从基础知识开始学习", "duration": 60},
+                {"title": "记录学习笔记", "description": "整理和记录学习内容", "duration": 30},
+                {"title": "寻找学习伙伴", "description": "找到学习伙伴或加入学习小组", "duration": 30},
+                {"title": "实践应用", "description": "将学到的知识应用到实践中", "duration": 90}
+            ]
+        }
+    },
+    "工作": {
+        "阶段1": {
+            "duration_weeks": 2,
+            "tasks": [
+                {"title": "分析现状", "description": "分析当前工作状况和问题", "duration": 60},
+                {"title": "设定工作目标", "description": "明确工作改进的具体目标", "duration": 45},
+                {"title": "制定行动计划", "description": "制定详细的改进计划", "duration": 60},
+                {"title": "学习新技能", "description": "学习工作相关的新技能", "duration": 90}
+            ]
+        }
+    },
+    GENERIC_CATEGORY: {
+        "阶段1": {
+            "duration_weeks": 2,
+            "tasks": [
+                {"title": "目标分析", "description": "深入分析目标的具体要求", "duration": 60},
+                {"title": "制定计划", "description": "制定详细的执行计划", "duration": 90},
+                {"title": "准备资源", "description": "准备所需的资源和工具", "duration": 60},
+                {"title": "开始执行", "description": "开始执行计划的第一步", "duration": 45}
+            ]
+        },
+        "阶段2": {
+            "duration_weeks": 2,
+            "tasks": [
+                {"title": "持续推进", "description": "按照计划持续推进", "duration": 60},
+                {"title": "记录进展", "description": "记录执行过程中的进展", "duration": 30},
+                {"title": "调整优化", "description": "根据进展调整计划", "duration": 45},
+                {"title": "寻求支持", "description": "寻找必要的支持和帮助", "duration": 30}
+            ]
+        }
+    }
+}
+
+@dataclass(frozen=True, slots=True)
+class TaskTemplate:
+    """单个任务模板，title 已带上阶段前缀"""
+    title: str
+    description: str
+    duration: int
+
+@dataclass(frozen=True, slots=True)
+class StageTemplate:
+    """一个阶段的模板"""
+    name: str
+    duration_weeks: int
+    tasks: Tuple[TaskTemplate, ...]
+
+@dataclass(frozen=True, slots=True)
+class TemplateRegistry:
+    """不可变的模板注册表，按类别索引，加载后在所有规划器实例间共享"""
+    categories: Mapping[str, Tuple[StageTemplate, ...]]
+    source: str = "builtin"
+    
+    def get(self, category: str) -> Tuple[StageTemplate, ...]:
+        """获取类别对应的阶段模板，没有时返回通用模板"""
+        stages = self.categories.get(category)
+        if stages is None:
+            stages = self.categories[GENERIC_CATEGORY]
+        return stages
+
+def build_registry(data: Mapping[str, Mapping[str, Any]], source: str = "builtin") -> TemplateRegistry:
+    """把 类别 -> 阶段 -> {duration_weeks, tasks} 结构的模板编译为注册表"""
+    categories = {}
+    for category, stages in data.items():
+        compiled = []
+        for stage_name, stage_info in stages.items():
+            tasks = tuple(
+                TaskTemplate(
+                    title=f"{stage_name}: {task['title']}",
+                    description=task["description"],
+                    duration=int(task["duration"])
+                )
+                for task in stage_info["tasks"]
+            )
+            if not tasks:
+                raise ValueError(f"模板 {category}/{stage_name} 没有任务")
+            compiled.append(StageTemplate(stage_name, int(stage_info["duration_weeks"]), tasks))
+        categories[category] = tuple(compiled)
+    
+    if GENERIC_CATEGORY not in categories:
+        raise ValueError(f"模板包缺少通用类别“{GENERIC_CATEGORY}”")
+    return TemplateRegistry(MappingProxyType(categories), source)
+
+def load_template_pack(path: str) -> TemplateRegistry:
+    """从 JSON/YAML 模板包加载注册表，模板包中的类别覆盖同名内置类别"""
+    with open(path, encoding="utf-8") as f:
+        if path.endswith((".yaml", ".yml")):
+            try:
+                import yaml
+            except ImportError:
+                raise RuntimeError("加载 YAML 模板包需要安装 PyYAML")
+            pack = yaml.safe_load(f)
+        else:
+            pack = json.load(f)
+    return build_registry({**BUILTIN_TEMPLATES, **pack}, source=path)
+
+class _RegistryHolder:
+    """持有当前注册表；模板包文件变化时重新加载，加载失败时继续使用旧的注册表"""
+    
+    def __init__(self, path: str = TASK_TEMPLATE_PACK, check_interval: float = TASK_TEMPLATE_CHECK_SECONDS):
+        self.path = path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._mtime: Optional[float] = None
+        self._next_check = 0.0
+        self.registry = self._load()
+    
+    def _load(self) -> TemplateRegistry:
+        if not self.path:
+            return build_registry(BUILTIN_TEMPLATES)
+        self._mtime = os.path.getmtime(self.path)
+        return load_template_pack(self.path)
+    
+    def get(self) -> TemplateRegistry:
+        if self.path and time.monotonic() >= self._next_check:
+            self._check()
+        return self.registry
+    
+    def _check(self):
+        with self._lock:
+            self._next_check = time.monotonic() + self.check_interval
+            try:
+                if os.path.getmtime(self.path) != self._mtime:
+                    self.reload()
+            except Exception as e:
+                print(f"任务模板包加载失败，继续使用当前模板: {e}")
+    
+    def reload(self, path: Optional[str] = None) -> TemplateRegistry:
+        if path is not None:
+            self.path = path
+        # 先完整构建新的注册表再替换引用，规划中的请求不会看到半成品
+        self.registry = self._load()
+        print(f"任务模板已加载: {self.registry.source}")
+        return self.registry
+
+_holder = _RegistryHolder()
+
+def get_template_registry() -> TemplateRegistry:
+    """获取当前的模板注册表"""
+    return _holder.get()
+
+def reload_templates(path: Optional[str] = None) -> TemplateRegistry:
+    """立即重新加载模板包，path 为空字符串时恢复为内置模板"""
+    return _holder.reload(path)
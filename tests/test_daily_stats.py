@@ -0,0 +1,58 @@
+"""
+每日统计（daily_stats）在任务写路径上的维护
+"""
+
+import os
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from models.database import Base
+from models.models import User, Task, DailyStat
+from models.schemas import GoalCreate
+from services.goal_service import GoalService
+from services.task_service import TaskService
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    session.add(User(id=1, username="stats_user", email="stats@example.com", hashed_password="x"))
+    session.commit()
+    yield session
+    session.close()
+    engine.dispose()
+
+def daily_stats(db):
+    return {
+        row.date: (row.tasks_due, row.tasks_completed)
+        for row in db.query(DailyStat).filter(DailyStat.user_id == 1)
+        if row.tasks_due or row.tasks_completed
+    }
+
+def test_status_change_of_orphaned_task_leaves_stats_untouched(db):
+    goal_service = GoalService()
+    goal = goal_service.create_goal(db, GoalCreate(
+        title="一个月学会游泳",
+        description="每周练习三次",
+        category="健身",
+        start_date=datetime(2024, 1, 1),
+        end_date=datetime(2024, 2, 1)
+    ), user_id=1)
+    task_id = db.query(Task.id).filter(Task.goal_id == goal.id).order_by(Task.id).first()[0]
+    assert daily_stats(db)
+    
+    # 删除目标后其任务仍留在表中（goal_id 置空），统计中已扣除
+    assert goal_service.delete_goal(db, goal.id, 1)
+    assert db.get(Task, task_id).goal_id is None
+    assert daily_stats(db) == {}
+    
+    TaskService().update_task_status(db, task_id, "completed")
+    assert daily_stats(db) == {}
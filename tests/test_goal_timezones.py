@@ -0,0 +1,78 @@
+"""
+创建目标时开始、结束时间带时区（如 "Z"、"+08:00"）的回归测试
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from api.goals import router
+from models.database import Base, get_db
+from models.models import User, Task
+
+@pytest.fixture
+def client_and_session():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    db = Session()
+    db.add(User(id=1, username="tz_user", email="tz@example.com", hashed_password="x"))
+    db.commit()
+    
+    def override_get_db():
+        session = Session()
+        try:
+            yield session
+        finally:
+            session.close()
+    
+    app = FastAPI()
+    app.include_router(router, prefix="/api")
+    app.dependency_overrides[get_db] = override_get_db
+    yield TestClient(app), db
+    db.close()
+    engine.dispose()
+
+def goal_payload(start: str, end: str):
+    return {
+        "title": "两个月内改变自己",
+        "description": "通过科学的健身计划改善体态",
+        "category": "健身",
+        "start_date": start,
+        "end_date": end
+    }
+
+@pytest.mark.parametrize("path, body", [
+    ("/api/goals/", goal_payload("2024-01-01T00:00:00Z", "2024-03-01T00:00:00Z")),
+    ("/api/goals/batch", [goal_payload("2024-01-01T00:00:00Z", "2024-03-01T00:00:00Z")]),
+    ("/api/goals/import", [goal_payload("2024-01-01T00:00:00+08:00", "2024-03-01T00:00:00+08:00")]),
+])
+def test_create_goal_with_aware_dates(client_and_session, path, body):
+    client, db = client_and_session
+    response = client.post(path, json=body)
+    assert response.status_code == 200, response.text
+    
+    due_dates = sorted(due_date for (due_date,) in db.query(Task.due_date))
+    assert due_dates
+    # 截止时间按开始时间所在时区推进，第一个任务与开始时间相同
+    assert due_dates[0] == datetime(2024, 1, 1)
+
+def test_plan_goals_keeps_start_timezone():
+    from services.ai_planner import AIPlanner
+    from models.schemas import GoalCreate
+    
+    goal = GoalCreate(**goal_payload("2024-01-01T00:00:00Z", "2024-03-01T00:00:00Z"))
+    planner = AIPlanner()
+    expected = planner.plan_goal(goal.title, goal.description, goal.category, goal.start_date, goal.end_date)
+    planned = planner.plan_goals([goal])[0]
+    assert [task["due_date"] for task in planned] == [task["due_date"] for task in expected]
+    assert planned[0]["due_date"].utcoffset() == timedelta(0)
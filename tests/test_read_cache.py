@@ -0,0 +1,56 @@
+"""
+多进程部署时读缓存和 ETag 的开关
+"""
+
+import importlib
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI, Request, Response
+from fastapi.testclient import TestClient
+
+import api.conditional
+
+read_cache_module = importlib.import_module("services.read_cache")
+
+def make_client():
+    app = FastAPI()
+    
+    @app.get("/item")
+    def item(request: Request, response: Response):
+        not_modified = api.conditional.check_not_modified(request, response, 1)
+        if not_modified:
+            return not_modified
+        return {"ok": True}
+    
+    return TestClient(app)
+
+def test_multiple_workers_without_shared_backend_disable_cache_and_etags(monkeypatch):
+    monkeypatch.setattr(read_cache_module, "READ_CACHE_REDIS_URL", "")
+    monkeypatch.setattr(read_cache_module, "WEB_CONCURRENCY", 4)
+    cache = read_cache_module.build_read_cache()
+    assert not cache.enabled
+    
+    calls = []
+    assert cache.get_or_load_sync(1, "goals", lambda: calls.append(1) or len(calls)) == 1
+    assert cache.get_or_load_sync(1, "goals", lambda: calls.append(1) or len(calls)) == 2
+    
+    monkeypatch.setattr(api.conditional, "read_cache", cache)
+    response = make_client().get("/item", headers={"If-None-Match": "*"})
+    assert response.status_code == 200
+    assert "etag" not in response.headers
+
+def test_single_worker_keeps_etags(monkeypatch):
+    monkeypatch.setattr(read_cache_module, "READ_CACHE_REDIS_URL", "")
+    monkeypatch.setattr(read_cache_module, "WEB_CONCURRENCY", 1)
+    cache = read_cache_module.build_read_cache()
+    assert cache.enabled
+    
+    monkeypatch.setattr(api.conditional, "read_cache", cache)
+    client = make_client()
+    etag = client.get("/item").headers["etag"]
+    assert client.get("/item", headers={"If-None-Match": etag}).status_code == 304
+    cache.invalidate_user(1)
+    assert client.get("/item", headers={"If-None-Match": etag}).status_code == 200
@@ -0,0 +1,59 @@
+"""
+TaskQuery 键集分页：排序列为 NULL 的行
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from models.database import Base
+from models.models import User, Goal, Task
+from services.task_query import TaskQuery
+from services.task_service import TaskService
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    session.add(User(id=1, username="query_user", email="query@example.com", hashed_password="x"))
+    session.add(Goal(id=1, user_id=1, title="目标", description="", category="学习",
+                     start_date=datetime(2024, 1, 1), end_date=datetime(2024, 2, 1)))
+    start = datetime(2024, 1, 1)
+    for i in range(1, 13):
+        # 每三个任务中有一个没有截止时间，与有截止时间的任务ID交错
+        due_date = None if i % 3 == 0 else start + timedelta(days=i // 2)
+        session.add(Task(id=i, title=f"任务{i}", description="", due_date=due_date, priority="medium",
+                         status="pending", estimated_duration=30, goal_id=1, user_id=1))
+    session.commit()
+    yield session
+    session.close()
+    engine.dispose()
+
+def collect_pages(db, query, page_size, fields=None):
+    service = TaskService()
+    ids, after = [], None
+    while True:
+        page = query.page(after, page_size)
+        rows = service.query_tasks(db, 1, page, fields=fields)
+        ids += [row["id"] if isinstance(row, dict) else row.id for row in rows]
+        if len(rows) < page_size:
+            return ids
+        after = page.cursor_for(rows[-1])
+
+@pytest.mark.parametrize("sort", ["due_date", "-due_date"])
+@pytest.mark.parametrize("page_size", [1, 2, 5])
+@pytest.mark.parametrize("fields", [None, ("title",)])
+def test_pages_cross_null_due_dates(db, sort, page_size, fields):
+    query = TaskQuery(sort=sort)
+    expected = [row["id"] if fields else row.id for row in TaskService().query_tasks(db, 1, query, fields=fields)]
+    assert sorted(expected) == list(range(1, 13))
+    
+    assert collect_pages(db, query, page_size, fields) == expected